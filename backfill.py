@@ -0,0 +1,239 @@
+"""
+Historical backfill over a date range with resumable checkpoints
+
+    python backfill.py 2025-03-27 2025-09-28 --out backfill --workers 4 --rate 2
+    python backfill.py 2025-03-27 2025-09-28 --compressed   # gzip: ~3% of the bytes
+
+Every (date, bet_type) page is fetched at most once: its game rows are
+written under <out>/pages/ and recorded in <out>/checkpoint.tsv before
+anything else happens, so an interrupted run picks up where it stopped.
+Each date is written to its own partition as soon as all three pages are
+in, so memory stays flat however long the range is.
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+
+from game_record import games_frame
+from mlb_odds_scraper import BET_TYPES, ComprehensiveMLBScraper
+from odds_table import lines_frame
+
+PARTITION_DONE = 'partition'
+
+
+class TokenBucket:
+    """Thread-safe token bucket: at most `rate` requests per second, bursting to `capacity`"""
+    
+    def __init__(self, rate, capacity=None, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.clock = clock
+        self.sleep = sleep
+        self.updated = clock()
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """Block until a token is available, then take it"""
+        
+        while True:
+            with self._lock:
+                now = self.clock()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait_time = (1 - self.tokens) / self.rate
+            self.sleep(wait_time)
+
+
+class Checkpoint:
+    """Append-only record of completed (date, bet_type) pages and date partitions"""
+    
+    def __init__(self, path):
+        self.path = path
+        self.completed = set()
+        self._lock = threading.Lock()
+        
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    parts = line.rstrip('\n').split('\t')
+                    if len(parts) == 2:
+                        self.completed.add(tuple(parts))
+    
+    def is_done(self, date_str, step):
+        return (date_str, step) in self.completed
+    
+    def mark(self, date_str, step):
+        """Durably record a finished step"""
+        
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(f"{date_str}\t{step}\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self.completed.add((date_str, step))
+
+
+def date_range(start_date, end_date):
+    """Every YYYY-MM-DD date from start_date to end_date inclusive"""
+    
+    day = datetime.strptime(start_date, "%Y-%m-%d")
+    end = datetime.strptime(end_date, "%Y-%m-%d")
+    while day <= end:
+        yield day.strftime("%Y-%m-%d")
+        day += timedelta(days=1)
+
+
+class Backfill:
+    """Fetch a date range with bounded concurrency and write one partition per date"""
+    
+    def __init__(self, out_dir='backfill', max_workers=4, rate=2.0, fmt='csv', scraper=None):
+        if fmt not in ('csv', 'parquet'):
+            raise ValueError(f"Unsupported output format: {fmt}")
+        
+        self.out_dir = out_dir
+        self.max_workers = max(1, max_workers)
+        self.fmt = fmt
+        self.scraper = scraper or ComprehensiveMLBScraper(max_workers=self.max_workers)
+        self.bucket = TokenBucket(rate)
+        os.makedirs(out_dir, exist_ok=True)
+        self.checkpoint = Checkpoint(os.path.join(out_dir, 'checkpoint.tsv'))
+    
+    def page_path(self, date_str, bet_type):
+        return os.path.join(self.out_dir, 'pages', date_str, f"{bet_type}.json")
+    
+    def partition_path(self, table, date_str):
+        return os.path.join(self.out_dir, table, f"date={date_str}", f"part.{self.fmt}")
+    
+    def fetch_page(self, date_str, bet_type):
+        """Fetch one page, save its rows and checkpoint it; returns True on success"""
+        
+        self.bucket.acquire()
+        game_rows = self.scraper.scrape_bet_type(date_str, bet_type)
+        if game_rows is None:
+            return False
+        
+        path = self.page_path(date_str, bet_type)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(game_rows, f)
+        os.replace(tmp_path, path)
+        
+        self.checkpoint.mark(date_str, bet_type)
+        return True
+    
+    def write_partition(self, date_str):
+        """Turn a date's saved pages into games and all-book lines partitions"""
+        
+        pages = {}
+        for bet_type in BET_TYPES:
+            with open(self.page_path(date_str, bet_type), encoding='utf-8') as f:
+                pages[(date_str, bet_type)] = json.load(f)
+        
+        lines = self.scraper.build_date_lines(date_str, pages)
+        games = self.scraper.build_date_games(date_str, pages, lines)
+        
+        self._write_frame(games_frame(games), self.partition_path('games', date_str))
+        self._write_frame(lines_frame(lines), self.partition_path('lines', date_str))
+        self.checkpoint.mark(date_str, PARTITION_DONE)
+    
+    def _write_frame(self, df, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        if self.fmt == 'parquet':
+            df.to_parquet(tmp_path, index=False)
+        else:
+            df.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, path)
+    
+    def run(self, start_date, end_date):
+        """Backfill start_date..end_date; safe to re-run after an interruption"""
+        
+        dates = [d for d in date_range(start_date, end_date) if not self.checkpoint.is_done(d, PARTITION_DONE)]
+        print(f"🗄️ Backfilling {len(dates)} dates from {start_date} to {end_date}")
+        
+        pending = {}      # future -> (date, bet_type)
+        remaining = {}    # date -> bet types still outstanding
+        failed = set()
+        tasks = iter([(d, bt) for d in dates for bt in BET_TYPES])
+        
+        # Dates whose pages were all fetched in an earlier run only need their partition
+        for date_str in dates:
+            remaining[date_str] = {bt for bt in BET_TYPES if not self.checkpoint.is_done(date_str, bt)}
+            if not remaining[date_str]:
+                self.write_partition(date_str)
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            # Keep a bounded window in flight instead of queueing the whole season
+            def submit_next():
+                for date_str, bet_type in tasks:
+                    if bet_type in remaining[date_str]:
+                        future = executor.submit(self.fetch_page, date_str, bet_type)
+                        pending[future] = (date_str, bet_type)
+                        return True
+                return False
+            
+            for _ in range(self.max_workers * 2):
+                if not submit_next():
+                    break
+            
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    date_str, bet_type = pending.pop(future)
+                    
+                    if future.exception() is not None or not future.result():
+                        failed.add(date_str)
+                        print(f"❌ {bet_type} for {date_str} failed; will retry on the next run")
+                    
+                    remaining[date_str].discard(bet_type)
+                    if not remaining[date_str] and date_str not in failed:
+                        self.write_partition(date_str)
+                    
+                    submit_next()
+        
+        completed = len(dates) - len(failed)
+        print(f"🎉 Backfill finished: {completed} dates written, {len(failed)} incomplete")
+        return completed, sorted(failed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill MLB odds over a date range")
+    parser.add_argument('start_date')
+    parser.add_argument('end_date')
+    parser.add_argument('--out', default='backfill')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--rate', type=float, default=2.0, help="max requests per second")
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv')
+    parser.add_argument('--archive', help="also keep every fetched payload in this payload_archive directory")
+    parser.add_argument('--cache-dir', help="reuse and revalidate pages in this http_cache directory")
+    parser.add_argument('--compressed', action='store_true',
+                        help="accept gzip (falls back to identity per bet type if a response won't decode)")
+    args = parser.parse_args()
+    
+    archive = cache = None
+    if args.archive:
+        from payload_archive import PayloadArchive
+        archive = PayloadArchive(args.archive)
+    if args.cache_dir:
+        from http_cache import ResponseCache
+        cache = ResponseCache(args.cache_dir)
+    scraper = ComprehensiveMLBScraper(max_workers=args.workers, archive=archive, cache=cache,
+                                      compressed=args.compressed)
+    
+    backfill = Backfill(args.out, max_workers=args.workers, rate=args.rate, fmt=args.format, scraper=scraper)
+    backfill.run(args.start_date, args.end_date)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,600 @@
+"""
+Offline benchmarks for the MLB odds scraper
+
+Run against a directory of saved SBR pages named <date>_<bet_type>.html:
+
+    python benchmarks.py extract saved_pages/
+    python benchmarks.py parse saved_pages/
+    python benchmarks.py encoding saved_pages/
+    python benchmarks.py pipeline saved_pages/ --workers 1 2 4 8
+    python benchmarks.py deltas odds_snapshots.db
+    python benchmarks.py analytics --rows 2000000
+    python benchmarks.py render --days 7
+    python benchmarks.py replay saved_pages/ --latency 0.05 --workloads day two-day season
+    python benchmarks.py memory --days 186 --polls 48
+    python benchmarks.py archive saved_pages/ --repeat 30
+    python benchmarks.py startup saved_pages/ --repeat 5
+"""
+
+import argparse
+import gzip
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import zlib
+from pathlib import Path
+
+from datetime import date, timedelta
+
+from next_data import extract_next_data, iter_byte_chunks, load_odds_tables, orjson
+
+NEXT_DATA_PATTERN = r'<script id="__NEXT_DATA__" type="application/json">(.*?)</script>'
+
+
+def load_fixtures(fixture_dir):
+    """Load saved page bodies as bytes, sorted by file name"""
+    
+    paths = sorted(Path(fixture_dir).glob('*.html'))
+    if not paths:
+        raise SystemExit(f"❌ No saved pages found in {fixture_dir}")
+    return {path.name: path.read_bytes() for path in paths}
+
+
+def regex_extract(body):
+    """The original path: decode the whole page, regex it, then parse the capture"""
+    
+    text = body.decode('utf-8')
+    match = re.search(NEXT_DATA_PATTERN, text, re.DOTALL)
+    return json.loads(match.group(1)) if match else None
+
+
+def streaming_extract(body):
+    """The streaming path: scan byte chunks and parse straight from bytes"""
+    
+    payload = extract_next_data(iter_byte_chunks(body))
+    return json.loads(payload) if payload is not None else None
+
+
+def measure(fn, bodies, repeat):
+    """Return (mean seconds per page, peak traced bytes) for fn over all bodies"""
+    
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for body in bodies:
+            fn(body)
+    elapsed = (time.perf_counter() - start) / (repeat * len(bodies))
+    
+    # Peak memory is traced separately so tracemalloc doesn't skew the timing
+    peak = 0
+    for body in bodies:
+        tracemalloc.start()
+        fn(body)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    
+    return elapsed, peak
+
+
+def bench_extract(args):
+    """Compare regex and streaming __NEXT_DATA__ extraction"""
+    
+    fixtures = load_fixtures(args.fixture_dir)
+    bodies = list(fixtures.values())
+    
+    for name, body in fixtures.items():
+        if regex_extract(body) != streaming_extract(body):
+            raise SystemExit(f"❌ Extractors disagree on {name}")
+    
+    total_kb = sum(len(body) for body in bodies) / 1024
+    print(f"📄 {len(bodies)} pages, {total_kb:.0f} KB total")
+    
+    for label, fn in [('regex', regex_extract), ('streaming', streaming_extract)]:
+        elapsed, peak = measure(fn, bodies, args.repeat)
+        print(f"   {label:<10} {elapsed * 1000:8.2f} ms/page   peak {peak / 1024:8.0f} KB")
+
+
+def bench_parse(args):
+    """Compare full and selective decoding of the oddsTables path"""
+    
+    fixtures = load_fixtures(args.fixture_dir)
+    payloads = [extract_next_data(iter_byte_chunks(body)) for body in fixtures.values()]
+    payloads = [payload for payload in payloads if payload is not None]
+    
+    backends = ['json', 'selective'] + (['orjson'] if orjson is not None else [])
+    expected = [load_odds_tables(payload, 'json') for payload in payloads]
+    
+    total_kb = sum(len(payload) for payload in payloads) / 1024
+    print(f"📄 {len(payloads)} payloads, {total_kb:.0f} KB of __NEXT_DATA__")
+    
+    for backend in backends:
+        if [load_odds_tables(payload, backend) for payload in payloads] != expected:
+            raise SystemExit(f"❌ {backend} backend disagrees with json")
+        elapsed, peak = measure(lambda payload: load_odds_tables(payload, backend), payloads, args.repeat)
+        print(f"   {backend:<10} {elapsed * 1000:8.2f} ms/page   peak {peak / 1024:8.0f} KB")
+
+
+def gunzip_chunks(compressed, chunk_size=16 * 1024):
+    """Decompress a gzip body chunk by chunk, as a streamed response would"""
+    
+    decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    for chunk in iter_byte_chunks(compressed, chunk_size):
+        yield decoder.decompress(chunk)
+    yield decoder.flush()
+
+
+def bench_encoding(args):
+    """Check gzip transfer gives the same __NEXT_DATA__ as identity, and what it saves"""
+    
+    fixtures = load_fixtures(args.fixture_dir)
+    identity_total = gzip_total = 0
+    
+    for name, body in fixtures.items():
+        compressed = gzip.compress(body, compresslevel=6)
+        identity_payload = extract_next_data(iter_byte_chunks(body))
+        gzip_payload = extract_next_data(gunzip_chunks(compressed))
+        
+        if identity_payload != gzip_payload:
+            raise SystemExit(f"❌ gzip and identity extraction differ on {name}")
+        
+        identity_total += len(body)
+        gzip_total += len(compressed)
+        print(f"   {name:<40} {len(body) / 1024:8.0f} KB -> {len(compressed) / 1024:6.0f} KB")
+    
+    print(f"✅ Identical __NEXT_DATA__ both ways; gzip transfers "
+          f"{gzip_total / identity_total:.0%} of the identity bytes")
+
+
+def bench_pipeline(args):
+    """Parse-stage throughput of the process pool pipeline at several worker counts"""
+    
+    from parse_pipeline import ParsePipeline, group_page_files
+    
+    grouped = group_page_files(args.fixture_dir)
+    pages = sum(len(paths) for paths in grouped.values()) * args.repeat
+    if not pages:
+        raise SystemExit(f"❌ No saved pages found in {args.fixture_dir}")
+    
+    worker_counts = args.workers or sorted({1, 2, 4, os.cpu_count() or 1})
+    print(f"📄 {pages} pages over {len(grouped) * args.repeat} dates")
+    
+    baseline = None
+    for workers in worker_counts:
+        with ParsePipeline(parse_workers=workers) as pipeline:
+            # The first run starts the pool; later runs reuse its workers
+            start = time.perf_counter()
+            list(pipeline.run_directory(args.fixture_dir))
+            first_run = time.perf_counter() - start
+            
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                for _ in pipeline.run_directory(args.fixture_dir):
+                    pass
+            rate = pages / (time.perf_counter() - start)
+        
+        baseline = baseline or rate
+        print(f"   {workers:>3} workers  {rate:8.1f} pages/sec  ({rate / baseline:.2f}x)  "
+              f"first run incl. start-up {first_run * 1000:.0f} ms")
+
+
+def bench_deltas(args):
+    """Storage of keyframe+delta logging vs full snapshots over a stored poll history"""
+    
+    from line_deltas import reconstruct, storage_report
+    from snapshot_store import SnapshotStore
+    
+    store = SnapshotStore(args.snapshot_db)
+    polls = list(store.iter_polls())
+    store.close()
+    if not polls:
+        raise SystemExit(f"❌ No polls stored in {args.snapshot_db}")
+    
+    full_bytes, delta_bytes, changes = storage_report(polls, args.log, args.keyframe_every)
+    print(f"📄 {len(polls)} polls replayed, {changes} line changes")
+    print(f"   full snapshots {full_bytes / 1024:10.0f} KB")
+    print(f"   keyframe+delta {delta_bytes / 1024:10.0f} KB  ({delta_bytes / full_bytes:.1%} of full)")
+    
+    # The log must rebuild the exact state of the last poll
+    last_ts, last_lines = polls[-1]
+    expected = {}
+    for ts, lines in polls:
+        for key, price in zip(zip(map(str, lines['game_id']), lines['book'], lines['market'], lines['side']),
+                              zip(lines['odds'], lines['line'])):
+            expected[key] = price
+    if reconstruct(args.log, last_ts) != expected:
+        raise SystemExit("❌ Reconstructed state does not match the replayed polls")
+    print("✅ Last poll reconstructed exactly from keyframe + deltas")
+
+
+def bench_analytics(args):
+    """Vectorized probability / no-vig / hold over a synthetic season-scale frame"""
+    
+    import numpy as np
+    import pandas as pd
+    
+    from odds_analytics import MARKET_PAIRS, add_market_probabilities
+    
+    rng = np.random.default_rng(0)
+    columns = {}
+    for _, col_a, col_b in MARKET_PAIRS:
+        favourite = rng.integers(-250, -101, args.rows)
+        columns[col_a] = pd.array(favourite, dtype='Int16')
+        columns[col_b] = pd.array(rng.integers(100, 230, args.rows), dtype='Int16')
+    df = pd.DataFrame(columns)
+    
+    start = time.perf_counter()
+    result = add_market_probabilities(df)
+    elapsed = time.perf_counter() - start
+    
+    added = len(result.columns) - len(df.columns)
+    print(f"📊 {args.rows:,} rows x {len(MARKET_PAIRS)} markets -> {added} columns in {elapsed:.3f}s")
+
+
+def synthetic_slate(games, date_str='2025-07-15'):
+    """A games frame shaped like the scraper's output"""
+    
+    import numpy as np
+    import pandas as pd
+    
+    from odds_table import WIDE_COLUMNS
+    
+    rng = np.random.default_rng(games)
+    df = pd.DataFrame({
+        'date': date_str,
+        'game_id': np.arange(games),
+        'game_time': f"{date_str}T23:05:00+00:00",
+        'away_team': [f"Away Team {i}" for i in range(games)],
+        'home_team': [f"Home Team {i}" for i in range(games)],
+        'status': 'scheduled',
+        'venue': [f"Ballpark {i}" for i in range(games)],
+    })
+    for column, market, _, _, field in WIDE_COLUMNS:
+        if field == 'line':
+            df[column] = 8.5 if market == 'totals' else 1.5
+        else:
+            df[column] = rng.integers(-180, 170, games)
+    return df
+
+
+def bench_render(args):
+    """Per-card st.markdown (old) vs one batched slate string (new)"""
+    
+    from slate_render import CARD_CSS, game_card_html, slate_html
+    
+    for label, days in [('full slate', 1), (f'{args.days}-day view', args.days)]:
+        df = synthetic_slate(args.games * days)
+        
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            old_payloads = [CARD_CSS + game_card_html(game) for _, game in df.iterrows()]
+        old_time = (time.perf_counter() - start) / args.repeat
+        
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            new_payload = slate_html(df)
+        new_time = (time.perf_counter() - start) / args.repeat
+        
+        old_bytes = sum(len(payload.encode('utf-8')) for payload in old_payloads)
+        new_bytes = len(new_payload.encode('utf-8'))
+        print(f"🖼️ {label}: {len(df)} games")
+        print(f"   per-card  {old_time * 1000:7.2f} ms  {old_bytes / 1024:7.1f} KB  {len(old_payloads)} messages")
+        print(f"   batched   {new_time * 1000:7.2f} ms  {new_bytes / 1024:7.1f} KB  1 message")
+
+
+def synthetic_season_records(days, games, polls):
+    """GameRecords for every poll of a season, as a day-long poller would collect them"""
+    
+    import numpy as np
+    
+    from game_record import GameRecord
+    
+    rng = np.random.default_rng(0)
+    teams = [f"Team {i}" for i in range(30)]
+    first = date(2025, 3, 27)
+    records = []
+    for day in range(days):
+        date_str = (first + timedelta(days=day)).isoformat()
+        for game in range(games):
+            fixed = (date_str, 746000 + day * games + game, f"{date_str}T23:05:00+00:00",
+                     teams[(2 * game) % 30], teams[(2 * game + 1) % 30], 'scheduled', f"Ballpark {game}")
+            for _ in range(polls):
+                odds = rng.integers(-200, 190, 12).tolist()
+                wide = odds[:4] + odds[4:6] + [1.5, -1.5] + odds[6:8] + [1.5, -1.5] + \
+                       [8.5] + odds[8:10] + [9.0] + odds[10:12]
+                records.append(GameRecord(*fixed, *wide))
+    return records
+
+
+def bench_memory(args):
+    """Season of game snapshots: dict rows + default DataFrame vs GameRecords + typed frame"""
+    
+    import pandas as pd
+    
+    from game_record import games_frame
+    
+    records = synthetic_season_records(args.days, args.games, args.polls)
+    print(f"📦 {len(records):,} game snapshots ({args.days} days x {args.games} games x {args.polls} polls)")
+    
+    tracemalloc.start()
+    dict_rows = [record._asdict() for record in records]
+    dict_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    
+    tracemalloc.start()
+    tuple_rows = [type(record)(*record) for record in records]
+    record_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    
+    start = time.perf_counter()
+    old_frame = pd.DataFrame(dict_rows)
+    old_time = time.perf_counter() - start
+    start = time.perf_counter()
+    new_frame = games_frame(tuple_rows)
+    new_time = time.perf_counter() - start
+    
+    old_frame_bytes = old_frame.memory_usage(deep=True).sum()
+    new_frame_bytes = new_frame.memory_usage(deep=True).sum()
+    print(f"   rows      dicts {dict_bytes / 2**20:8.1f} MB   GameRecords {record_bytes / 2**20:8.1f} MB"
+          f"  ({record_bytes / dict_bytes:.0%})")
+    print(f"   frame     default {old_frame_bytes / 2**20:6.1f} MB   typed {new_frame_bytes / 2**20:12.1f} MB"
+          f"  ({new_frame_bytes / old_frame_bytes:.0%}), built in {old_time:.2f}s vs {new_time:.2f}s")
+
+
+def bench_archive(args):
+    """Archive size against the raw HTML, and reprocessing throughput over the archive"""
+    
+    from payload_archive import PayloadArchive, reprocess, zstandard
+    
+    fixtures = load_fixtures(args.fixture_dir)
+    payloads = []
+    for name, body in fixtures.items():
+        date_str, _, bet_type = Path(name).stem.partition('_')
+        payloads.append((date_str, bet_type, extract_next_data(iter_byte_chunks(body))))
+    
+    with tempfile.TemporaryDirectory() as archive_dir:
+        archive = PayloadArchive(archive_dir)
+        html_bytes = 0
+        start = time.perf_counter()
+        # Each repeat is archived as another day so reprocessing sees repeat x the dates
+        for repeat in range(args.repeat):
+            for date_str, bet_type, payload in payloads:
+                day = (date.fromisoformat(date_str) + timedelta(days=repeat * 7)).isoformat()
+                archive.append(day, bet_type, payload)
+            html_bytes += sum(len(body) for body in fixtures.values())
+        append_time = time.perf_counter() - start
+        records, raw_bytes, stored_bytes, codecs = archive.stats()
+        archive.close()
+        
+        start = time.perf_counter()
+        batches = list(reprocess(archive_dir, workers=args.workers))
+        reprocess_time = time.perf_counter() - start
+    
+    codec = ', '.join(codecs) + ('' if zstandard is not None else ' (zstandard not installed)')
+    print(f"📦 {records} payloads archived with {codec} in {append_time:.2f}s")
+    print(f"   raw HTML         {html_bytes / 2**20:8.1f} MB")
+    print(f"   __NEXT_DATA__    {raw_bytes / 2**20:8.1f} MB")
+    print(f"   archive          {stored_bytes / 2**20:8.1f} MB  ({stored_bytes / html_bytes:.1%} of the HTML)")
+    print(f"   reprocess        {len(batches)} dates in {reprocess_time:.2f}s "
+          f"({records / reprocess_time:.0f} payloads/sec)")
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def start_replay_server(fixture_dir, latency, error_rate):
+    """Run replay.py serve in its own process so it doesn't share the client's GIL"""
+    
+    command = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'replay.py'),
+               'serve', fixture_dir, '--port', '0', '--cycle',
+               '--latency', str(latency), '--error-rate', str(error_rate)]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    banner = process.stdout.readline()
+    if ' at ' not in banner:
+        process.kill()
+        raise SystemExit(f"❌ Replay server did not start: {banner.strip()}")
+    return process, banner.rsplit(' at ', 1)[1].strip()
+
+
+def run_replay_workload(workload, dates, base_url, workers):
+    """Scrape dates from the replay server the way production would; returns page latencies"""
+    
+    from backfill import Backfill
+    from mlb_odds_scraper import ComprehensiveMLBScraper
+    
+    scraper = ComprehensiveMLBScraper(max_workers=workers, quiet=True, base_url=base_url)
+    latencies = []
+    scrape_bet_type = scraper.scrape_bet_type
+    
+    def timed_scrape(date_str, bet_type):
+        start = time.perf_counter()
+        try:
+            return scrape_bet_type(date_str, bet_type)
+        finally:
+            latencies.append(time.perf_counter() - start)
+    
+    scraper.scrape_bet_type = timed_scrape
+    
+    if workload == 'season':
+        with tempfile.TemporaryDirectory() as out_dir:
+            Backfill(out_dir, max_workers=workers, rate=1e6, scraper=scraper).run(dates[0], dates[-1])
+    else:
+        pages = scraper.fetch_pages(dates)
+        for date_str in dates:
+            scraper.build_date_games(date_str, pages)
+    
+    return latencies
+
+
+def bench_replay(args):
+    """End-to-end pages/sec, latency percentiles and peak memory against a local replay server"""
+    
+    fixture_dates = sorted({path.name.split('_', 1)[0] for path in Path(args.fixture_dir).glob('*.html')})
+    if not fixture_dates:
+        raise SystemExit(f"❌ No saved pages found in {args.fixture_dir}")
+    
+    first = date.fromisoformat(fixture_dates[0])
+    workloads = {
+        'day': 1,
+        'two-day': 2,
+        'season': args.season_days,
+    }
+    
+    # Import the scraper stack up front so the first workload doesn't pay for it
+    import backfill  # noqa: F401
+    
+    process, base_url = start_replay_server(args.fixture_dir, args.latency, args.error_rate)
+    print(f"📡 Replay server at {base_url} (latency {args.latency * 1000:.0f} ms, "
+          f"errors {args.error_rate:.0%}, {args.workers} workers)")
+    
+    try:
+        for workload in args.workloads:
+            dates = [(first + timedelta(days=offset)).isoformat() for offset in range(workloads[workload])]
+            
+            start = time.perf_counter()
+            latencies = sorted(run_replay_workload(workload, dates, base_url, args.workers))
+            elapsed = time.perf_counter() - start
+            
+            # Peak memory comes from a second, traced run so tracemalloc doesn't skew the timing
+            tracemalloc.start()
+            run_replay_workload(workload, dates, base_url, args.workers)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            
+            print(f"   {workload:<8} {len(latencies):5d} pages  {len(latencies) / elapsed:8.1f} pages/sec  "
+                  f"p50 {percentile(latencies, 0.50) * 1000:6.1f} ms  "
+                  f"p95 {percentile(latencies, 0.95) * 1000:6.1f} ms  "
+                  f"p99 {percentile(latencies, 0.99) * 1000:6.1f} ms  "
+                  f"peak {peak / 1024 / 1024:6.1f} MB")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def run_timed(command, cwd, env):
+    """Wall seconds and peak RSS in MB of one subprocess run to completion"""
+    
+    start = time.perf_counter()
+    process = subprocess.Popen(command, cwd=cwd, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    _, status, usage = os.wait4(process.pid, 0)
+    elapsed = time.perf_counter() - start
+    process.returncode = os.waitstatus_to_exitcode(status)
+    if process.returncode:
+        raise SystemExit(f"❌ {' '.join(command)} exited with {process.returncode}")
+    # ru_maxrss is in kilobytes on Linux
+    return elapsed, usage.ru_maxrss / 1024
+
+
+def bench_startup(args):
+    """Cold start and peak RSS: the scraper's main() vs odds_cli.py, against a local replay server"""
+    
+    here = os.path.dirname(os.path.abspath(__file__))
+    cli = os.path.join(here, 'odds_cli.py')
+    commands = [
+        ("import scraper", [sys.executable, '-c', 'import mlb_odds_scraper']),
+        ("main()", [sys.executable, os.path.join(here, 'mlb_odds_scraper.py')]),
+        ("cli jsonl", [sys.executable, cli, 'today', '--days', '2', '--format', 'jsonl']),
+        ("cli csv", [sys.executable, cli, 'today', '--days', '2', '--format', 'csv', '--out', 'games.csv']),
+        ("cli parquet", [sys.executable, cli, 'today', '--days', '2', '--format', 'parquet',
+                         '--out', 'games.parquet']),
+    ]
+    
+    process, base_url = start_replay_server(args.fixture_dir, 0, 0)
+    env = dict(os.environ, SBR_BASE_URL=base_url, PYTHONPATH=here)
+    print(f"📡 Replay server at {base_url}, today + tomorrow, median of {args.repeat}")
+    
+    try:
+        with tempfile.TemporaryDirectory() as cwd:
+            for name, command in commands:
+                runs = [run_timed(command, cwd, env) for _ in range(args.repeat)]
+                wall = sorted(elapsed for elapsed, _ in runs)[len(runs) // 2]
+                rss = max(peak for _, peak in runs)
+                print(f"   {name:<15} {wall * 1000:8.0f} ms  peak RSS {rss:6.1f} MB")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MLB odds scraper benchmarks")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    
+    extract = subparsers.add_parser('extract', help="__NEXT_DATA__ extraction: regex vs streaming")
+    extract.add_argument('fixture_dir')
+    extract.add_argument('--repeat', type=int, default=20)
+    extract.set_defaults(func=bench_extract)
+    
+    parse = subparsers.add_parser('parse', help="oddsTables decoding: full vs selective vs orjson")
+    parse.add_argument('fixture_dir')
+    parse.add_argument('--repeat', type=int, default=20)
+    parse.set_defaults(func=bench_parse)
+    
+    encoding = subparsers.add_parser('encoding', help="gzip vs identity transfer: same payload, fewer bytes")
+    encoding.add_argument('fixture_dir')
+    encoding.set_defaults(func=bench_encoding)
+    
+    pipeline = subparsers.add_parser('pipeline', help="process pool parse throughput by worker count")
+    pipeline.add_argument('fixture_dir')
+    pipeline.add_argument('--workers', type=int, nargs='+')
+    pipeline.add_argument('--repeat', type=int, default=5)
+    pipeline.set_defaults(func=bench_pipeline)
+    
+    deltas = subparsers.add_parser('deltas', help="delta log vs full snapshot storage on a replayed history")
+    deltas.add_argument('snapshot_db')
+    deltas.add_argument('--log', default='replayed_deltas.jsonl')
+    deltas.add_argument('--keyframe-every', type=int, default=12)
+    deltas.set_defaults(func=bench_deltas)
+    
+    analytics = subparsers.add_parser('analytics', help="vectorized odds analytics on a synthetic frame")
+    analytics.add_argument('--rows', type=int, default=2_000_000)
+    analytics.set_defaults(func=bench_analytics)
+    
+    render = subparsers.add_parser('render', help="dashboard slate rendering: per-card vs batched")
+    render.add_argument('--games', type=int, default=15)
+    render.add_argument('--days', type=int, default=7)
+    render.add_argument('--repeat', type=int, default=20)
+    render.set_defaults(func=bench_render)
+    
+    memory = subparsers.add_parser('memory', help="game row and frame memory for a season of snapshots")
+    memory.add_argument('--days', type=int, default=186)
+    memory.add_argument('--games', type=int, default=15)
+    memory.add_argument('--polls', type=int, default=48, help="snapshots kept per game")
+    memory.set_defaults(func=bench_memory)
+    
+    archive = subparsers.add_parser('archive', help="payload archive size and reprocess throughput")
+    archive.add_argument('fixture_dir')
+    archive.add_argument('--repeat', type=int, default=30)
+    archive.add_argument('--workers', type=int)
+    archive.set_defaults(func=bench_archive)
+    
+    replay = subparsers.add_parser('replay', help="end-to-end scraping against a local replay server")
+    replay.add_argument('fixture_dir')
+    replay.add_argument('--workloads', nargs='+', choices=['day', 'two-day', 'season'],
+                        default=['day', 'two-day', 'season'])
+    replay.add_argument('--season-days', type=int, default=186)
+    replay.add_argument('--workers', type=int, default=6)
+    replay.add_argument('--latency', type=float, default=0.05, help="simulated server latency in seconds")
+    replay.add_argument('--error-rate', type=float, default=0.0)
+    replay.set_defaults(func=bench_replay)
+    
+    startup = subparsers.add_parser('startup', help="cold start and peak RSS: main() vs the streaming CLI")
+    startup.add_argument('fixture_dir')
+    startup.add_argument('--repeat', type=int, default=5)
+    startup.set_defaults(func=bench_startup)
+    
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
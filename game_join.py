@@ -0,0 +1,36 @@
+"""
+Join gameRows from different SBR tables on gameView.gameId
+"""
+
+
+def game_row_id(game_row, position):
+    """The gameId of a row, falling back to its position when SBR omits it"""
+    
+    return game_row.get('gameView', {}).get('gameId', f'game_{position}')
+
+
+def join_game_rows(tables):
+    """Merge several gameRows tables into one entry per game in a single pass
+    
+    tables maps a source name (e.g. a bet type) to its list of gameRows, and
+    may contain None for sources that failed to load. Returns a dict of
+    game_id -> {source: game_row}. Games keep the order in which they were
+    first seen, walking the sources in the order given. A game missing from
+    some sources simply has no entry for them.
+    """
+    
+    joined = {}
+    
+    for source, game_rows in tables.items():
+        for position, game_row in enumerate(game_rows or []):
+            sources = joined.setdefault(game_row_id(game_row, position), {})
+            # Keep the first row if a table lists the same game twice
+            sources.setdefault(source, game_row)
+    
+    return joined
+
+
+def missing_sources(sources, expected):
+    """Names from expected that a joined game has no row for"""
+    
+    return [source for source in expected if source not in sources]
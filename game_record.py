@@ -0,0 +1,56 @@
+"""
+Compact per-game records and their typed DataFrame
+
+build_date_games emits one GameRecord per game instead of a ~40 key
+dict: the field names live once on the class, not in every row.
+games_frame turns records into a DataFrame with explicit dtypes so a
+season of snapshots doesn't sit in object columns:
+
+    American odds        Int16 (nullable)
+    spreads and totals   float32
+    teams, venue, status category
+    game_time            datetime64[ns, UTC]
+"""
+
+from collections import namedtuple
+
+from odds_table import WIDE_COLUMNS
+
+GAME_FIELDS = ('date', 'game_id', 'game_time', 'away_team', 'home_team', 'status', 'venue')
+
+GameRecord = namedtuple('GameRecord', GAME_FIELDS + tuple(column for column, *_ in WIDE_COLUMNS))
+
+CATEGORY_FIELDS = ('date', 'away_team', 'home_team', 'status', 'venue')
+ODDS_FIELDS = tuple(column for column, _, _, _, field in WIDE_COLUMNS if field == 'odds')
+LINE_FIELDS = tuple(column for column, _, _, _, field in WIDE_COLUMNS if field == 'line')
+
+
+def games_frame(records):
+    """Typed DataFrame from GameRecords (or plain tuples in GameRecord field order)"""
+    
+    import numpy as np
+    import pandas as pd
+    
+    records = list(records)
+    if not records:
+        return pd.DataFrame(columns=list(GameRecord._fields))
+    
+    values = dict(zip(GameRecord._fields, zip(*records)))
+    
+    columns = {}
+    for field in GameRecord._fields:
+        column = values[field]
+        if field in CATEGORY_FIELDS:
+            columns[field] = pd.Categorical(column)
+        elif field in ODDS_FIELDS:
+            columns[field] = pd.array(column, dtype='Int16')
+        elif field in LINE_FIELDS:
+            # None becomes NaN
+            columns[field] = np.array(column, dtype=np.float32)
+        elif field == 'game_time':
+            # 'TBD' and other non-timestamps become NaT
+            columns[field] = pd.to_datetime(pd.Series(column), utc=True, errors='coerce')
+        else:
+            columns[field] = list(column)
+    
+    return pd.DataFrame(columns)
@@ -0,0 +1,13 @@
+"""
+Game status checks shared by the poll scheduler and the page cache
+"""
+
+# Substrings of gameView.status that mean a game's odds won't move again
+FINAL_STATUSES = ('final', 'complete', 'cancel', 'postpone')
+
+
+def is_final(status):
+    """True for a finished, cancelled or postponed game's gameView.status"""
+    
+    status = (status or '').lower()
+    return any(marker in status for marker in FINAL_STATUSES)
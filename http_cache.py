@@ -0,0 +1,149 @@
+"""
+On-disk cache for SBR odds pages with conditional revalidation
+
+Only the extracted __NEXT_DATA__ payload is stored, next to the response
+validators (ETag / Last-Modified) and a content hash, so a cache hit skips
+both the download and the HTML scan.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+from game_status import is_final
+from next_data import load_game_rows
+
+# Pages this many days old can't change any more, finished or not
+SETTLED_AFTER_DAYS = 2
+
+
+class ResponseCache:
+    """Disk-backed payload cache keyed by page URL (which carries the date)"""
+    
+    def __init__(self, cache_dir='.sbr_cache', ttl=300):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self._parsed = {}
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+    
+    def _path(self, url, suffix):
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}{suffix}")
+    
+    def get(self, url):
+        """Return the cached entry for url, or None"""
+        
+        try:
+            with open(self._path(url, '.json'), encoding='utf-8') as f:
+                entry = json.load(f)
+            with open(self._path(url, '.payload'), 'rb') as f:
+                entry['payload'] = f.read()
+        except (OSError, ValueError):
+            return None
+        
+        # Ignore entries whose payload was truncated or swapped underneath us
+        if hashlib.sha1(entry['payload']).hexdigest() != entry.get('content_hash'):
+            return None
+        return entry
+    
+    def is_fresh(self, entry, now=None):
+        """Settled pages never change; everything else is fresh for ttl seconds"""
+        
+        if entry.get('permanent'):
+            return True
+        now = time.time() if now is None else now
+        return now - entry['fetched_at'] < self.ttl
+    
+    def conditional_headers(self, entry):
+        """Validators to send so an unchanged page comes back as 304"""
+        
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+    
+    def store(self, url, date_str, payload, response_headers):
+        """Save a freshly downloaded payload with its validators"""
+        
+        entry = {
+            'url': url,
+            'date': date_str,
+            'etag': response_headers.get('ETag'),
+            'last_modified': response_headers.get('Last-Modified'),
+            'content_hash': hashlib.sha1(payload).hexdigest(),
+            'fetched_at': time.time(),
+            'permanent': is_settled(date_str, payload),
+        }
+        
+        # Payload first, so a reader never sees metadata without its body
+        self._write_atomic(self._path(url, '.payload'), payload)
+        self._write_atomic(self._path(url, '.json'), json.dumps(entry).encode('utf-8'))
+        
+        entry['payload'] = payload
+        return entry
+    
+    def revalidated(self, entry):
+        """Record a 304 so the entry is fresh for another ttl"""
+        
+        entry['fetched_at'] = time.time()
+        entry['permanent'] = is_settled(entry.get('date'), entry.get('payload'))
+        meta = {key: value for key, value in entry.items() if key != 'payload'}
+        self._write_atomic(self._path(entry['url'], '.json'), json.dumps(meta).encode('utf-8'))
+        return entry
+    
+    def parsed_rows(self, url, content_hash):
+        """Game rows already parsed from this exact payload, if any"""
+        
+        with self._lock:
+            cached = self._parsed.get(url)
+        if cached and cached[0] == content_hash:
+            return cached[1]
+        return None
+    
+    def remember_rows(self, url, content_hash, game_rows):
+        """Keep the parsed rows in memory so an unchanged payload isn't parsed again"""
+        
+        with self._lock:
+            self._parsed[url] = (content_hash, game_rows)
+    
+    def _write_atomic(self, path, data):
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+
+def is_settled(date_str, payload=None):
+    """True when a YYYY-MM-DD page's odds can no longer change
+    
+    Dates at least SETTLED_AFTER_DAYS old are settled outright. A page
+    for yesterday fetched just after midnight can still have late games
+    in progress, so it only counts once every game on it is final.
+    """
+    
+    try:
+        age = (datetime.now().date() - datetime.strptime(date_str, "%Y-%m-%d").date()).days
+    except (TypeError, ValueError):
+        return False
+    
+    if age >= SETTLED_AFTER_DAYS:
+        return True
+    if age < 1 or payload is None:
+        return False
+    return all_games_final(payload)
+
+
+def all_games_final(payload):
+    """True if a __NEXT_DATA__ payload lists games and every one of them is final"""
+    
+    try:
+        game_rows = load_game_rows(payload)
+    except (KeyError, ValueError):
+        return False
+    return bool(game_rows) and all(is_final(row.get('gameView', {}).get('status')) for row in game_rows)
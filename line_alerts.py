@@ -0,0 +1,339 @@
+"""
+Streaming line-move alerts over LineDeltaTracker changes
+
+The engine is fed the LineChanges each poll produces, so the work per
+poll is proportional to the prices that moved, not to games x rules:
+rules are indexed by (market, book) and only the rules for a changed
+price's market and book are evaluated. Per-series history is a short
+deque trimmed to the longest rule window.
+
+Rules:
+
+    OddsMove        odds moved >= N cents or >= N% implied probability,
+                    since the last poll or within the last N minutes
+    LineMove        spread or total moved >= N points
+    KeyNumberCross  a total or spread crossed or landed on a key number
+    Steam           the same side moved the same way at >= N books within
+                    N minutes
+
+Rules can be built in code or loaded from JSON (load_rules):
+
+    [{"type": "odds_move", "name": "ml-20c", "markets": ["moneyline"], "cents": 20},
+     {"type": "key_number", "name": "total-keys", "keys": [8, 9]},
+     {"type": "steam", "name": "steam", "min_books": 3, "minutes": 5}]
+
+Alerts go to every sink: StdoutSink, JsonlSink or WebhookSink (which
+posts from a background thread so a slow endpoint never delays a poll).
+"""
+
+import json
+import queue
+import threading
+from collections import defaultdict, deque, namedtuple
+
+import requests
+
+from line_deltas import LineDeltaTracker
+from line_movement import odds_cents
+from snapshot_store import to_timestamp
+
+Alert = namedtuple('Alert', [
+    'ts', 'rule', 'game_id', 'book', 'market', 'side', 'message',
+    'old_odds', 'old_line', 'new_odds', 'new_line'])
+
+TOTAL_KEY_NUMBERS = (7, 8, 9, 10)
+
+
+def implied_prob(odds):
+    """Implied probability of one American price, or None"""
+    
+    if not odds:
+        return None
+    return -odds / (100 - odds) if odds < 0 else 100 / (odds + 100)
+
+
+class Rule:
+    """Base rule: a name, optional market/book/game filters and a look-back window
+    
+    check(change, history) returns an alert message or None. history is
+    the series' deque of (ts, odds, line), newest last, already including
+    this change.
+    """
+    
+    default_markets = None
+    
+    def __init__(self, name, markets=None, books=None, game_ids=None, minutes=None, cooldown=None):
+        self.name = name
+        markets = markets if markets is not None else self.default_markets
+        self.markets = tuple(markets) if markets else None
+        self.books = tuple(book.lower() for book in books) if books else None
+        self.game_ids = frozenset(str(game_id) for game_id in game_ids) if game_ids else None
+        self.window = minutes * 60 if minutes else 0
+        # Don't repeat an alert for the same series within cooldown seconds
+        self.cooldown = cooldown if cooldown is not None else self.window
+    
+    def reference(self, history, ts):
+        """The (ts, odds, line) to measure a move from
+        
+        Without a window that's the previous price. With one it's the price
+        in effect when the window opened, or the oldest known price if the
+        series is younger than the window.
+        """
+        
+        if len(history) < 2:
+            return None
+        if not self.window:
+            return history[-2]
+        
+        start = ts - self.window
+        reference = history[0]
+        for entry in history:
+            if entry[0] > start:
+                break
+            reference = entry
+        return reference
+    
+    def alert_key(self, series):
+        """What the cooldown is tracked per; one book's (game_id, book, market, side) by default"""
+        return series
+    
+    def check(self, change, history):
+        raise NotImplementedError
+
+
+class OddsMove(Rule):
+    default_markets = ('moneyline', 'pointspread', 'totals')
+    
+    def __init__(self, name, cents=None, percent=None, **filters):
+        super().__init__(name, **filters)
+        if cents is None and percent is None:
+            raise ValueError(f"OddsMove rule {name} needs cents or percent")
+        self.cents = cents
+        self.percent = percent
+    
+    def check(self, change, history):
+        ref = self.reference(history, change.ts)
+        if ref is None or ref[1] is None or change.new_odds is None:
+            return None
+        
+        old, new = ref[1], change.new_odds
+        if self.cents is not None and abs(odds_cents(new) - odds_cents(old)) >= self.cents:
+            return f"odds {old:+g} -> {new:+g} ({odds_cents(new) - odds_cents(old):+g}c)"
+        if self.percent is not None:
+            old_prob, new_prob = implied_prob(old), implied_prob(new)
+            if old_prob and new_prob:
+                moved = (new_prob - old_prob) / old_prob * 100
+                if abs(moved) >= self.percent:
+                    return f"odds {old:+g} -> {new:+g} ({moved:+.1f}% implied)"
+        return None
+
+
+class LineMove(Rule):
+    default_markets = ('pointspread', 'totals')
+    
+    def __init__(self, name, points=0.5, **filters):
+        super().__init__(name, **filters)
+        self.points = points
+    
+    def check(self, change, history):
+        ref = self.reference(history, change.ts)
+        if ref is None or ref[2] is None or change.new_line is None:
+            return None
+        if abs(change.new_line - ref[2]) >= self.points:
+            return f"line {ref[2]:g} -> {change.new_line:g}"
+        return None
+
+
+class KeyNumberCross(Rule):
+    default_markets = ('totals',)
+    
+    def __init__(self, name, keys=TOTAL_KEY_NUMBERS, **filters):
+        super().__init__(name, **filters)
+        self.keys = tuple(sorted(keys))
+    
+    def check(self, change, history):
+        old, new = change.old_line, change.new_line
+        if old is None or new is None or old == new:
+            return None
+        low, high = min(old, new), max(old, new)
+        # Crossing or landing on the key counts; leaving it doesn't
+        crossed = [key for key in self.keys if low < key <= high] if new > old else \
+                  [key for key in self.keys if low <= key < high]
+        if crossed:
+            return f"line {old:g} -> {new:g} through key {', '.join(f'{key:g}' for key in crossed)}"
+        return None
+
+
+class Steam(Rule):
+    """Same game, market and side moving the same direction at several books"""
+    
+    def __init__(self, name, min_books=3, minutes=5, cents=5, **filters):
+        super().__init__(name, minutes=minutes, **filters)
+        self.min_books = min_books
+        self.cents = cents
+        self.moves = defaultdict(deque)  # (game_id, market, side) -> deque of (ts, book, direction)
+    
+    def alert_key(self, series):
+        game_id, _, market, side = series
+        return game_id, market, side
+    
+    def check(self, change, history):
+        if change.old_odds is None or change.new_odds is None:
+            return None
+        moved = odds_cents(change.new_odds) - odds_cents(change.old_odds)
+        if abs(moved) < self.cents:
+            return None
+        
+        direction = 1 if moved > 0 else -1
+        moves = self.moves[(change.game_id, change.market, change.side)]
+        moves.append((change.ts, change.book, direction))
+        while moves and moves[0][0] < change.ts - self.window:
+            moves.popleft()
+        
+        books = {book for _, book, move_direction in moves if move_direction == direction}
+        if len(books) >= self.min_books:
+            return f"steam {'up' if direction > 0 else 'down'} at {len(books)} books: {', '.join(sorted(books))}"
+        return None
+
+
+RULE_TYPES = {
+    'odds_move': OddsMove,
+    'line_move': LineMove,
+    'key_number': KeyNumberCross,
+    'steam': Steam,
+}
+
+
+def load_rules(path):
+    """Rules from a JSON list of {"type": ..., "name": ..., **parameters}"""
+    
+    with open(path, encoding='utf-8') as f:
+        specs = json.load(f)
+    
+    rules = []
+    for spec in specs:
+        spec = dict(spec)
+        rule_type = spec.pop('type')
+        if rule_type not in RULE_TYPES:
+            raise ValueError(f"Unknown alert rule type: {rule_type}")
+        rules.append(RULE_TYPES[rule_type](**spec))
+    return rules
+
+
+class StdoutSink:
+    def emit(self, alerts):
+        for alert in alerts:
+            print(f"🚨 [{alert.rule}] {alert.game_id} {alert.book} {alert.market} {alert.side}: {alert.message}")
+
+
+class JsonlSink:
+    def __init__(self, path):
+        self.path = path
+    
+    def emit(self, alerts):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            for alert in alerts:
+                f.write(json.dumps(alert._asdict(), separators=(',', ':')) + '\n')
+
+
+class WebhookSink:
+    """POST each poll's alerts as one JSON list from a background thread"""
+    
+    def __init__(self, url, timeout=5, session=None):
+        self.url = url
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        self.pending = queue.Queue()
+        threading.Thread(target=self._run, daemon=True).start()
+    
+    def emit(self, alerts):
+        self.pending.put([alert._asdict() for alert in alerts])
+    
+    def _run(self):
+        while True:
+            batch = self.pending.get()
+            try:
+                self.session.post(self.url, json=batch, timeout=self.timeout)
+            except Exception as e:
+                print(f"⚠️ Alert webhook failed: {e}")
+
+
+class AlertEngine:
+    """Evaluate rules against each poll's changed prices and fan alerts out to sinks"""
+    
+    def __init__(self, rules=(), sinks=()):
+        self.rules = []
+        self.sinks = list(sinks)
+        self.history = {}      # (game_id, book, market, side) -> deque of (ts, odds, line)
+        self.last_fired = {}   # (rule name, series) -> ts
+        self.tracker = LineDeltaTracker()
+        self.history_window = 0
+        self._index = {}
+        for rule in rules:
+            self.add_rule(rule)
+    
+    def add_rule(self, rule):
+        self.rules.append(rule)
+        self._index = {}
+        self.history_window = max(rule.window for rule in self.rules)
+    
+    def rules_for(self, market, book):
+        """Rules that apply to a market and book, built once per pair"""
+        
+        key = (market, book)
+        rules = self._index.get(key)
+        if rules is None:
+            rules = self._index[key] = [
+                rule for rule in self.rules
+                if (rule.markets is None or market in rule.markets)
+                and (rule.books is None or book in rule.books)
+            ]
+        return rules
+    
+    def feed(self, lines, ts, phase='current'):
+        """Diff one poll's long-format lines and process the changes"""
+        
+        return self.process(self.tracker.update(lines, ts, phase))
+    
+    def process(self, changes):
+        """Evaluate the rules for every changed price; returns (and emits) the alerts"""
+        
+        alerts = []
+        for change in changes:
+            ts = to_timestamp(change.ts)
+            change = change._replace(ts=ts)
+            series = (change.game_id, change.book, change.market, change.side)
+            
+            history = self.history.get(series)
+            if history is None:
+                history = self.history[series] = deque()
+            history.append((ts, change.new_odds, change.new_line))
+            # Keep the last price from before the longest window; it's that rule's reference
+            while len(history) > 2 and history[1][0] <= ts - self.history_window:
+                history.popleft()
+            
+            # A first sighting has nothing to compare against
+            if change.old_odds is None and change.old_line is None:
+                continue
+            
+            for rule in self.rules_for(change.market, change.book):
+                if rule.game_ids is not None and change.game_id not in rule.game_ids:
+                    continue
+                message = rule.check(change, history)
+                if message is None:
+                    continue
+                
+                fired_key = (rule.name, rule.alert_key(series))
+                last = self.last_fired.get(fired_key)
+                if last is not None and ts - last < rule.cooldown:
+                    continue
+                self.last_fired[fired_key] = ts
+                
+                alerts.append(Alert(ts, rule.name, change.game_id, change.book, change.market,
+                                    change.side, message, change.old_odds, change.old_line,
+                                    change.new_odds, change.new_line))
+        
+        if alerts:
+            for sink in self.sinks:
+                sink.emit(alerts)
+        return alerts
@@ -0,0 +1,75 @@
+"""
+Server-side downsampling of line-movement history for charts
+
+Uses Largest-Triangle-Three-Buckets (LTTB), which keeps the points that
+define a series' visual shape (spikes, steps, reversals) while cutting a
+season of 5-minute polls down to a few hundred points per line.
+"""
+
+import numpy as np
+import pandas as pd
+
+# (chart title, market, value column) for the per-game line movement view
+HISTORY_CHARTS = (
+    ("Moneyline", 'moneyline', 'odds'),
+    ("Run Line Odds", 'pointspread', 'odds'),
+    ("Total", 'totals', 'line'),
+)
+
+
+def lttb_indices(x, y, threshold):
+    """Indices of the points LTTB keeps when reducing (x, y) to `threshold` points"""
+    
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    
+    # First and last points are always kept; the rest is split into buckets
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    previous = 0
+    
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        if bucket + 2 < len(edges):
+            next_start, next_end = edges[bucket + 1], edges[bucket + 2]
+        else:
+            next_start, next_end = n - 1, n
+        
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        
+        # Pick the point forming the largest triangle with the previous pick
+        # and the next bucket's average
+        areas = np.abs((x[previous] - avg_x) * (y[start:end] - y[previous])
+                       - (x[previous] - x[start:end]) * (avg_y - y[previous]))
+        previous = start + int(np.argmax(areas)) if end > start else start
+        selected[bucket + 1] = previous
+    
+    return selected
+
+
+def downsample_history(history, market, value_column, max_points=300):
+    """One market's history as long-format (time, side, value) rows, LTTB-reduced per side"""
+    
+    rows = history[(history['market'] == market) & history[value_column].notna()]
+    frames = []
+    
+    for side, series in rows.groupby('side', sort=True):
+        series = series.sort_values('snapshot_ts')
+        keep = lttb_indices(series['snapshot_ts'].to_numpy(), series[value_column].to_numpy(), max_points)
+        kept = series.iloc[keep]
+        frames.append(pd.DataFrame({
+            'time': pd.to_datetime(kept['snapshot_ts'], unit='s', utc=True),
+            'side': side,
+            'value': kept[value_column].astype(float).to_numpy(),
+        }))
+    
+    if not frames:
+        return pd.DataFrame(columns=['time', 'side', 'value'])
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,164 @@
+"""
+Incremental line-change recording between polls
+
+LineDeltaTracker remembers the last price per (game_id, book, market,
+side) and turns each poll into just the prices that moved. DeltaLog
+persists those changes as JSON lines with a full keyframe of each date
+every N polls of it, so the state at any timestamp is each date's
+nearest earlier keyframe plus the deltas after it.
+"""
+
+import json
+import os
+from collections import namedtuple
+
+LineChange = namedtuple('LineChange', [
+    'ts', 'game_id', 'book', 'market', 'side', 'old_odds', 'old_line', 'new_odds', 'new_line'])
+
+
+def iter_prices(lines, phase='current'):
+    """Yield ((game_id, book, market, side), (odds, line)) from long-format line columns"""
+    
+    rows = zip(lines['game_id'], lines['book'], lines['market'], lines['side'],
+               lines['phase'], lines['odds'], lines['line'])
+    for game_id, book, market, side, row_phase, odds, line in rows:
+        if row_phase == phase:
+            yield (str(game_id), book, market, side), (odds, line)
+
+
+class LineDeltaTracker:
+    """Last known price per series; update() returns only what changed"""
+    
+    def __init__(self):
+        self.state = {}
+    
+    def update(self, lines, ts, phase='current'):
+        """Apply one poll and return a LineChange for every new or moved price"""
+        
+        changes = []
+        state = self.state
+        
+        for key, price in iter_prices(lines, phase):
+            old = state.get(key)
+            if old == price:
+                continue
+            state[key] = price
+            old_odds, old_line = old if old is not None else (None, None)
+            changes.append(LineChange(ts, *key, old_odds, old_line, *price))
+        
+        return changes
+
+
+def split_by_date(lines):
+    """{date: long-format line columns} for the rows of each date in lines"""
+    
+    dates = set(lines['date'])
+    if len(dates) <= 1:
+        # A single page's poll: nothing to split
+        return {date_str: lines for date_str in dates}
+    
+    columns = list(lines)
+    date_index = columns.index('date')
+    by_date = {}
+    for row in zip(*(lines[column] for column in columns)):
+        date_lines = by_date.get(row[date_index])
+        if date_lines is None:
+            date_lines = by_date[row[date_index]] = {column: [] for column in columns}
+        for column, value in zip(columns, row):
+            date_lines[column].append(value)
+    return by_date
+
+
+class DeltaLog:
+    """Append-only JSONL file of keyframes and deltas, kept per date
+    
+    Every entry covers one date. A date's keyframe holds only that date's
+    prices, and a date stops getting keyframes once it is no longer
+    polled, so finished slates aren't rewritten for the rest of the
+    season.
+    """
+    
+    def __init__(self, path, keyframe_every=12):
+        self.path = path
+        self.keyframe_every = max(1, keyframe_every)
+        self.trackers = {}              # date -> LineDeltaTracker
+        self.polls_since_keyframe = {}  # date -> polls since that date's last keyframe
+    
+    def record(self, lines, ts, phase='current'):
+        """Record one poll; returns the LineChanges it produced"""
+        
+        changes = []
+        entries = []
+        
+        for date_str, date_lines in split_by_date(lines).items():
+            tracker = self.trackers.get(date_str)
+            if tracker is None:
+                tracker = self.trackers[date_str] = LineDeltaTracker()
+            date_changes = tracker.update(date_lines, ts, phase)
+            changes.extend(date_changes)
+            
+            polls = self.polls_since_keyframe.get(date_str)
+            if polls is None or polls + 1 >= self.keyframe_every:
+                entries.append({'type': 'keyframe', 'ts': ts, 'date': date_str,
+                                'prices': [[*key, *price] for key, price in tracker.state.items()]})
+                self.polls_since_keyframe[date_str] = 0
+            else:
+                # Only the new values are written; the old ones are already in the log
+                self.polls_since_keyframe[date_str] = polls + 1
+                if date_changes:
+                    entries.append({'type': 'delta', 'ts': ts, 'date': date_str,
+                                    'prices': [[c.game_id, c.book, c.market, c.side, c.new_odds, c.new_line]
+                                               for c in date_changes]})
+        
+        if entries:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                for entry in entries:
+                    f.write(json.dumps(entry, separators=(',', ':')) + '\n')
+        
+        return changes
+
+
+def reconstruct(path, at_ts):
+    """State {(game_id, book, market, side): (odds, line)} as of at_ts from a DeltaLog file"""
+    
+    states = {}  # date -> that date's prices; logs from before per-date entries use None
+    if not os.path.exists(path):
+        return {}
+    
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            entry = json.loads(line)
+            if entry['ts'] > at_ts:
+                break
+            state = states.setdefault(entry.get('date'), {})
+            if entry['type'] == 'keyframe':
+                state.clear()
+            for game_id, book, market, side, odds, price_line in entry['prices']:
+                state[(game_id, book, market, side)] = (odds, price_line)
+    
+    merged = {}
+    for state in states.values():
+        merged.update(state)
+    return merged
+
+
+def storage_report(polls, path, keyframe_every=12):
+    """Replay (ts, lines) polls into a fresh DeltaLog and compare against full snapshots
+    
+    Returns (full snapshot bytes, delta log bytes, total changes).
+    """
+    
+    if os.path.exists(path):
+        os.remove(path)
+    
+    log = DeltaLog(path, keyframe_every)
+    full_bytes = 0
+    total_changes = 0
+    
+    for ts, lines in polls:
+        snapshot = {'ts': ts, 'prices': [[*key, *price] for key, price in iter_prices(lines)]}
+        full_bytes += len(json.dumps(snapshot, separators=(',', ':'))) + 1
+        total_changes += len(log.record(lines, ts))
+    
+    delta_bytes = os.path.getsize(path) if os.path.exists(path) else 0
+    return full_bytes, delta_bytes, total_changes
@@ -0,0 +1,197 @@
+"""
+Materialized per-series line-movement aggregates and closing line value
+
+For every (game_id, book, market, side) in the snapshot store this keeps
+one row in line_aggregates: open, close, max, min, number of moves and the
+largest price and line moves with their times. refresh() folds in only
+the snapshot rows added since the last refresh, so dashboards and reports
+read this small table instead of scanning the raw history.
+
+Odds moves are measured in cents on the American scale, where -100 and
++100 are the same price (so -105 -> +105 is a 10 cent move). Line moves
+are in points of spread or total, so a total going 8.5 -> 9 at an
+unchanged -110 is a 0.5 line move.
+"""
+
+import numpy as np
+import pandas as pd
+
+from odds_analytics import american_to_prob
+
+AGGREGATE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS line_aggregates (
+    game_id TEXT NOT NULL,
+    book TEXT NOT NULL,
+    market TEXT NOT NULL,
+    side TEXT NOT NULL,
+    date TEXT NOT NULL,
+    open_ts REAL, open_odds INTEGER, open_line REAL,
+    close_ts REAL, close_odds INTEGER, close_line REAL,
+    max_odds INTEGER, min_odds INTEGER,
+    max_line REAL, min_line REAL,
+    n_moves INTEGER NOT NULL DEFAULT 0,
+    largest_move REAL NOT NULL DEFAULT 0,
+    largest_move_ts REAL,
+    largest_line_move REAL NOT NULL DEFAULT 0,
+    largest_line_move_ts REAL,
+    PRIMARY KEY (game_id, book, market, side)
+);
+CREATE INDEX IF NOT EXISTS idx_line_aggregates_date ON line_aggregates (date);
+CREATE TABLE IF NOT EXISTS line_aggregates_progress (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    last_rowid INTEGER NOT NULL
+);
+"""
+
+AGGREGATE_COLUMNS = (
+    'game_id', 'book', 'market', 'side', 'date',
+    'open_ts', 'open_odds', 'open_line', 'close_ts', 'close_odds', 'close_line',
+    'max_odds', 'min_odds', 'max_line', 'min_line',
+    'n_moves', 'largest_move', 'largest_move_ts', 'largest_line_move', 'largest_line_move_ts',
+)
+
+
+def odds_cents(odds):
+    """American odds on a continuous scale: -105 -> -5, +105 -> +5"""
+    
+    return odds + 100 if odds < 0 else odds - 100
+
+
+def _bound(current, value, pick):
+    if value is None:
+        return current
+    return value if current is None else pick(current, value)
+
+
+def fold_row(agg, ts, date_str, key, odds, line):
+    """Fold one snapshot row into an aggregate dict (None starts a new series)"""
+    
+    if agg is None:
+        return dict(zip(AGGREGATE_COLUMNS, (
+            *key, date_str, ts, odds, line, ts, odds, line,
+            odds, odds, line, line, 0, 0.0, None, 0.0, None)))
+    
+    if ts < agg['open_ts']:
+        # A late row from before the recorded open becomes the new open
+        agg['open_ts'], agg['open_odds'], agg['open_line'] = ts, odds, line
+    elif ts >= agg['close_ts']:
+        if (odds, line) != (agg['close_odds'], agg['close_line']):
+            agg['n_moves'] += 1
+            if odds is not None and agg['close_odds'] is not None:
+                move = abs(odds_cents(odds) - odds_cents(agg['close_odds']))
+                if move > agg['largest_move']:
+                    agg['largest_move'], agg['largest_move_ts'] = float(move), ts
+            if line is not None and agg['close_line'] is not None:
+                line_move = abs(line - agg['close_line'])
+                if line_move > agg['largest_line_move']:
+                    agg['largest_line_move'], agg['largest_line_move_ts'] = float(line_move), ts
+        agg['close_ts'], agg['close_odds'], agg['close_line'] = ts, odds, line
+    
+    agg['max_odds'] = _bound(agg['max_odds'], odds, max)
+    agg['min_odds'] = _bound(agg['min_odds'], odds, min)
+    agg['max_line'] = _bound(agg['max_line'], line, max)
+    agg['min_line'] = _bound(agg['min_line'], line, min)
+    return agg
+
+
+class LineMovementAggregates:
+    """Incrementally maintained line_aggregates table inside a SnapshotStore's database"""
+    
+    def __init__(self, store):
+        self.store = store
+        with store.transaction() as conn:
+            conn.executescript(AGGREGATE_SCHEMA)
+            columns = {row[1] for row in conn.execute('PRAGMA table_info(line_aggregates)')}
+            if 'largest_line_move' not in columns:
+                # A table from before line moves were tracked: add the columns and
+                # rebuild every aggregate from the snapshots on the next refresh
+                conn.execute('ALTER TABLE line_aggregates ADD COLUMN largest_line_move REAL NOT NULL DEFAULT 0')
+                conn.execute('ALTER TABLE line_aggregates ADD COLUMN largest_line_move_ts REAL')
+                conn.execute('DELETE FROM line_aggregates')
+                conn.execute('DELETE FROM line_aggregates_progress')
+    
+    def _last_rowid(self, conn):
+        row = conn.execute('SELECT last_rowid FROM line_aggregates_progress WHERE id = 1').fetchone()
+        return row[0] if row else 0
+    
+    def refresh(self):
+        """Fold snapshot rows added since the last refresh; returns how many were applied"""
+        
+        with self.store.transaction() as conn:
+            rows = self.store.rows_since(self._last_rowid(conn))
+            if not rows:
+                return 0
+            
+            # Load only the aggregates of dates touched by the new rows
+            dates = sorted({row[2] for row in rows})
+            placeholders = ','.join('?' * len(dates))
+            existing = conn.execute(
+                f'SELECT {", ".join(AGGREGATE_COLUMNS)} FROM line_aggregates WHERE date IN ({placeholders})',
+                dates).fetchall()
+            aggregates = {tuple(row[:4]): dict(zip(AGGREGATE_COLUMNS, row)) for row in existing}
+            
+            changed = set()
+            for _, ts, date_str, game_id, book, market, side, odds, line in rows:
+                key = (game_id, book, market, side)
+                aggregates[key] = fold_row(aggregates.get(key), ts, date_str, key, odds, line)
+                changed.add(key)
+            
+            conn.executemany(
+                f'INSERT OR REPLACE INTO line_aggregates ({", ".join(AGGREGATE_COLUMNS)}) '
+                f'VALUES ({",".join("?" * len(AGGREGATE_COLUMNS))})',
+                [tuple(aggregates[key][column] for column in AGGREGATE_COLUMNS) for key in changed])
+            conn.execute(
+                'INSERT OR REPLACE INTO line_aggregates_progress (id, last_rowid) VALUES (1, ?)',
+                (max(row[0] for row in rows),))
+        
+        return len(rows)
+    
+    def game(self, game_id):
+        """Aggregates for every series of one game"""
+        
+        return self.store.query('SELECT * FROM line_aggregates WHERE game_id = ? ORDER BY book, market, side',
+                           [str(game_id)])
+    
+    def dates(self, start_date, end_date, book=None):
+        """Aggregates for games dated start_date..end_date"""
+        
+        sql = 'SELECT * FROM line_aggregates WHERE date BETWEEN ? AND ?'
+        params = [start_date, end_date]
+        if book is not None:
+            sql += ' AND book = ?'
+            params.append(book)
+        return self.store.query(sql + ' ORDER BY date, game_id, book, market, side', params)
+    
+    def clv(self, game_id, book, market, side, bet_odds):
+        """Closing line value of a bet at bet_odds against the stored close, or None"""
+        
+        row = self.store.query(
+            'SELECT close_odds FROM line_aggregates WHERE game_id = ? AND book = ? AND market = ? AND side = ?',
+            [str(game_id), book, market, side])
+        if row.empty or pd.isna(row['close_odds'].iloc[0]):
+            return None
+        
+        clv_prob, clv_pct = closing_line_value([bet_odds], [row['close_odds'].iloc[0]])
+        return {'close_odds': int(row['close_odds'].iloc[0]), 'clv_prob': float(clv_prob[0]),
+                'clv_pct': float(clv_pct[0])}
+
+
+def american_to_decimal(odds):
+    """Decimal odds for American odds arrays (NaN for missing)"""
+    
+    return 1 / american_to_prob(np.asarray(odds, dtype=np.float64))
+
+
+def closing_line_value(bet_odds, close_odds):
+    """Vectorized CLV of bets against closing prices
+    
+    Returns (clv_prob, clv_pct): the closing implied probability minus the
+    bet's, and the bet's decimal payout over the close's minus one. Both
+    are positive when the bet beat the close.
+    """
+    
+    bet_odds = np.asarray(bet_odds, dtype=np.float64)
+    close_odds = np.asarray(close_odds, dtype=np.float64)
+    clv_prob = american_to_prob(close_odds) - american_to_prob(bet_odds)
+    clv_pct = american_to_decimal(bet_odds) / american_to_decimal(close_odds) - 1
+    return clv_prob, clv_pct
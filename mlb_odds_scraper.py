@@ -1,23 +1,64 @@
+import os
 import requests
-import re
-import json
-import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ContentDecodingError
+from urllib3.util.request import ACCEPT_ENCODING
+from game_join import join_game_rows, missing_sources
+from next_data import CHUNK_SIZE, extract_next_data, load_game_rows
+from odds_table import (extract_game_lines, extract_page_lines, index_book_lines,
+                        lines_frame, new_line_columns, wide_book_columns)
+from game_record import GameRecord, games_frame
+from pipeline_metrics import MeteredChunks, PipelineMetrics
+
+BET_TYPES = ('moneyline', 'pointspread', 'totals')
+DEFAULT_BASE_URL = "https://www.sportsbookreview.com/betting-odds/mlb-baseball"
+# Reading past __NEXT_DATA__ keeps the keep-alive connection poolable;
+# a body with more than this left is cheaper to abandon than to read
+DRAIN_LIMIT = 256 * 1024
+DECODABLE_ENCODINGS = frozenset(ACCEPT_ENCODING.split(','))
+
+
+def is_decodable(content_encoding):
+    """True if urllib3 can decode a Content-Encoding (no encoding counts as decodable)"""
+    
+    codings = [coding.strip().lower() for coding in (content_encoding or '').split(',') if coding.strip()]
+    return all(coding in DECODABLE_ENCODINGS or coding == 'identity' for coding in codings)
+
 
 class ComprehensiveMLBScraper:
     """
     Comprehensive MLB scraper that gets moneyline, run line, and totals
     """
     
-    def __init__(self):
+    def __init__(self, max_workers=6, cache=None, compressed=False, metrics=None, quiet=False,
+                 base_url=None, archive=None):
         self.session = requests.Session()
-        self.base_url = "https://www.sportsbookreview.com/betting-odds/mlb-baseball"
+        # SBR_BASE_URL points every scraper at a replay.py server instead of the live site
+        self.base_url = (base_url or os.environ.get('SBR_BASE_URL') or DEFAULT_BASE_URL).rstrip('/')
+        self.max_workers = max(1, max_workers)
+        self.cache = cache  # optional http_cache.ResponseCache
+        self.compressed = compressed
+        self.identity_bet_types = set()  # bet types whose compressed responses broke
+        self.metrics = metrics if metrics is not None else PipelineMetrics()
+        self.quiet = quiet  # skip progress and per-game output; errors still print
+        self.archive = archive  # optional payload_archive.PayloadArchive for every fetched payload
+        self.setup_connection_pool()
         self.setup_working_headers()
     
+    def setup_connection_pool(self):
+        """Size the connection pool so every worker gets its own keep-alive socket"""
+        adapter = HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.max_workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+    
     def setup_working_headers(self):
-        """Setup headers that work (no compression)"""
+        """Setup headers that work (no compression unless compressed=True)"""
         self.session.headers.update({
-            'Accept-Encoding': 'identity',  # No compression - this is the key!
+            # No compression by default - this is the key! Compressed mode only
+            # advertises encodings urllib3 can actually decode here
+            'Accept-Encoding': ACCEPT_ENCODING if self.compressed else 'identity',
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.9',
@@ -25,8 +66,13 @@ class ComprehensiveMLBScraper:
             'Cache-Control': 'no-cache'
         })
     
-    def scrape_bet_type(self, date_str, bet_type):
-        """Scrape specific bet type (moneyline, pointspread, totals)"""
+    def log(self, message):
+        """Progress output, silenced in quiet mode"""
+        if not self.quiet:
+            print(message)
+    
+    def bet_type_url(self, date_str, bet_type):
+        """SBR page URL for a bet type on a date (moneyline for unknown bet types)"""
         
         bet_type_urls = {
             'moneyline': f"{self.base_url}/?date={date_str}",
@@ -34,233 +80,371 @@ class ComprehensiveMLBScraper:
             'totals': f"{self.base_url}/totals/full-game/?date={date_str}"
         }
         
-        url = bet_type_urls.get(bet_type, bet_type_urls['moneyline'])
+        return bet_type_urls.get(bet_type, bet_type_urls['moneyline'])
+    
+    def download_page(self, date_str, bet_type):
+        """Download a page's raw body for offline or out-of-process parsing"""
         
-        print(f"🌐 Scraping {bet_type} for {date_str}: {url}")
+        url = self.bet_type_url(date_str, bet_type)
         
         try:
             response = self.session.get(url, timeout=30)
+        except Exception as e:
+            print(f"💥 Error downloading {bet_type} for {date_str}: {e}")
+            return None
+        
+        if response.status_code != 200:
+            print(f"❌ Bad status code for {bet_type}: {response.status_code}")
+            return None
+        
+        return response.content
+    
+    def scrape_bet_type(self, date_str, bet_type):
+        """Scrape specific bet type (moneyline, pointspread, totals)"""
+        
+        url = self.bet_type_url(date_str, bet_type)
+        
+        self.log(f"🌐 Scraping {bet_type} for {date_str}: {url}")
+        
+        try:
+            payload, content_hash = self.fetch_payload(url, date_str, bet_type)
             
-            if response.status_code != 200:
-                print(f"❌ Bad status code for {bet_type}: {response.status_code}")
-                return None
-            
-            # Extract __NEXT_DATA__
-            pattern = r'<script id="__NEXT_DATA__" type="application/json">(.*?)</script>'
-            match = re.search(pattern, response.text, re.DOTALL)
-            
-            if not match:
-                print(f"❌ No __NEXT_DATA__ found for {bet_type}")
+            if payload is None:
                 return None
             
-            json_data = json.loads(match.group(1))
+            # Unchanged content: reuse the rows parsed last time
+            if self.cache is not None and content_hash:
+                game_rows = self.cache.parsed_rows(url, content_hash)
+                if game_rows is not None:
+                    self.metrics.inc('cache_hits_total', bet_type=bet_type, kind='parsed_rows')
+                    self.log(f"♻️ Unchanged {bet_type} page, reusing {len(game_rows)} parsed games")
+                    return game_rows
             
-            # Extract odds data
+            # Extract odds data (only props.pageProps.oddsTables is decoded)
             try:
-                odds_tables = json_data['props']['pageProps']['oddsTables']
-                if not odds_tables:
+                with self.metrics.timer('decode_seconds', bet_type=bet_type):
+                    game_rows = load_game_rows(payload)
+                if game_rows is None:
+                    self.metrics.inc('fetch_errors_total', bet_type=bet_type, reason='no_odds_tables')
                     return None
                 
-                odds_table_model = odds_tables[0]['oddsTableModel']
-                game_rows = odds_table_model.get('gameRows', [])
+                if self.cache is not None and content_hash:
+                    self.cache.remember_rows(url, content_hash, game_rows)
                 
-                print(f"✅ Found {len(game_rows)} games for {bet_type}")
+                self.metrics.inc('games_parsed_total', len(game_rows), bet_type=bet_type)
+                self.log(f"✅ Found {len(game_rows)} games for {bet_type}")
                 return game_rows
                 
             except KeyError as e:
+                self.metrics.inc('fetch_errors_total', bet_type=bet_type, reason='structure')
                 print(f"❌ JSON structure error for {bet_type}: {e}")
                 return None
                 
         except Exception as e:
+            self.metrics.inc('fetch_errors_total', bet_type=bet_type, reason='exception')
             print(f"💥 Error scraping {bet_type}: {e}")
             return None
     
+    def fetch_payload(self, url, date_str, bet_type):
+        """Return (__NEXT_DATA__ bytes, content hash) for a page, using the cache when enabled"""
+        
+        entry = self.cache.get(url) if self.cache is not None else None
+        
+        if entry and self.cache.is_fresh(entry):
+            self.metrics.inc('cache_hits_total', bet_type=bet_type, kind='fresh')
+            self.log(f"💾 Cache hit for {bet_type} ({date_str})")
+            return entry['payload'], entry['content_hash']
+        
+        headers = self.cache.conditional_headers(entry) if entry else {}
+        
+        use_identity = not self.compressed or bet_type in self.identity_bet_types
+        if use_identity:
+            headers['Accept-Encoding'] = 'identity'
+        
+        try:
+            status, payload, response_headers = self.download_payload(url, headers, bet_type)
+            # A 200 in an encoding urllib3 can't decode scans as having no __NEXT_DATA__
+            unreadable = (status == 200 and payload is None and not use_identity
+                          and not is_decodable(response_headers.get('Content-Encoding')))
+        except ContentDecodingError as e:
+            if use_identity:
+                raise
+            print(f"⚠️ Could not decode compressed {bet_type} body: {e}")
+            unreadable = True
+        
+        # A compressed page that can't be read is the old breakage; switch
+        # just this bet type back to identity and try again. Error statuses
+        # and pages that decode fine but lack __NEXT_DATA__ don't count.
+        if unreadable:
+            print(f"⚠️ Compressed {bet_type} response was unreadable, falling back to identity")
+            self.metrics.inc('fetch_errors_total', bet_type=bet_type, reason='content_decoding')
+            self.identity_bet_types.add(bet_type)
+            headers['Accept-Encoding'] = 'identity'
+            status, payload, response_headers = self.download_payload(url, headers, bet_type)
+        
+        if status == 304 and entry:
+            self.metrics.inc('cache_hits_total', bet_type=bet_type, kind='not_modified')
+            self.log(f"💾 {bet_type} not modified since last fetch")
+            self.cache.revalidated(entry)
+            return entry['payload'], entry['content_hash']
+        
+        if status != 200:
+            self.metrics.inc('fetch_errors_total', bet_type=bet_type, reason=f'status_{status}')
+            print(f"❌ Bad status code for {bet_type}: {status}")
+            return None, None
+        
+        if payload is None:
+            self.metrics.inc('fetch_errors_total', bet_type=bet_type, reason='no_next_data')
+            print(f"❌ No __NEXT_DATA__ found for {bet_type}")
+            return None, None
+        
+        # Only fresh downloads are archived; cache hits and 304s were archived when first fetched
+        if self.archive is not None:
+            self.archive.append(date_str, bet_type, payload)
+        
+        if self.cache is None:
+            return payload, None
+        
+        entry = self.cache.store(url, date_str, payload, response_headers)
+        return payload, entry['content_hash']
+    
+    def download_payload(self, url, headers, bet_type='page'):
+        """GET a page and return (status, __NEXT_DATA__ bytes or None, response headers)
+        
+        The body is streamed and decompressed chunk by chunk when the server
+        compresses it, and reading stops once __NEXT_DATA__ is complete.
+        Time waiting on the network and time scanning chunks are recorded
+        separately in self.metrics. Raises ContentDecodingError when a
+        compressed body can't be decoded.
+        """
+        
+        clock = self.metrics.clock
+        start = clock()
+        with self.session.get(url, timeout=30, stream=True, headers=headers) as response:
+            connect_time = clock() - start
+            if response.status_code != 200:
+                self.drain(response, response.iter_content(chunk_size=CHUNK_SIZE))
+                self.metrics.observe('fetch_seconds', clock() - start, bet_type=bet_type)
+                return response.status_code, None, response.headers
+            
+            chunks = MeteredChunks(response.iter_content(chunk_size=CHUNK_SIZE), clock)
+            scan_start = clock()
+            try:
+                payload = extract_next_data(chunks)
+            finally:
+                self.metrics.observe('extract_seconds', clock() - scan_start - chunks.wait, bet_type=bet_type)
+            self.drain(response, chunks)
+            
+            self.metrics.observe('fetch_seconds', connect_time + chunks.wait, bet_type=bet_type)
+            # raw.tell() counts bytes off the wire, before any gzip decoding
+            self.metrics.inc('bytes_received_total', response.raw.tell(), bet_type=bet_type)
+            self.metrics.inc('body_bytes_total', chunks.bytes, bet_type=bet_type)
+            return response.status_code, payload, response.headers
+    
+    @staticmethod
+    def drain(response, chunks, limit=DRAIN_LIMIT):
+        """Read the rest of a streamed body so urllib3 returns its connection to the pool
+        
+        Gives up (and lets the connection close) when more than limit
+        bytes are left, going by Content-Length when the server sent one.
+        """
+        
+        length = response.headers.get('Content-Length')
+        if length and length.isdigit() and int(length) - response.raw.tell() > limit:
+            return
+        drained = 0
+        try:
+            for chunk in chunks:
+                drained += len(chunk)
+                if drained > limit:
+                    return
+        except ContentDecodingError:
+            pass  # nothing more to read from it; the connection is dropped
+    
     def extract_fanduel_odds_from_game(self, game, bet_type):
         """Extract FanDuel odds from a game for specific bet type"""
         
-        opening_line_views = game.get('openingLineViews', [])
+        columns = extract_game_lines(game, bet_type, new_line_columns())
+        fanduel = index_book_lines(columns, 'fanduel')
         
         odds_data = {
             'opening': {},
             'current': {}
         }
         
-        # Find FanDuel data
-        for odds_view in opening_line_views:
-            if odds_view.get('sportsbook', '').lower() == 'fanduel':
-                opening_line = odds_view.get('openingLine', {})
-                current_line = odds_view.get('currentLine', {})
-                
-                if bet_type == 'moneyline':
-                    # Moneyline odds
-                    odds_data['opening'] = {
-                        'away_odds': opening_line.get('awayOdds'),
-                        'home_odds': opening_line.get('homeOdds')
-                    }
-                    odds_data['current'] = {
-                        'away_odds': current_line.get('awayOdds'),
-                        'home_odds': current_line.get('homeOdds')
-                    }
-                
-                elif bet_type == 'pointspread':
-                    # Run line (point spread)
-                    odds_data['opening'] = {
-                        'away_odds': opening_line.get('awayOdds'),
-                        'home_odds': opening_line.get('homeOdds'),
-                        'away_spread': opening_line.get('awaySpread'),
-                        'home_spread': opening_line.get('homeSpread')
-                    }
-                    odds_data['current'] = {
-                        'away_odds': current_line.get('awayOdds'),
-                        'home_odds': current_line.get('homeOdds'),
-                        'away_spread': current_line.get('awaySpread'),
-                        'home_spread': current_line.get('homeSpread')
-                    }
-                
-                elif bet_type == 'totals':
-                    # Over/Under totals
-                    odds_data['opening'] = {
-                        'over_odds': opening_line.get('overOdds'),
-                        'under_odds': opening_line.get('underOdds'),
-                        'total': opening_line.get('total')
-                    }
-                    odds_data['current'] = {
-                        'over_odds': current_line.get('overOdds'),
-                        'under_odds': current_line.get('underOdds'),
-                        'total': current_line.get('total')
-                    }
-                
-                break
+        # FanDuel is just a filter on the all-book lines
+        for (_, _, phase, side), (odds, line) in fanduel.items():
+            odds_data[phase][f'{side}_odds'] = odds
+            if bet_type == 'pointspread':
+                odds_data[phase][f'{side}_spread'] = line
+            elif bet_type == 'totals':
+                odds_data[phase]['total'] = line
         
         return odds_data
     
+    def fetch_pages(self, dates):
+        """Fetch every (date, bet_type) page, concurrently when max_workers > 1
+        
+        Returns a dict keyed by (date_str, bet_type) in date order, then
+        BET_TYPES order, regardless of which request finished first.
+        """
+        
+        tasks = [(date_str, bet_type) for date_str in dates for bet_type in BET_TYPES]
+        workers = min(self.max_workers, len(tasks))
+        
+        if workers <= 1:
+            results = [self.scrape_bet_type(date_str, bet_type) for date_str, bet_type in tasks]
+        else:
+            self.log(f"⚡ Fetching {len(tasks)} pages with {workers} workers")
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(lambda task: self.scrape_bet_type(*task), tasks))
+        
+        return dict(zip(tasks, results))
+    
     def scrape_date_all_bet_types(self, date_str):
         """Scrape all bet types for a specific date"""
         
-        print(f"\n📅 Scraping all bet types for {date_str}")
+        self.log(f"\n📅 Scraping all bet types for {date_str}")
+        
+        pages = self.fetch_pages([date_str])
+        return self.build_date_games(date_str, pages)
+    
+    def build_date_lines(self, date_str, pages, columns=None):
+        """Every book's opening and current lines for a date, as long-format columns"""
+        
+        if columns is None:
+            columns = new_line_columns()
+        
+        for bet_type in BET_TYPES:
+            extract_page_lines(date_str, bet_type, pages.get((date_str, bet_type)), columns)
+        
+        self.metrics.record_book_coverage(columns)
+        return columns
+    
+    def get_odds_lines(self, dates):
+        """Scrape the given dates and return all books' lines as a typed long-format DataFrame"""
+        
+        pages = self.fetch_pages(dates)
+        columns = new_line_columns()
+        for date_str in dates:
+            self.build_date_lines(date_str, pages, columns)
+        return lines_frame(columns)
+    
+    def build_date_games(self, date_str, pages, lines=None):
+        """Combine the fetched bet type pages for a date into per-game GameRecords
+        
+        lines can be passed in when the caller already built the date's
+        long-format lines, so the game rows aren't walked twice.
+        """
         
-        # Get data for all bet types
-        moneyline_games = self.scrape_bet_type(date_str, 'moneyline')
-        pointspread_games = self.scrape_bet_type(date_str, 'pointspread')
-        totals_games = self.scrape_bet_type(date_str, 'totals')
+        tables = {bet_type: pages.get((date_str, bet_type)) for bet_type in BET_TYPES}
         
-        if not moneyline_games:
-            print(f"❌ No moneyline data for {date_str}")
+        if not any(tables.values()):
+            print(f"❌ No odds data for {date_str}")
             return []
         
+        # Match rows across bet types by gameId, not by position
+        joined = join_game_rows(tables)
+        
+        if lines is None:
+            lines = self.build_date_lines(date_str, pages)
+        fanduel = index_book_lines(lines, 'fanduel')
+        
         processed_games = []
         
-        for i, ml_game in enumerate(moneyline_games):
+        for i, (game_id, sources) in enumerate(joined.items()):
             try:
-                # Extract basic game info from moneyline data
-                game_view = ml_game.get('gameView', {})
+                ml_game = sources.get('moneyline')
+                ps_game = sources.get('pointspread')
+                totals_game = sources.get('totals')
+                
+                # Extract basic game info, preferring the moneyline table
+                base_game = ml_game or ps_game or totals_game
+                game_view = base_game.get('gameView', {})
                 
                 away_team = game_view.get('awayTeam', {})
                 home_team = game_view.get('homeTeam', {})
                 
-                game_info = {
-                    'date': date_str,
-                    'game_id': game_view.get('gameId', f'game_{i}'),
-                    'game_time': game_view.get('startDate', 'TBD'),
-                    'away_team': away_team.get('name', 'Unknown'),
-                    'home_team': home_team.get('name', 'Unknown'),
-                    'status': game_view.get('status', 'Scheduled'),
-                    'venue': game_view.get('venueName', 'Unknown')
-                }
+                missing = missing_sources(sources, BET_TYPES)
+                if missing:
+                    self.metrics.inc('games_missing_source_total', len(missing))
                 
-                print(f"🎮 Game {i+1}: {game_info['away_team']} @ {game_info['home_team']}")
-                
-                # Extract moneyline odds
-                ml_odds = self.extract_fanduel_odds_from_game(ml_game, 'moneyline')
-                game_info.update({
-                    'ml_opening_away': ml_odds['opening'].get('away_odds'),
-                    'ml_opening_home': ml_odds['opening'].get('home_odds'),
-                    'ml_current_away': ml_odds['current'].get('away_odds'),
-                    'ml_current_home': ml_odds['current'].get('home_odds')
-                })
+                # FanDuel columns are a filter on the all-book lines table
+                game_info = GameRecord(
+                    date=date_str,
+                    game_id=game_id,
+                    game_time=game_view.get('startDate', 'TBD'),
+                    away_team=away_team.get('name', 'Unknown'),
+                    home_team=home_team.get('name', 'Unknown'),
+                    status=game_view.get('status', 'Scheduled'),
+                    venue=game_view.get('venueName', 'Unknown'),
+                    **wide_book_columns(fanduel, game_id)
+                )
+                processed_games.append(game_info)
                 
-                # Extract pointspread (run line) odds
-                if pointspread_games and i < len(pointspread_games):
-                    ps_odds = self.extract_fanduel_odds_from_game(pointspread_games[i], 'pointspread')
-                    game_info.update({
-                        'rl_opening_away_odds': ps_odds['opening'].get('away_odds'),
-                        'rl_opening_home_odds': ps_odds['opening'].get('home_odds'),
-                        'rl_opening_away_spread': ps_odds['opening'].get('away_spread'),
-                        'rl_opening_home_spread': ps_odds['opening'].get('home_spread'),
-                        'rl_current_away_odds': ps_odds['current'].get('away_odds'),
-                        'rl_current_home_odds': ps_odds['current'].get('home_odds'),
-                        'rl_current_away_spread': ps_odds['current'].get('away_spread'),
-                        'rl_current_home_spread': ps_odds['current'].get('home_spread')
-                    })
-                else:
-                    # Initialize with None if no pointspread data
-                    game_info.update({
-                        'rl_opening_away_odds': None, 'rl_opening_home_odds': None,
-                        'rl_opening_away_spread': None, 'rl_opening_home_spread': None,
-                        'rl_current_away_odds': None, 'rl_current_home_odds': None,
-                        'rl_current_away_spread': None, 'rl_current_home_spread': None
-                    })
+                # Per-game output is formatting work on every poll, so quiet skips it entirely
+                if self.quiet:
+                    continue
                 
-                # Extract totals odds
-                if totals_games and i < len(totals_games):
-                    total_odds = self.extract_fanduel_odds_from_game(totals_games[i], 'totals')
-                    game_info.update({
-                        'total_opening_line': total_odds['opening'].get('total'),
-                        'total_opening_over_odds': total_odds['opening'].get('over_odds'),
-                        'total_opening_under_odds': total_odds['opening'].get('under_odds'),
-                        'total_current_line': total_odds['current'].get('total'),
-                        'total_current_over_odds': total_odds['current'].get('over_odds'),
-                        'total_current_under_odds': total_odds['current'].get('under_odds')
-                    })
-                else:
-                    # Initialize with None if no totals data
-                    game_info.update({
-                        'total_opening_line': None, 'total_opening_over_odds': None, 'total_opening_under_odds': None,
-                        'total_current_line': None, 'total_current_over_odds': None, 'total_current_under_odds': None
-                    })
+                print(f"🎮 Game {i+1}: {game_info.away_team} @ {game_info.home_team}")
+                if missing:
+                    print(f"   ⚠️ No {', '.join(missing)} data for this game")
                 
                 # Show extracted data
-                ml_opening = f"{game_info['ml_opening_away']}/{game_info['ml_opening_home']}"
-                ml_current = f"{game_info['ml_current_away']}/{game_info['ml_current_home']}"
+                ml_opening = f"{game_info.ml_opening_away}/{game_info.ml_opening_home}"
+                ml_current = f"{game_info.ml_current_away}/{game_info.ml_current_home}"
                 
-                rl_opening = f"{game_info['rl_opening_away_spread']} ({game_info['rl_opening_away_odds']}/{game_info['rl_opening_home_odds']})"
-                rl_current = f"{game_info['rl_current_away_spread']} ({game_info['rl_current_away_odds']}/{game_info['rl_current_home_odds']})"
+                rl_opening = f"{game_info.rl_opening_away_spread} ({game_info.rl_opening_away_odds}/{game_info.rl_opening_home_odds})"
+                rl_current = f"{game_info.rl_current_away_spread} ({game_info.rl_current_away_odds}/{game_info.rl_current_home_odds})"
                 
-                total_opening = f"{game_info['total_opening_line']} (O:{game_info['total_opening_over_odds']}/U:{game_info['total_opening_under_odds']})"
-                total_current = f"{game_info['total_current_line']} (O:{game_info['total_current_over_odds']}/U:{game_info['total_current_under_odds']})"
+                total_opening = f"{game_info.total_opening_line} (O:{game_info.total_opening_over_odds}/U:{game_info.total_opening_under_odds})"
+                total_current = f"{game_info.total_current_line} (O:{game_info.total_current_over_odds}/U:{game_info.total_current_under_odds})"
                 
                 print(f"   💰 ML: {ml_opening} → {ml_current}")
                 print(f"   📈 RL: {rl_opening} → {rl_current}")
                 print(f"   🎯 Total: {total_opening} → {total_current}")
                 
-                processed_games.append(game_info)
-                
             except Exception as e:
+                self.metrics.inc('game_errors_total')
                 print(f"❌ Error processing game {i}: {e}")
                 continue
         
+        self.metrics.inc('games_built_total', len(processed_games))
         return processed_games
     
-    def get_today_tomorrow_games(self):
-        """Get complete data for today and tomorrow's games"""
+    def get_today_tomorrow_games(self, store=None):
+        """Get complete data for today and tomorrow's games
+        
+        Pass a snapshot_store.SnapshotStore to also record every book's
+        current lines from this poll.
+        """
         
         today = datetime.now().strftime("%Y-%m-%d")
         tomorrow = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
         
-        print(f"🗓️ Scraping comprehensive MLB data for {today} and {tomorrow}")
+        self.log(f"🗓️ Scraping comprehensive MLB data for {today} and {tomorrow}")
         
         all_games = []
         
+        # All six pages are in flight at once; rows are still built in date order
+        pages = self.fetch_pages([today, tomorrow])
+        snapshot_ts = datetime.now()
         for date_str in [today, tomorrow]:
-            games = self.scrape_date_all_bet_types(date_str)
+            self.log(f"\n📅 Processing all bet types for {date_str}")
+            lines = self.build_date_lines(date_str, pages)
+            games = self.build_date_games(date_str, pages, lines)
             all_games.extend(games)
+            
+            if store is not None:
+                written = store.append(lines, snapshot_ts)
+                self.log(f"🗃️ Recorded {written} lines for {date_str} in {store.path}")
         
         if all_games:
-            df = pd.DataFrame(all_games)
-            print(f"\n🎉 SUCCESS! Found {len(df)} games with comprehensive FanDuel data")
+            df = games_frame(all_games)
+            self.log(f"\n🎉 SUCCESS! Found {len(df)} games with comprehensive FanDuel data")
             
             # Show summary with real data
-            if not df.empty:
+            if not self.quiet:
                 print(f"\n📊 Summary:")
                 print(f"   Today ({today}): {len(df[df['date'] == today])} games")
                 print(f"   Tomorrow ({tomorrow}): {len(df[df['date'] == tomorrow])} games")
@@ -278,15 +462,22 @@ class ComprehensiveMLBScraper:
             return df
         else:
             print("❌ No games found")
-            return pd.DataFrame()
+            return games_frame([])
 
 def main():
+    import pandas as pd
+    from line_movement import LineMovementAggregates
+    from snapshot_store import SnapshotStore
+    
     print("🚀 COMPREHENSIVE MLB Scraper - All Bet Types")
     print("🎯 Moneyline, Run Line, and Totals with Opening/Current Lines")
     print("=" * 80)
     
     scraper = ComprehensiveMLBScraper()
-    df = scraper.get_today_tomorrow_games()
+    store = SnapshotStore('odds_snapshots.db')
+    df = scraper.get_today_tomorrow_games(store=store)
+    LineMovementAggregates(store).refresh()
+    store.close()
     
     if not df.empty:
         print(f"\n✅ COMPLETE SUCCESS! Scraped {len(df)} games with all bet types")
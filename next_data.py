@@ -0,0 +1,277 @@
+"""
+Helpers for pulling the Next.js __NEXT_DATA__ payload out of SBR pages
+
+orjson is used for decoding when it is installed; otherwise only the
+oddsTables value is decoded with the stdlib parser.
+"""
+
+import json
+import re
+from itertools import accumulate
+
+try:
+    import orjson
+except ImportError:  # optional fast backend
+    orjson = None
+
+NEXT_DATA_OPEN = b'<script id="__NEXT_DATA__" type="application/json">'
+SCRIPT_CLOSE = b'</script>'
+CHUNK_SIZE = 64 * 1024
+
+ODDS_TABLES_PATH = ('props', 'pageProps', 'oddsTables')
+# The selective decoder only stops at quotes and brackets; everything
+# else in a JSON document can't change how deeply a key is nested
+STRUCTURE = re.compile(rb'["{}\[\]]')
+KEY_COLON = re.compile(rb'\s*:')
+ARRAY_START = re.compile(rb'\s*\[')
+QUOTE, BACKSLASH = ord('"'), ord('\\')
+OPEN_BRACKETS = frozenset(b'{[')
+# bytes.translate deletes everything but brackets, so nesting depth can be
+# followed in C; DEPTH_STEP maps each bracket byte to its depth change
+NOT_BRACKETS = bytes(byte for byte in range(256) if byte not in b'[]{}')
+DEPTH_STEP = [0] * 256
+for _byte in b'[{':
+    DEPTH_STEP[_byte] = 1
+for _byte in b']}':
+    DEPTH_STEP[_byte] = -1
+
+
+def extract_next_data(chunks):
+    """Scan byte chunks for the __NEXT_DATA__ script and return its raw JSON bytes
+    
+    Only a short tail is kept while looking for the opening tag, and no more
+    chunks are consumed once the closing </script> arrives. Returns None if
+    the page has no __NEXT_DATA__ block.
+    """
+    
+    buffer = bytearray()
+    found_open = False
+    search_from = 0
+    
+    for chunk in chunks:
+        if not chunk:
+            continue
+        buffer += chunk
+        
+        if not found_open:
+            idx = buffer.find(NEXT_DATA_OPEN)
+            if idx < 0:
+                # Keep just enough bytes to match a tag split across chunks
+                keep = len(NEXT_DATA_OPEN) - 1
+                if len(buffer) > keep:
+                    del buffer[:-keep]
+                continue
+            del buffer[:idx + len(NEXT_DATA_OPEN)]
+            found_open = True
+            search_from = 0
+        
+        end = buffer.find(SCRIPT_CLOSE, search_from)
+        if end >= 0:
+            return bytes(buffer[:end])
+        search_from = max(0, len(buffer) - len(SCRIPT_CLOSE) + 1)
+    
+    return None
+
+
+def iter_byte_chunks(body, chunk_size=CHUNK_SIZE):
+    """Split an in-memory page body into chunks, mimicking iter_content"""
+    
+    for offset in range(0, len(body), chunk_size):
+        yield body[offset:offset + chunk_size]
+
+
+def walk_path(node, path, prefix=()):
+    """Follow path through nested JSON, raising KeyError with the dotted path that is missing"""
+    
+    for depth, key in enumerate(path):
+        try:
+            node = node[key]
+        except (KeyError, IndexError, TypeError):
+            missing = [str(part) for part in prefix + tuple(path[:depth + 1])]
+            raise KeyError('.'.join(missing)) from None
+    return node
+
+
+def default_backend():
+    """Pick the fastest decoder available in this environment"""
+    
+    return 'orjson' if orjson is not None else 'selective'
+
+
+def load_odds_tables(payload, backend=None):
+    """Decode props.pageProps.oddsTables from a raw __NEXT_DATA__ payload
+    
+    Backends:
+        'orjson'    - full decode with orjson, then walk the path
+        'selective' - stdlib decode of only the oddsTables value
+        'json'      - full stdlib decode (the original behaviour)
+    """
+    
+    backend = backend or default_backend()
+    
+    if backend == 'orjson':
+        return walk_path(orjson.loads(payload), ODDS_TABLES_PATH)
+    
+    if backend == 'selective':
+        odds_tables = _decode_odds_tables_only(payload)
+        if odds_tables is not None:
+            return odds_tables
+    
+    # Full decode; also reports exactly which key is missing when the
+    # selective scan can't find the path
+    return walk_path(json.loads(payload), ODDS_TABLES_PATH)
+
+
+def load_game_rows(payload, backend=None):
+    """Return the first odds table's gameRows, or None if the page has no odds tables"""
+    
+    odds_tables = load_odds_tables(payload, backend)
+    if not odds_tables:
+        return None
+    
+    odds_table_model = walk_path(odds_tables, (0, 'oddsTableModel'), ODDS_TABLES_PATH)
+    return odds_table_model.get('gameRows', [])
+
+
+def _string_end(payload, quote):
+    """Offset just past the JSON string opening at quote, or -1 if it never closes"""
+    
+    end = payload.find(b'"', quote + 1)
+    while end > 0 and payload[end - 1] == BACKSLASH:
+        # An escaped quote is preceded by an odd number of backslashes
+        backslash = end - 1
+        while payload[backslash - 1] == BACKSLASH:
+            backslash -= 1
+        if (end - backslash) % 2 == 0:
+            break
+        end = payload.find(b'"', end + 1)
+    return end + 1 if end > 0 else -1
+
+
+def _skip_string(payload, quote):
+    """Offset just past the JSON string opening at quote (-1 if it never closes)"""
+    
+    position = payload.find(b'"', quote + 1) + 1
+    if position > 0 and payload[position - 2] == BACKSLASH:
+        position = _string_end(payload, quote)
+    return position if position > 0 else -1
+
+
+def _locate_odds_tables(payload):
+    """Byte offset where the props.pageProps.oddsTables array starts, or None
+    
+    Tracks the key path of every open object so an oddsTables key nested
+    anywhere else (a sidebar widget, another page's props) is never taken
+    for the real one. String contents are skipped with bytes.find.
+    """
+    
+    wanted = [None] + [f'"{key}"'.encode() for key in ODDS_TABLES_PATH]
+    parents = wanted[:-1]
+    path = []       # key that opened each enclosing container (None in arrays and at the root)
+    pending = None  # key whose value comes next
+    position = 0
+    
+    while True:
+        token = STRUCTURE.search(payload, position)
+        if token is None:
+            return None
+        index = token.start()
+        char = payload[index]
+        
+        if char == QUOTE:
+            # _skip_string inlined: this loop runs once per token before oddsTables
+            position = payload.find(b'"', index + 1) + 1
+            if position > 0 and payload[position - 2] == BACKSLASH:
+                position = _string_end(payload, index)
+            if position <= 0:
+                return None
+            if len(path) > len(parents):
+                continue  # below pageProps only the brackets matter
+            colon = KEY_COLON.match(payload, position)
+            if colon is None:
+                continue  # a string value
+            pending = payload[index:position]
+            position = colon.end()
+            if pending == wanted[-1] and path == parents:
+                start = ARRAY_START.match(payload, position)
+                return start.end() - 1 if start else None
+        elif char in OPEN_BRACKETS:
+            path.append(pending)
+            pending = None
+            position = index + 1
+        else:
+            if path == parents:
+                return None  # pageProps closed without an oddsTables key
+            path.pop()
+            pending = None
+            position = index + 1
+
+
+def _bracket_match(payload, start):
+    """Offset just past the bracket closing the one at start, counting every bracket
+    
+    Brackets inside strings are counted too, so this is only a candidate:
+    decoding payload[start:end] succeeds exactly when it is right, since a
+    JSON value that parses has no other end. Returns -1 if it never closes.
+    """
+    
+    brackets = payload[start:].translate(None, NOT_BRACKETS)
+    try:
+        last = list(accumulate(map(DEPTH_STEP.__getitem__, brackets))).index(0)
+    except ValueError:
+        return -1
+    
+    close = brackets[last]
+    end = start
+    for _ in range(brackets.count(close, 0, last + 1)):
+        end = payload.find(close, end) + 1
+    return end
+
+
+def _value_end(payload, start):
+    """Offset just past the bracket closing the one at start, skipping strings (-1 if it never closes)"""
+    
+    depth = 0
+    position = start
+    
+    while True:
+        token = STRUCTURE.search(payload, position)
+        if token is None:
+            return -1
+        index = token.start()
+        char = payload[index]
+        
+        if char == QUOTE:
+            position = _skip_string(payload, index)
+            if position < 0:
+                return -1
+            continue
+        position = index + 1
+        depth += 1 if char in OPEN_BRACKETS else -1
+        if depth == 0:
+            return position
+
+
+def _decode_odds_tables_only(payload):
+    """Decode just the props.pageProps.oddsTables value, or None if it can't be located"""
+    
+    start = _locate_odds_tables(payload)
+    if start is None:
+        return None
+    
+    # The bracket count finds the end in C; only a bracket inside one of the
+    # tables' strings sends it to the string-aware scan
+    end = _bracket_match(payload, start)
+    if end > 0:
+        try:
+            return json.loads(payload[start:end])
+        except ValueError:
+            pass
+    
+    end = _value_end(payload, start)
+    if end < 0:
+        return None
+    try:
+        return json.loads(payload[start:end])
+    except ValueError:
+        return None
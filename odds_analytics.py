@@ -0,0 +1,122 @@
+"""
+Vectorized implied probability, no-vig fair price and hold
+
+Works column-wise on the scraper's wide DataFrame (or any concatenation
+of them, e.g. a season of snapshots). For every two-way market and phase
+it adds:
+
+    <side>_prob       implied probability of the posted American odds
+    <side>_fair_prob  probability with the vig removed (proportional method)
+    <side>_fair_odds  that fair probability as American odds
+    <market>_hold     the book's hold, 1 - 1 / (p_a + p_b)
+
+Results are float32 to keep season-scale frames small. Missing prices
+come through as NaN; nothing loops over rows.
+"""
+
+import numpy as np
+import pandas as pd
+
+# (output prefix, first side odds column, second side odds column)
+MARKET_PAIRS = (
+    ('ml_opening', 'ml_opening_away', 'ml_opening_home'),
+    ('ml_current', 'ml_current_away', 'ml_current_home'),
+    ('rl_opening', 'rl_opening_away_odds', 'rl_opening_home_odds'),
+    ('rl_current', 'rl_current_away_odds', 'rl_current_home_odds'),
+    ('total_opening', 'total_opening_over_odds', 'total_opening_under_odds'),
+    ('total_current', 'total_current_over_odds', 'total_current_under_odds'),
+)
+
+
+def _side_prefix(column):
+    """ml_opening_away -> ml_opening_away, rl_opening_away_odds -> rl_opening_away"""
+    
+    return column[:-len('_odds')] if column.endswith('_odds') else column
+
+
+def to_float_array(values, dtype=np.float32):
+    """Odds column (possibly object dtype with None) -> float array with NaN for missing"""
+    
+    series = values if isinstance(values, pd.Series) else pd.Series(values)
+    if series.dtype == object:
+        series = pd.to_numeric(series, errors='coerce')
+    return series.to_numpy(dtype=dtype, na_value=np.nan)
+
+
+def _as_float(values):
+    """Keep float arrays as they are; anything else becomes float32"""
+    
+    values = np.asarray(values)
+    return values if np.issubdtype(values.dtype, np.floating) else values.astype(np.float32)
+
+
+def american_to_prob(odds):
+    """Implied probability of American odds; NaN for missing or zero odds"""
+    
+    odds = _as_float(odds)
+    # -150 -> 150 / 250, +130 -> 100 / 230; NaN propagates through abs()
+    prob = np.where(odds < 0, -odds, odds.dtype.type(100))
+    prob /= np.abs(odds) + 100
+    prob[odds == 0] = np.nan
+    return prob
+
+
+def prob_to_american(prob):
+    """American odds for a probability (favourites negative), NaN outside (0, 1)"""
+    
+    prob = _as_float(prob)
+    odds = np.full_like(prob, np.nan)
+    favourite = prob >= 0.5
+    underdog = (prob > 0) & ~favourite
+    favourite &= prob < 1
+    
+    # p >= 0.5 -> -100 p / (1 - p), otherwise 100 (1 - p) / p
+    np.divide(prob * -100, 1 - prob, out=odds, where=favourite)
+    np.divide((1 - prob) * 100, prob, out=odds, where=underdog)
+    return odds
+
+
+def no_vig(prob_a, prob_b):
+    """Proportionally de-vigged probabilities and the hold for a two-way market"""
+    
+    overround = prob_a + prob_b
+    fair_a = prob_a / overround
+    hold = 1 - 1 / overround
+    return fair_a, 1 - fair_a, hold
+
+
+def mirror_odds(fair_odds):
+    """Fair American odds of the other side of a two-way market (-138 <-> +138, -100 stays)"""
+    
+    mirrored = -fair_odds
+    mirrored[fair_odds == -100] = -100
+    return mirrored
+
+
+def add_market_probabilities(df):
+    """Return a copy of df with implied/fair probabilities, fair odds and hold for every market"""
+    
+    new_columns = {}
+    
+    for prefix, col_a, col_b in MARKET_PAIRS:
+        if col_a not in df.columns or col_b not in df.columns:
+            continue
+        
+        prob_a = american_to_prob(to_float_array(df[col_a]))
+        prob_b = american_to_prob(to_float_array(df[col_b]))
+        fair_a, fair_b, hold = no_vig(prob_a, prob_b)
+        
+        # Fair probabilities sum to one, so the second side's price is the mirror
+        fair_odds_a = prob_to_american(fair_a)
+        fair_odds_b = mirror_odds(fair_odds_a)
+        
+        for column, prob, fair, fair_odds in ((col_a, prob_a, fair_a, fair_odds_a),
+                                              (col_b, prob_b, fair_b, fair_odds_b)):
+            side = _side_prefix(column)
+            new_columns[f'{side}_prob'] = prob
+            new_columns[f'{side}_fair_prob'] = fair
+            new_columns[f'{side}_fair_odds'] = fair_odds
+        new_columns[f'{prefix}_hold'] = hold
+    
+    added = pd.DataFrame(new_columns, index=df.index)
+    return pd.concat([df, added], axis=1)
@@ -0,0 +1,207 @@
+"""
+Fast-start command line scraper that streams rows as they are parsed
+
+    python odds_cli.py today                          # today's games as JSONL on stdout
+    python odds_cli.py today --days 2 --format csv --out games.csv
+    python odds_cli.py date 2025-07-15 --lines        # every book's lines, not just FanDuel games
+    python odds_cli.py range 2025-07-01 2025-07-31 --format parquet --out july.parquet
+    python odds_cli.py today --cache-dir .sbr_cache    # reruns revalidate instead of refetching
+
+Each date is written as soon as its three pages are parsed, while the
+next date is already being fetched. JSONL and CSV use only the
+standard library, so those runs never load pandas; Parquet is written
+with pyarrow one row group per date (pyarrow loads pandas on its own).
+Progress and errors go to stderr so stdout carries only rows.
+"""
+
+import argparse
+import csv
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta
+
+from game_record import CATEGORY_FIELDS, LINE_FIELDS, ODDS_FIELDS, GameRecord
+from mlb_odds_scraper import ComprehensiveMLBScraper
+from odds_table import LINE_COLUMNS
+
+FORMATS = ('jsonl', 'csv', 'parquet')
+
+
+class JsonlWriter:
+    def __init__(self, out, fields):
+        self.out = out
+        self.fields = fields
+    
+    def write(self, rows):
+        dumps = json.dumps
+        fields = self.fields
+        self.out.write(''.join(dumps(dict(zip(fields, row)), separators=(',', ':')) + '\n' for row in rows))
+        self.out.flush()
+    
+    def close(self):
+        pass
+
+
+class CsvWriter:
+    def __init__(self, out, fields):
+        self.out = out
+        self.writer = csv.writer(out)
+        self.writer.writerow(fields)
+    
+    def write(self, rows):
+        self.writer.writerows(rows)
+        self.out.flush()
+    
+    def close(self):
+        pass
+
+
+class ParquetWriter:
+    """One row group per write() through pyarrow"""
+    
+    def __init__(self, path, fields):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("❌ Parquet output needs the pyarrow package")
+        
+        self.pa = pa
+        self.fields = fields
+        self.schema = pa.schema([(field, self.arrow_type(pa, field)) for field in fields])
+        self.writer = pq.ParquetWriter(path, self.schema)
+    
+    @staticmethod
+    def arrow_type(pa, field):
+        if field in ODDS_FIELDS:
+            return pa.int16()
+        if field in LINE_FIELDS:
+            return pa.float32()
+        if field == 'odds':
+            return pa.int32()
+        if field == 'line':
+            return pa.float64()
+        if field in CATEGORY_FIELDS or field in ('book', 'market', 'side', 'phase'):
+            return pa.dictionary(pa.int32(), pa.string())
+        return pa.string()
+    
+    def write(self, rows):
+        if not rows:
+            return
+        columns = list(zip(*rows))
+        arrays = {}
+        for field, column in zip(self.fields, columns):
+            if field in ('game_id', 'game_time'):
+                # SBR ids are usually ints but fall back to strings, so they're kept as text
+                column = [None if value is None else str(value) for value in column]
+            arrays[field] = column
+        self.writer.write_table(self.pa.Table.from_pydict(arrays, schema=self.schema))
+    
+    def close(self):
+        self.writer.close()
+
+
+def open_writer(fmt, out_path, fields):
+    """(writer, file to close or None) for a format and --out path ('-' is stdout)"""
+    
+    if fmt == 'parquet':
+        if out_path == '-':
+            raise SystemExit("❌ Parquet output needs --out")
+        return ParquetWriter(out_path, fields), None
+    
+    out = sys.stdout if out_path == '-' else open(out_path, 'w', encoding='utf-8', newline='')
+    writer = JsonlWriter(out, fields) if fmt == 'jsonl' else CsvWriter(out, fields)
+    return writer, (None if out_path == '-' else out)
+
+
+def date_rows(scraper, date_str, pages, lines_only):
+    """The rows to write for one date: GameRecords, or long-format line tuples"""
+    
+    lines = scraper.build_date_lines(date_str, pages)
+    if lines_only:
+        return list(zip(*(lines[column] for column in LINE_COLUMNS)))
+    return scraper.build_date_games(date_str, pages, lines)
+
+
+def stream_dates(scraper, dates, writer, lines_only=False):
+    """Fetch dates in order, prefetching the next one while the current one is written"""
+    
+    total = 0
+    with ThreadPoolExecutor(max_workers=1) as prefetch:
+        pending = prefetch.submit(scraper.fetch_pages, [dates[0]]) if dates else None
+        for position, date_str in enumerate(dates):
+            pages = pending.result()
+            if position + 1 < len(dates):
+                pending = prefetch.submit(scraper.fetch_pages, [dates[position + 1]])
+            
+            rows = date_rows(scraper, date_str, pages, lines_only)
+            writer.write(rows)
+            total += len(rows)
+            print(f"✅ {date_str}: {len(rows)} {'lines' if lines_only else 'games'}", file=sys.stderr)
+    return total
+
+
+def dates_for(args):
+    if args.command == 'today':
+        today = datetime.now().date()
+        return [(today + timedelta(days=offset)).isoformat() for offset in range(args.days)]
+    if args.command == 'date':
+        return [args.date]
+    
+    from backfill import date_range
+    return list(date_range(args.start_date, args.end_date))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream MLB odds rows as JSONL, CSV or Parquet")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    
+    today = subparsers.add_parser('today', help="today's games (--days 2 adds tomorrow)")
+    today.add_argument('--days', type=int, default=1)
+    single = subparsers.add_parser('date', help="one date's games")
+    single.add_argument('date')
+    span = subparsers.add_parser('range', help="every date from start to end inclusive")
+    span.add_argument('start_date')
+    span.add_argument('end_date')
+    
+    for subparser in (today, single, span):
+        subparser.add_argument('--format', choices=FORMATS, default='jsonl')
+        subparser.add_argument('--out', default='-', help="output file ('-' for stdout)")
+        subparser.add_argument('--lines', action='store_true', help="all books' long-format lines instead of games")
+        subparser.add_argument('--workers', type=int, default=3)
+        subparser.add_argument('--base-url', help="e.g. a replay.py server")
+        subparser.add_argument('--cache-dir', help="reuse and revalidate pages in this http_cache directory")
+        subparser.add_argument('--compressed', action='store_true',
+                               help="accept gzip (falls back to identity per bet type if a response won't decode)")
+    
+    args = parser.parse_args(argv)
+    
+    fields = LINE_COLUMNS if args.lines else GameRecord._fields
+    writer, out_file = open_writer(args.format, args.out, fields)
+    cache = None
+    if args.cache_dir:
+        from http_cache import ResponseCache
+        cache = ResponseCache(args.cache_dir)
+    scraper = ComprehensiveMLBScraper(max_workers=args.workers, quiet=True, base_url=args.base_url, cache=cache,
+                                      compressed=args.compressed)
+    
+    start = time.perf_counter()
+    try:
+        # The writer already holds stdout; the scraper's error messages go to
+        # stderr until the rows are done, then stdout is restored
+        with redirect_stdout(sys.stderr):
+            total = stream_dates(scraper, dates_for(args), writer, args.lines)
+    finally:
+        writer.close()
+        if out_file is not None:
+            out_file.close()
+    
+    print(f"🎉 {total} rows in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+    return 0 if total else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""
+Stale-while-revalidate refresher shared by every viewer in a process
+
+The last good result is always served immediately; a daemon thread
+replaces it on a timer. Refresh requests that arrive while a fetch is
+already running are folded into that fetch instead of starting another.
+"""
+
+import threading
+import time
+
+
+class BackgroundRefresher:
+    """Keeps the result of fetch() fresh on a worker thread"""
+    
+    def __init__(self, fetch, interval=300, clock=time.time):
+        self.fetch = fetch
+        self.interval = interval
+        self.clock = clock
+        self.data = None
+        self.updated_at = None
+        self.last_error = None
+        self.refreshing = False
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._first_result = threading.Event()
+        self._thread = None
+    
+    def start(self):
+        """Start the worker thread (idempotent)"""
+        
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='odds-refresher', daemon=True)
+                self._thread.start()
+        return self
+    
+    def _run(self):
+        while True:
+            self.refresh_now()
+            self._wake.wait(self.interval)
+            self._wake.clear()
+    
+    def refresh_now(self):
+        """Run fetch() unless one is already in flight; returns False if coalesced"""
+        
+        with self._lock:
+            if self.refreshing:
+                return False
+            self.refreshing = True
+        
+        try:
+            data = self.fetch()
+            with self._lock:
+                # A failed fetch (None) keeps serving the last good data
+                if data is not None:
+                    self.data = data
+                    self.updated_at = self.clock()
+                    self.last_error = None
+                else:
+                    self.last_error = "Fetch returned no data"
+        except Exception as e:
+            with self._lock:
+                self.last_error = str(e)
+        finally:
+            with self._lock:
+                self.refreshing = False
+            self._first_result.set()
+        return True
+    
+    def request_refresh(self):
+        """Ask the worker for an early refresh without blocking the caller"""
+        
+        with self._lock:
+            if self.refreshing:
+                return False
+        self._wake.set()
+        return True
+    
+    def wait_for_first(self, timeout=None):
+        """Block only until the very first fetch has finished (cold start)"""
+        
+        return self._first_result.wait(timeout)
+    
+    def age(self):
+        """Seconds since the served data was fetched, or None before the first success"""
+        
+        if self.updated_at is None:
+            return None
+        return self.clock() - self.updated_at
+    
+    def snapshot(self):
+        """(data, age in seconds, last error, refresh in progress) under one lock"""
+        
+        with self._lock:
+            age = None if self.updated_at is None else self.clock() - self.updated_at
+            return self.data, age, self.last_error, self.refreshing
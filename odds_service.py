@@ -0,0 +1,327 @@
+"""
+Local odds query service with Server-Sent Events push
+
+One process polls SBR (through PollScheduler) and keeps the latest
+lines for every book in an in-memory index keyed by game_id, date, team
+and book. Any number of local tools can query it or subscribe to it
+without sending a single extra request upstream.
+
+    python odds_service.py --port 8780
+    
+    GET /games?date=2025-07-15&team=yankees&book=fanduel   matching games
+    GET /games/<game_id>?book=fanduel                        one game
+    GET /stream?date=...&team=...&book=...&game_id=...       SSE of changed lines only
+    GET /health
+
+A game document holds its gameView fields plus
+lines[book][market][side][phase] = {"odds": ..., "line": ...}. Each
+game's JSON is cached until one of its prices changes, so a read is a
+dictionary lookup and a socket write.
+"""
+
+import argparse
+import json
+import queue
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from game_join import game_row_id
+from line_deltas import LineDeltaTracker
+from odds_table import extract_page_lines
+
+HEARTBEAT_SECONDS = 15
+SUBSCRIBER_QUEUE_SIZE = 1000
+
+
+class OddsIndex:
+    """Latest lines per game with date/team/book indexes and change fan-out"""
+    
+    def __init__(self):
+        self.games = {}         # game_id -> game document
+        self.by_date = {}       # date -> {game_id}
+        self.by_team = {}       # lower-cased team name -> {game_id}
+        self.by_book = {}       # book -> {game_id}
+        self.tracker = LineDeltaTracker()
+        self.version = 0
+        self.updated = None
+        self.subscribers = set()
+        self._json = {}         # (game_id, book) -> cached JSON bytes
+        self._lock = threading.Lock()
+    
+    def update_page(self, date_str, market, game_rows, ts=None):
+        """Fold one bet-type page into the index and push its changed current lines"""
+        
+        if not game_rows:
+            return []
+        ts = time.time() if ts is None else ts
+        lines = extract_page_lines(date_str, market, game_rows)
+        
+        with self._lock:
+            # Only games whose document actually changed lose their cached JSON
+            touched = set()
+            for position, game_row in enumerate(game_rows):
+                game_id = str(game_row_id(game_row, position))
+                if self._update_game(date_str, game_id, game_row.get('gameView', {})):
+                    touched.add(game_id)
+            
+            rows = zip(lines['game_id'], lines['book'], lines['side'], lines['phase'],
+                       lines['odds'], lines['line'])
+            for game_id, book, side, phase, odds, line in rows:
+                game_id = str(game_id)
+                sides = self.games[game_id]['lines'].setdefault(book, {}).setdefault(market, {})
+                phases = sides.setdefault(side, {})
+                price = {'odds': odds, 'line': line}
+                if phases.get(phase) != price:
+                    phases[phase] = price
+                    touched.add(game_id)
+                self.by_book.setdefault(book, set()).add(game_id)
+            
+            changes = self.tracker.update(lines, ts)
+            if touched:
+                for key in [key for key in self._json if key[0] in touched]:
+                    del self._json[key]
+            self.version += 1
+            self.updated = ts
+            subscribers = list(self.subscribers)
+        
+        events = [self._event(change) for change in changes]
+        if events:
+            for subscriber in subscribers:
+                subscriber.publish(events)
+        return changes
+    
+    def _update_game(self, date_str, game_id, game_view):
+        """Fold in a game's gameView fields; True if the game is new or any of them changed"""
+        
+        game = self.games.get(game_id)
+        if game is None:
+            game = self.games[game_id] = {'game_id': game_id, 'date': date_str, 'lines': {}}
+            self.by_date.setdefault(date_str, set()).add(game_id)
+        
+        fields = {
+            'game_time': game_view.get('startDate', 'TBD'),
+            'away_team': (game_view.get('awayTeam') or {}).get('name', 'Unknown'),
+            'home_team': (game_view.get('homeTeam') or {}).get('name', 'Unknown'),
+            'status': game_view.get('status', 'Scheduled'),
+            'venue': game_view.get('venueName', 'Unknown'),
+        }
+        if all(game.get(name) == value for name, value in fields.items()):
+            return False
+        
+        game.update(fields)
+        for team in (game['away_team'], game['home_team']):
+            self.by_team.setdefault(team.lower(), set()).add(game_id)
+        return True
+    
+    def _event(self, change):
+        game = self.games.get(change.game_id, {})
+        return {
+            'ts': change.ts, 'game_id': change.game_id, 'date': game.get('date'),
+            'away_team': game.get('away_team'), 'home_team': game.get('home_team'),
+            'book': change.book, 'market': change.market, 'side': change.side,
+            'old_odds': change.old_odds, 'old_line': change.old_line,
+            'new_odds': change.new_odds, 'new_line': change.new_line,
+        }
+    
+    def find(self, date=None, team=None, book=None):
+        """game_ids matching every given filter (team matches any part of a name)"""
+        
+        with self._lock:
+            candidates = None
+            if date:
+                candidates = set(self.by_date.get(date, ()))
+            if team:
+                team = team.lower()
+                matches = set()
+                for name, game_ids in self.by_team.items():
+                    if team in name:
+                        matches |= game_ids
+                candidates = matches if candidates is None else candidates & matches
+            if book:
+                matches = self.by_book.get(book.lower(), set())
+                candidates = set(matches) if candidates is None else candidates & matches
+            if candidates is None:
+                candidates = set(self.games)
+        
+        return sorted(candidates, key=lambda game_id: (self.games[game_id]['date'],
+                                                       self.games[game_id]['game_time'], game_id))
+    
+    def game_json(self, game_id, book=None):
+        """A game's document as JSON bytes (one book's lines if book is given), or None"""
+        
+        book = book.lower() if book else None
+        key = (game_id, book)
+        with self._lock:
+            cached = self._json.get(key)
+            if cached is not None:
+                return cached
+            game = self.games.get(game_id)
+            if game is None:
+                return None
+            lines = game['lines']
+            if book:
+                game = dict(game, lines={book: lines.get(book, {})})
+            data = json.dumps(game, separators=(',', ':')).encode('utf-8')
+            # Books the game has no lines for aren't cached, so arbitrary
+            # ?book= values can't grow the cache
+            if book is None or book in lines:
+                self._json[key] = data
+            return data
+    
+    def games_json(self, game_ids, book=None):
+        return b'[' + b','.join(self.game_json(game_id, book) for game_id in game_ids) + b']'
+    
+    def subscribe(self, filters):
+        subscriber = Subscriber(self, filters)
+        with self._lock:
+            self.subscribers.add(subscriber)
+        return subscriber
+    
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self.subscribers.discard(subscriber)
+
+
+class Subscriber:
+    """One SSE client: a bounded queue of events matching its filters"""
+    
+    def __init__(self, index, filters):
+        self.index = index
+        self.date = filters.get('date')
+        self.team = (filters.get('team') or '').lower() or None
+        self.book = (filters.get('book') or '').lower() or None
+        self.game_id = filters.get('game_id')
+        self.events = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.dropped = False
+    
+    def matches(self, event):
+        return ((self.date is None or event['date'] == self.date)
+                and (self.book is None or event['book'] == self.book)
+                and (self.game_id is None or event['game_id'] == self.game_id)
+                and (self.team is None or self.team in (event['away_team'] or '').lower()
+                     or self.team in (event['home_team'] or '').lower()))
+    
+    def publish(self, events):
+        batch = [event for event in events if self.matches(event)]
+        if not batch:
+            return
+        try:
+            self.events.put_nowait(batch)
+        except queue.Full:
+            # A client that can't keep up is cut off rather than holding memory
+            self.dropped = True
+            self.index.unsubscribe(self)
+
+
+class OddsServiceHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out in separate writes; don't let Nagle hold the body back
+    disable_nagle_algorithm = True
+    index = None  # set by make_server
+    
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {name: values[0] for name, values in parse_qs(url.query).items()}
+        parts = [part for part in url.path.split('/') if part]
+        
+        if parts == ['games']:
+            game_ids = self.index.find(params.get('date'), params.get('team'), params.get('book'))
+            self.send_json(self.index.games_json(game_ids, params.get('book')))
+        elif len(parts) == 2 and parts[0] == 'games':
+            body = self.index.game_json(parts[1], params.get('book'))
+            if body is None:
+                self.send_error(404, "Unknown game_id")
+            else:
+                self.send_json(body)
+        elif parts == ['stream']:
+            self.stream(params)
+        elif parts == ['health']:
+            self.send_json(json.dumps({
+                'games': len(self.index.games), 'version': self.index.version,
+                'updated': self.index.updated, 'subscribers': len(self.index.subscribers),
+            }).encode('utf-8'))
+        else:
+            self.send_error(404)
+    
+    def send_json(self, body):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def stream(self, params):
+        subscriber = self.index.subscribe(params)
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+        
+        try:
+            self.wfile.write(f"event: hello\ndata: {json.dumps({'version': self.index.version})}\n\n".encode('utf-8'))
+            self.wfile.flush()
+            while not subscriber.dropped:
+                try:
+                    batch = subscriber.events.get(timeout=HEARTBEAT_SECONDS)
+                except queue.Empty:
+                    self.wfile.write(b": keep-alive\n\n")
+                else:
+                    payload = ''.join(f"event: line\ndata: {json.dumps(event, separators=(',', ':'))}\n\n"
+                                      for event in batch)
+                    self.wfile.write(payload.encode('utf-8'))
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionError):
+            pass
+        finally:
+            self.index.unsubscribe(subscriber)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(index, host='127.0.0.1', port=8780):
+    """A threaded HTTP server over index (each SSE client holds one thread)"""
+    
+    handler = type('BoundOddsServiceHandler', (OddsServiceHandler,), {'index': index})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    from mlb_odds_scraper import ComprehensiveMLBScraper
+    from poll_scheduler import PollScheduler
+    
+    parser = argparse.ArgumentParser(description="Local MLB odds query service")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8780)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--quiet', action='store_true')
+    args = parser.parse_args()
+    
+    index = OddsIndex()
+    server = make_server(index, args.host, args.port)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"📡 Odds service on http://{args.host}:{server.server_address[1]}/games")
+    
+    def on_poll(date_str, bet_type, game_rows, ts):
+        changes = index.update_page(date_str, bet_type, game_rows, ts)
+        if game_rows and not args.quiet:
+            print(f"🔁 {bet_type} {date_str}: {len(changes)} changed lines, "
+                  f"{len(index.subscribers)} subscribers")
+    
+    scraper = ComprehensiveMLBScraper(max_workers=args.workers, quiet=args.quiet)
+    try:
+        PollScheduler(scraper, on_poll=on_poll).run()
+    except KeyboardInterrupt:
+        print("👋 Odds service stopped")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Long-format odds table covering every sportsbook on an SBR page
+
+Each game row is walked once, emitting one row per
+(game, book, market, side, phase):
+
+    date, game_id, book, market, side, phase, odds, line
+
+line holds the spread for run lines and the total for totals, and is
+None for moneylines.
+"""
+
+from game_join import game_row_id
+
+LINE_COLUMNS = ('date', 'game_id', 'book', 'market', 'side', 'phase', 'odds', 'line')
+
+# market -> (side, odds key, line key) as named in SBR's line objects
+MARKET_SIDES = {
+    'moneyline': (('away', 'awayOdds', None), ('home', 'homeOdds', None)),
+    'pointspread': (('away', 'awayOdds', 'awaySpread'), ('home', 'homeOdds', 'homeSpread')),
+    'totals': (('over', 'overOdds', 'total'), ('under', 'underOdds', 'total')),
+}
+
+PHASES = (('opening', 'openingLine'), ('current', 'currentLine'))
+
+# The flat per-game columns the scraper has always produced, as lookups
+# into the long table: (column, market, phase, side, 'odds' | 'line')
+WIDE_COLUMNS = (
+    ('ml_opening_away', 'moneyline', 'opening', 'away', 'odds'),
+    ('ml_opening_home', 'moneyline', 'opening', 'home', 'odds'),
+    ('ml_current_away', 'moneyline', 'current', 'away', 'odds'),
+    ('ml_current_home', 'moneyline', 'current', 'home', 'odds'),
+    ('rl_opening_away_odds', 'pointspread', 'opening', 'away', 'odds'),
+    ('rl_opening_home_odds', 'pointspread', 'opening', 'home', 'odds'),
+    ('rl_opening_away_spread', 'pointspread', 'opening', 'away', 'line'),
+    ('rl_opening_home_spread', 'pointspread', 'opening', 'home', 'line'),
+    ('rl_current_away_odds', 'pointspread', 'current', 'away', 'odds'),
+    ('rl_current_home_odds', 'pointspread', 'current', 'home', 'odds'),
+    ('rl_current_away_spread', 'pointspread', 'current', 'away', 'line'),
+    ('rl_current_home_spread', 'pointspread', 'current', 'home', 'line'),
+    ('total_opening_line', 'totals', 'opening', 'over', 'line'),
+    ('total_opening_over_odds', 'totals', 'opening', 'over', 'odds'),
+    ('total_opening_under_odds', 'totals', 'opening', 'under', 'odds'),
+    ('total_current_line', 'totals', 'current', 'over', 'line'),
+    ('total_current_over_odds', 'totals', 'current', 'over', 'odds'),
+    ('total_current_under_odds', 'totals', 'current', 'under', 'odds'),
+)
+
+NO_PRICE = (None, None)
+
+
+def new_line_columns():
+    """Empty column lists for the long-format table"""
+    
+    return {column: [] for column in LINE_COLUMNS}
+
+
+def extract_game_lines(game_row, market, columns, date_str=None, game_id=None):
+    """Append every book's opening and current prices for one game row to columns"""
+    
+    sides = MARKET_SIDES[market]
+    if game_id is None:
+        game_id = game_row_id(game_row, 0)
+    
+    for odds_view in game_row.get('openingLineViews') or []:
+        book = (odds_view.get('sportsbook') or '').lower()
+        
+        for phase, phase_key in PHASES:
+            line_data = odds_view.get(phase_key) or {}
+            
+            for side, odds_key, line_key in sides:
+                columns['date'].append(date_str)
+                columns['game_id'].append(game_id)
+                columns['book'].append(book)
+                columns['market'].append(market)
+                columns['side'].append(side)
+                columns['phase'].append(phase)
+                columns['odds'].append(line_data.get(odds_key))
+                columns['line'].append(line_data.get(line_key) if line_key else None)
+    
+    return columns
+
+
+def extract_page_lines(date_str, market, game_rows, columns=None):
+    """Append the lines for every game on one bet-type page"""
+    
+    if columns is None:
+        columns = new_line_columns()
+    
+    for position, game_row in enumerate(game_rows or []):
+        extract_game_lines(game_row, market, columns, date_str, game_row_id(game_row, position))
+    
+    return columns
+
+
+def index_book_lines(columns, book):
+    """Filter the table to one book, indexed by (game_id, market, phase, side) -> (odds, line)"""
+    
+    index = {}
+    rows = zip(columns['game_id'], columns['book'], columns['market'],
+               columns['side'], columns['phase'], columns['odds'], columns['line'])
+    
+    for game_id, row_book, market, side, phase, odds, line in rows:
+        if row_book == book:
+            index.setdefault((game_id, market, phase, side), (odds, line))
+    
+    return index
+
+
+def wide_book_columns(book_index, game_id):
+    """Flatten one game's lines for a book into the scraper's flat column names"""
+    
+    wide = {}
+    for column, market, phase, side, field in WIDE_COLUMNS:
+        odds, line = book_index.get((game_id, market, phase, side), NO_PRICE)
+        wide[column] = odds if field == 'odds' else line
+    return wide
+
+
+def lines_frame(columns):
+    """Build a typed DataFrame from the long-format columns"""
+    
+    # Imported here so scraping and streaming output never pay for pandas
+    import pandas as pd
+    
+    return pd.DataFrame({
+        'date': pd.Categorical(columns['date']),
+        'game_id': pd.array(columns['game_id']),
+        'book': pd.Categorical(columns['book']),
+        'market': pd.Categorical(columns['market'], categories=list(MARKET_SIDES)),
+        'side': pd.Categorical(columns['side'], categories=['away', 'home', 'over', 'under']),
+        'phase': pd.Categorical(columns['phase'], categories=[phase for phase, _ in PHASES]),
+        'odds': pd.array(columns['odds'], dtype='Int32'),
+        'line': pd.array(columns['line'], dtype='Float64'),
+    })
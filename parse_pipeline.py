@@ -0,0 +1,166 @@
+"""
+Parallel parsing pipeline for bulk workloads (backfills, archived pages)
+
+Fetching stays on I/O threads; the CPU-bound part (scanning for
+__NEXT_DATA__, JSON decoding and building game rows) runs in a process
+pool. Workers receive raw page bytes and send back compact batches: game
+rows as tuples plus the long-format line columns.
+
+A ParsePipeline keeps its process pool between runs, so only the first
+run pays for starting the workers. Close it (or use it as a context
+manager) when done:
+
+    with ParsePipeline(parse_workers=4) as pipeline:
+        for batch in pipeline.run_directory('pages'):
+            ...
+"""
+
+import os
+from collections import defaultdict, namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from pathlib import Path
+
+from game_record import GameRecord, games_frame
+from mlb_odds_scraper import BET_TYPES, ComprehensiveMLBScraper
+from next_data import extract_next_data, iter_byte_chunks, load_game_rows
+from odds_table import LINE_COLUMNS, lines_frame
+
+ParsedBatch = namedtuple('ParsedBatch', ['date', 'game_columns', 'game_rows', 'lines', 'pages'])
+
+_worker_scraper = None
+
+
+def _init_worker():
+    """Give each worker its own quiet scraper: no per-game output, errors still print"""
+    
+    global _worker_scraper
+    _worker_scraper = ComprehensiveMLBScraper(max_workers=1, quiet=True)
+
+
+def parse_page_body(body):
+    """Raw page bytes -> gameRows, or None when the page has no usable odds table"""
+    
+    if not body:
+        return None
+    payload = extract_next_data(iter_byte_chunks(body))
+    if payload is None:
+        return None
+    try:
+        return load_game_rows(payload)
+    except (KeyError, ValueError):
+        return None
+
+
+def build_batch(date_str, pages, page_count):
+    """Build a ParsedBatch from one date's {(date, bet_type): gameRows} (runs in a worker)"""
+    
+    scraper = _worker_scraper or ComprehensiveMLBScraper(max_workers=1, quiet=True)
+    lines = scraper.build_date_lines(date_str, pages)
+    games = scraper.build_date_games(date_str, pages, lines)
+    
+    # Plain tuples pickle smaller than GameRecords on the way back from the worker
+    game_columns = GameRecord._fields
+    game_rows = [tuple(game) for game in games]
+    
+    return ParsedBatch(date_str, game_columns, game_rows, lines, page_count)
+
+
+def parse_date_bodies(date_str, bodies):
+    """Parse one date's {bet_type: raw bytes} into a ParsedBatch (runs in a worker)"""
+    
+    pages = {(date_str, bet_type): parse_page_body(bodies.get(bet_type)) for bet_type in BET_TYPES}
+    return build_batch(date_str, pages, sum(1 for body in bodies.values() if body))
+
+
+def group_page_files(page_dir):
+    """Map date -> {bet_type: path} for saved pages named <date>_<bet_type>.html"""
+    
+    grouped = defaultdict(dict)
+    for path in sorted(Path(page_dir).glob('*.html')):
+        date_str, _, bet_type = path.stem.partition('_')
+        if bet_type in BET_TYPES:
+            grouped[date_str][bet_type] = path
+    return dict(grouped)
+
+
+class ParsePipeline:
+    """Fetch on threads, parse on processes (one pool reused across runs)"""
+    
+    def __init__(self, scraper=None, fetch_workers=6, parse_workers=None):
+        self.scraper = scraper or ComprehensiveMLBScraper(max_workers=fetch_workers)
+        self.fetch_workers = max(1, fetch_workers)
+        self.parse_workers = parse_workers or os.cpu_count() or 1
+        self._parsers = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def close(self):
+        """Shut the worker processes down; the next run starts a new pool"""
+        
+        if self._parsers is not None:
+            self._parsers.shutdown()
+            self._parsers = None
+    
+    def _process_pool(self):
+        if self._parsers is None:
+            self._parsers = ProcessPoolExecutor(max_workers=self.parse_workers, initializer=_init_worker)
+        return self._parsers
+    
+    def run(self, dates):
+        """Fetch and parse the given dates, yielding ParsedBatches as they finish"""
+        
+        bodies = defaultdict(dict)
+        parsers = self._process_pool()
+        
+        with ThreadPoolExecutor(max_workers=self.fetch_workers) as fetchers:
+            fetching = {
+                fetchers.submit(self.scraper.download_page, date_str, bet_type): (date_str, bet_type)
+                for date_str in dates for bet_type in BET_TYPES
+            }
+            parsing = set()
+            
+            while fetching or parsing:
+                done, _ = wait(set(fetching) | parsing, return_when=FIRST_COMPLETED)
+                
+                for future in done:
+                    if future in parsing:
+                        parsing.discard(future)
+                        yield future.result()
+                        continue
+                    
+                    date_str, bet_type = fetching.pop(future)
+                    bodies[date_str][bet_type] = future.result()
+                    
+                    # A date goes to the process pool once all its pages are in
+                    if len(bodies[date_str]) == len(BET_TYPES):
+                        parsing.add(parsers.submit(parse_date_bodies, date_str, bodies.pop(date_str)))
+    
+    def run_directory(self, page_dir):
+        """Parse a directory of saved pages, yielding ParsedBatches in date order"""
+        
+        grouped = group_page_files(page_dir)
+        
+        def read_bodies(paths):
+            return {bet_type: path.read_bytes() for bet_type, path in paths.items()}
+        
+        yield from self._process_pool().map(parse_date_bodies, grouped, map(read_bodies, grouped.values()))
+
+
+def batches_to_frames(batches):
+    """Concatenate ParsedBatches into (games DataFrame, lines DataFrame)"""
+    
+    game_rows = []
+    lines = {column: [] for column in LINE_COLUMNS}
+    
+    # One frame from all rows, so categoricals aren't lost to a concat
+    # of frames with different categories
+    for batch in batches:
+        game_rows.extend(batch.game_rows)
+        for column in LINE_COLUMNS:
+            lines[column].extend(batch.lines[column])
+    
+    return games_frame(game_rows), lines_frame(lines)
@@ -0,0 +1,414 @@
+"""
+Append-only compressed archive of fetched __NEXT_DATA__ payloads
+
+The scraper only keeps the gameRows it extracts, so a new field or an
+SBR format change can't be applied to past polls. With an archive
+attached (ComprehensiveMLBScraper(archive=PayloadArchive(...)) or
+--archive on the CLIs), every fetched payload is compressed into a
+segment file and indexed by (date, bet_type, fetch_ts):
+
+    <archive>/segment-000001.bin   compressed payloads, back to back
+    <archive>/index.tsv            date, bet_type, fetch_ts, segment, offset, length, raw_length, codec
+    <archive>/dict-<id>.zdict      trained zstd dictionaries (optional)
+
+zstandard is used when it is installed (with the newest trained
+dictionary, if any); otherwise payloads are zlib-compressed. Reads go
+through mmap, and reprocessing decodes dates in parallel processes,
+writing each date as soon as it is done:
+
+    python payload_archive.py stats odds_archive
+    python payload_archive.py train odds_archive
+    python payload_archive.py reprocess odds_archive --out reprocessed --workers 4
+
+By default only the latest fetch of each page is reprocessed, into
+<out>/games/<date>.csv and <out>/lines/<date>.csv. --all-fetches replays
+every archived fetch instead, appending its lines to a SnapshotStore
+stamped with the fetch time, which rebuilds the line history:
+
+    python payload_archive.py reprocess odds_archive --all-fetches --store history.db
+
+Fetches already in the store are skipped, so a replay can be rerun.
+"""
+
+import argparse
+import mmap
+import os
+import threading
+import time
+import zlib
+from collections import defaultdict, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import zstandard
+except ImportError:  # zlib fallback
+    zstandard = None
+
+from mlb_odds_scraper import BET_TYPES
+from game_record import games_frame
+from next_data import load_game_rows
+from odds_table import extract_page_lines, lines_frame
+from parse_pipeline import _init_worker, build_batch
+from snapshot_store import SnapshotStore
+
+ArchiveEntry = namedtuple('ArchiveEntry', [
+    'date', 'bet_type', 'fetch_ts', 'segment', 'offset', 'length', 'raw_length', 'codec'])
+
+INDEX_NAME = 'index.tsv'
+MAX_SEGMENT_BYTES = 256 * 1024 * 1024
+ZSTD_LEVEL = 10
+ZLIB_LEVEL = 9
+
+_worker_archives = {}
+
+
+class PayloadArchive:
+    """Thread-safe appender and mmap reader for one archive directory"""
+    
+    def __init__(self, path, max_segment_bytes=MAX_SEGMENT_BYTES, use_zstd=True):
+        self.path = path
+        self.max_segment_bytes = max_segment_bytes
+        self.use_zstd = use_zstd and zstandard is not None
+        os.makedirs(path, exist_ok=True)
+        self.index_path = os.path.join(path, INDEX_NAME)
+        self.entries = self._load_index()
+        self.dictionaries = self._load_dictionaries()
+        self._lock = threading.Lock()
+        self._maps = {}
+        self._decompressors = {}
+        self._compressor = None
+        self._codec = None
+        self._segment = None
+        self._segment_file = None
+    
+    def _load_index(self):
+        entries = []
+        if not os.path.exists(self.index_path):
+            return entries
+        with open(self.index_path, encoding='utf-8') as f:
+            for line in f:
+                parts = line.rstrip('\n').split('\t')
+                if len(parts) != len(ArchiveEntry._fields):
+                    continue  # a torn final line from an interrupted write
+                date_str, bet_type, fetch_ts, segment, offset, length, raw_length, codec = parts
+                entries.append(ArchiveEntry(date_str, bet_type, float(fetch_ts), segment,
+                                            int(offset), int(length), int(raw_length), codec))
+        return entries
+    
+    def _load_dictionaries(self):
+        dictionaries = {}
+        # Oldest first, so the newest trained dictionary is the last key
+        names = sorted(os.listdir(self.path), key=lambda name: os.path.getmtime(os.path.join(self.path, name)))
+        for name in names:
+            if name.startswith('dict-') and name.endswith('.zdict'):
+                with open(os.path.join(self.path, name), 'rb') as f:
+                    dictionaries[name[len('dict-'):-len('.zdict')]] = f.read()
+        return dictionaries
+    
+    # Writing
+    
+    def _current_codec(self):
+        """(codec name, compress function) for new records"""
+        
+        if self._compressor is None:
+            if self.use_zstd and self.dictionaries:
+                dict_id = list(self.dictionaries)[-1]
+                dictionary = zstandard.ZstdCompressionDict(self.dictionaries[dict_id])
+                self._codec = f'zstd-dict-{dict_id}'
+                self._compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL, dict_data=dictionary).compress
+            elif self.use_zstd:
+                self._codec = 'zstd'
+                self._compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress
+            else:
+                self._codec = 'zlib'
+                self._compressor = lambda data: zlib.compress(data, ZLIB_LEVEL)
+        return self._codec, self._compressor
+    
+    def _open_segment(self, incoming):
+        """The segment file to append to, rolling over when it would grow too large"""
+        
+        if self._segment_file is not None and self._segment_file.tell() + incoming > self.max_segment_bytes:
+            self._segment_file.close()
+            self._segment_file = None
+        
+        if self._segment_file is None:
+            segments = sorted(name for name in os.listdir(self.path) if name.startswith('segment-'))
+            name = segments[-1] if segments else 'segment-000001.bin'
+            if segments and os.path.getsize(os.path.join(self.path, name)) + incoming > self.max_segment_bytes:
+                name = f"segment-{int(name[len('segment-'):-len('.bin')]) + 1:06d}.bin"
+            self._segment = name
+            self._segment_file = open(os.path.join(self.path, name), 'ab')
+        return self._segment, self._segment_file
+    
+    def append(self, date_str, bet_type, payload, fetch_ts=None):
+        """Compress and append one payload; returns its ArchiveEntry"""
+        
+        fetch_ts = time.time() if fetch_ts is None else fetch_ts
+        
+        # Compressor objects aren't safe to share between threads, so this is serialized too
+        with self._lock:
+            codec, compress = self._current_codec()
+            data = compress(payload)
+            segment, f = self._open_segment(len(data))
+            offset = f.tell()
+            f.write(data)
+            f.flush()
+            
+            entry = ArchiveEntry(date_str, bet_type, fetch_ts, segment, offset, len(data), len(payload), codec)
+            # The index line goes last, so it never points at bytes that weren't written
+            with open(self.index_path, 'a', encoding='utf-8') as index:
+                index.write('\t'.join(str(value) for value in entry) + '\n')
+            self.entries.append(entry)
+        return entry
+    
+    def train_dictionary(self, size=112640, samples=1000):
+        """Train a zstd dictionary on the newest payloads; later appends use it"""
+        
+        if zstandard is None:
+            raise RuntimeError("Training a dictionary needs the zstandard package")
+        
+        sample_data = [self.read(entry) for entry in self.entries[-samples:]]
+        dictionary = zstandard.train_dictionary(size, sample_data)
+        dict_id = str(dictionary.dict_id())
+        path = os.path.join(self.path, f'dict-{dict_id}.zdict')
+        with open(path, 'wb') as f:
+            f.write(dictionary.as_bytes())
+        
+        with self._lock:
+            self.dictionaries.pop(dict_id, None)
+            self.dictionaries[dict_id] = dictionary.as_bytes()
+            self._compressor = None
+        return dict_id
+    
+    # Reading
+    
+    def _map(self, segment, end):
+        """mmap of a segment covering at least `end` bytes (remapped as the segment grows)"""
+        
+        mapped = self._maps.get(segment)
+        if mapped is None or len(mapped) < end:
+            if mapped is not None:
+                mapped.close()
+            with open(os.path.join(self.path, segment), 'rb') as f:
+                mapped = self._maps[segment] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return mapped
+    
+    def _decompress(self, codec, data, raw_length):
+        if codec == 'zlib':
+            return zlib.decompress(data)
+        if zstandard is None:
+            raise RuntimeError(f"Reading {codec} records needs the zstandard package")
+        
+        decompressor = self._decompressors.get(codec)
+        if decompressor is None:
+            dict_data = None
+            if codec.startswith('zstd-dict-'):
+                dict_data = zstandard.ZstdCompressionDict(self.dictionaries[codec[len('zstd-dict-'):]])
+            decompressor = self._decompressors[codec] = zstandard.ZstdDecompressor(dict_data=dict_data)
+        return decompressor.decompress(data, max_output_size=raw_length)
+    
+    def read(self, entry):
+        """The original payload bytes for an entry"""
+        
+        end = entry.offset + entry.length
+        with self._lock:
+            data = self._map(entry.segment, end)[entry.offset:end]
+        return self._decompress(entry.codec, data, entry.raw_length)
+    
+    def select(self, start_date=None, end_date=None, latest_only=True):
+        """Entries in date range; with latest_only, just the last fetch per (date, bet_type)"""
+        
+        entries = [entry for entry in self.entries
+                   if (start_date is None or entry.date >= start_date)
+                   and (end_date is None or entry.date <= end_date)]
+        if latest_only:
+            latest = {}
+            for entry in entries:
+                key = (entry.date, entry.bet_type)
+                if key not in latest or entry.fetch_ts >= latest[key].fetch_ts:
+                    latest[key] = entry
+            entries = list(latest.values())
+        return sorted(entries, key=lambda entry: (entry.date, entry.fetch_ts))
+    
+    def stats(self):
+        """(records, raw payload bytes, stored bytes, records per codec)"""
+        
+        codecs = defaultdict(int)
+        for entry in self.entries:
+            codecs[entry.codec] += 1
+        return (len(self.entries), sum(entry.raw_length for entry in self.entries),
+                sum(entry.length for entry in self.entries), dict(codecs))
+    
+    def close(self):
+        with self._lock:
+            if self._segment_file is not None:
+                self._segment_file.close()
+                self._segment_file = None
+        for mapped in self._maps.values():
+            mapped.close()
+        self._maps = {}
+
+
+def _worker_archive(archive_path):
+    archive = _worker_archives.get(archive_path)
+    if archive is None:
+        archive = _worker_archives[archive_path] = PayloadArchive(archive_path)
+    return archive
+
+
+def reprocess_date(archive_path, date_str, entries):
+    """Decode one date's archived payloads into a ParsedBatch (runs in a worker)"""
+    
+    archive = _worker_archive(archive_path)
+    pages = {}
+    for entry in entries:
+        try:
+            pages[(date_str, entry.bet_type)] = load_game_rows(archive.read(entry))
+        except (KeyError, ValueError):
+            pages[(date_str, entry.bet_type)] = None
+    return build_batch(date_str, pages, len(entries))
+
+
+def reprocess_fetches(archive_path, date_str, entries):
+    """Decode every archived fetch of one date into [(fetch_ts, line columns)] (runs in a worker)"""
+    
+    archive = _worker_archive(archive_path)
+    polls = []
+    for entry in entries:
+        try:
+            game_rows = load_game_rows(archive.read(entry))
+        except (KeyError, ValueError):
+            continue
+        polls.append((entry.fetch_ts, extract_page_lines(date_str, entry.bet_type, game_rows)))
+    return date_str, polls
+
+
+def _entries_by_date(archive_path, start_date, end_date, latest_only):
+    archive = PayloadArchive(archive_path)
+    by_date = defaultdict(list)
+    for entry in archive.select(start_date, end_date, latest_only):
+        if entry.bet_type in BET_TYPES:
+            by_date[entry.date].append(entry)
+    archive.close()
+    return by_date
+
+
+def _map_dates(worker, archive_path, by_date, workers):
+    dates = sorted(by_date)
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1, initializer=_init_worker) as pool:
+        yield from pool.map(worker, [archive_path] * len(dates), dates,
+                            [by_date[date_str] for date_str in dates])
+
+
+def reprocess(archive_path, start_date=None, end_date=None, workers=None):
+    """Re-run extraction over the archive's latest payload per page, yielding ParsedBatches by date"""
+    
+    by_date = _entries_by_date(archive_path, start_date, end_date, latest_only=True)
+    yield from _map_dates(reprocess_date, archive_path, by_date, workers)
+
+
+def reprocess_history(archive_path, start_date=None, end_date=None, workers=None):
+    """Re-run extraction over every archived fetch, yielding (date, [(fetch_ts, line columns)]) by date"""
+    
+    by_date = _entries_by_date(archive_path, start_date, end_date, latest_only=False)
+    yield from _map_dates(reprocess_fetches, archive_path, by_date, workers)
+
+
+def reprocess_to_store(archive_path, store, start_date=None, end_date=None, workers=None):
+    """Replay every archived fetch into a SnapshotStore at its fetch time
+    
+    Fetches the store already holds (same date and timestamp) are skipped,
+    so replaying an archive twice doesn't duplicate its polls. Returns
+    (dates, rows written, fetches skipped).
+    """
+    
+    dates = rows = skipped = 0
+    for date_str, polls in reprocess_history(archive_path, start_date, end_date, workers):
+        stored = store.snapshot_times(date_str)
+        for fetch_ts, lines in polls:
+            if fetch_ts in stored:
+                skipped += 1
+                continue
+            rows += store.append(lines, fetch_ts)
+        dates += 1
+    return dates, rows, skipped
+
+
+def write_batch(batch, out_dir, file_format='csv'):
+    """Write one ParsedBatch to <out_dir>/games/<date> and <out_dir>/lines/<date>"""
+    
+    frames = (('games', games_frame(batch.game_rows)), ('lines', lines_frame(batch.lines)))
+    for name, df in frames:
+        os.makedirs(os.path.join(out_dir, name), exist_ok=True)
+        path = os.path.join(out_dir, name, f"{batch.date}.{file_format}")
+        if file_format == 'parquet':
+            df.to_parquet(path, index=False)
+        else:
+            df.to_csv(path, index=False)
+    return len(frames[0][1]), len(frames[1][1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compressed archive of fetched SBR payloads")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    
+    stats = subparsers.add_parser('stats', help="record count and compression ratio")
+    stats.add_argument('archive')
+    
+    train = subparsers.add_parser('train', help="train a zstd dictionary for new records")
+    train.add_argument('archive')
+    train.add_argument('--size', type=int, default=112640)
+    train.add_argument('--samples', type=int, default=1000)
+    
+    rerun = subparsers.add_parser('reprocess', help="re-extract games and lines from archived payloads")
+    rerun.add_argument('archive')
+    rerun.add_argument('--out', default='reprocessed')
+    rerun.add_argument('--start')
+    rerun.add_argument('--end')
+    rerun.add_argument('--workers', type=int)
+    rerun.add_argument('--format', choices=['csv', 'parquet'], default='csv')
+    rerun.add_argument('--all-fetches', action='store_true',
+                       help="replay every archived fetch into --store instead of the latest per page")
+    rerun.add_argument('--store',
+                       help="SnapshotStore file for --all-fetches (keep it apart from the live poll store)")
+    
+    args = parser.parse_args()
+    if args.command == 'reprocess' and args.all_fetches and not args.store:
+        # Replaying into the live store would double every poll it already has
+        parser.error("--all-fetches needs --store")
+    
+    if args.command == 'stats':
+        records, raw_bytes, stored_bytes, codecs = PayloadArchive(args.archive).stats()
+        ratio = stored_bytes / raw_bytes if raw_bytes else 0
+        print(f"📦 {records} payloads: {raw_bytes / 2**20:.1f} MB raw -> {stored_bytes / 2**20:.1f} MB stored "
+              f"({ratio:.1%}) {codecs}")
+    elif args.command == 'train':
+        if zstandard is None:
+            raise SystemExit("❌ Training a dictionary needs the zstandard package (pip install zstandard)")
+        dict_id = PayloadArchive(args.archive).train_dictionary(args.size, args.samples)
+        print(f"📚 Trained dictionary {dict_id}; new payloads will use it")
+    elif args.all_fetches:
+        start = time.perf_counter()
+        store = SnapshotStore(args.store)
+        try:
+            dates, rows, skipped = reprocess_to_store(args.archive, store, args.start, args.end, args.workers)
+        finally:
+            store.close()
+        print(f"🎉 Replayed {dates} dates into {rows} snapshot rows in "
+              f"{time.perf_counter() - start:.1f}s -> {args.store}")
+        if skipped:
+            print(f"⏭️ Skipped {skipped} fetches already in {args.store}")
+    else:
+        start = time.perf_counter()
+        games = lines = 0
+        # Each date is written as it comes back, so memory stays at one date's rows
+        for batch in reprocess(args.archive, args.start, args.end, args.workers):
+            date_games, date_lines = write_batch(batch, args.out, args.format)
+            games += date_games
+            lines += date_lines
+        print(f"🎉 Reprocessed {games} games and {lines} lines in "
+              f"{time.perf_counter() - start:.1f}s -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
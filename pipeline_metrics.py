@@ -0,0 +1,227 @@
+"""
+Per-stage timers and counters for the scrape pipeline
+
+ComprehensiveMLBScraper records into a PipelineMetrics as it works:
+
+    sbr_fetch_seconds{bet_type}        waiting on the network (headers + body chunks)
+    sbr_extract_seconds{bet_type}      scanning the body for __NEXT_DATA__
+    sbr_decode_seconds{bet_type}       JSON decoding of the odds tables
+    sbr_bytes_received_total{bet_type} bytes off the wire (compressed if gzip)
+    sbr_games_parsed_total{bet_type}   game rows decoded
+    sbr_fetch_errors_total{bet_type,reason}
+    sbr_cache_hits_total{bet_type,kind}
+    sbr_book_hit_rate{book,market,date} share of a date's games a book has a current price for
+
+Metrics can be exported as Prometheus text or JSON, written to a file
+after every poll or served over HTTP:
+
+    metrics.write('metrics.prom')        # or metrics.json
+    serve_metrics(metrics, port=9464)    # GET /metrics, /metrics.json
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+PREFIX = 'sbr_'
+
+
+def _label_key(labels):
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(label_key):
+    if not label_key:
+        return ''
+    pairs = ','.join(f'{name}="{value}"' for name, value in label_key)
+    return '{' + pairs + '}'
+
+
+class PipelineMetrics:
+    """Thread-safe counters, gauges and timers keyed by (name, labels)"""
+    
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.gauges = {}
+        self.timers = {}  # (name, labels) -> [count, total seconds, max seconds]
+    
+    def inc(self, name, value=1, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+    
+    def set(self, name, value, **labels):
+        with self._lock:
+            self.gauges[(name, _label_key(labels))] = value
+    
+    def observe(self, name, seconds, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            timer = self.timers.setdefault(key, [0, 0.0, 0.0])
+            timer[0] += 1
+            timer[1] += seconds
+            timer[2] = max(timer[2], seconds)
+    
+    @contextmanager
+    def timer(self, name, **labels):
+        start = self.clock()
+        try:
+            yield
+        finally:
+            self.observe(name, self.clock() - start, **labels)
+    
+    def record_book_coverage(self, columns):
+        """Set sbr_book_hit_rate per date from long-format line columns (one or several dates)"""
+        
+        games = {}
+        priced = {}
+        for date_str, game_id, book, market, phase, odds in zip(columns['date'], columns['game_id'],
+                                                                columns['book'], columns['market'],
+                                                                columns['phase'], columns['odds']):
+            games.setdefault((date_str, market), set()).add(game_id)
+            if phase == 'current' and odds is not None:
+                priced.setdefault((date_str, book, market), set()).add(game_id)
+        
+        # Each date gets its own gauge, so a multi-date fetch doesn't leave
+        # only the last date's coverage behind
+        books = set(columns['book'])
+        for (date_str, market), market_games in games.items():
+            for book in books:
+                hits = len(priced.get((date_str, book, market), ()))
+                self.set('book_hit_rate', hits / len(market_games), book=book, market=market, date=date_str)
+    
+    def snapshot(self):
+        """Plain dict of every metric, for JSON export or quick inspection"""
+        
+        with self._lock:
+            counters = dict(self.counters)
+            gauges = dict(self.gauges)
+            timers = {key: list(value) for key, value in self.timers.items()}
+        
+        def rows(metrics, render):
+            return [
+                {'name': PREFIX + name, 'labels': dict(labels), **render(value)}
+                for (name, labels), value in sorted(metrics.items())
+            ]
+        
+        return {
+            'counters': rows(counters, lambda value: {'value': value}),
+            'gauges': rows(gauges, lambda value: {'value': value}),
+            'timers': rows(timers, lambda value: {'count': value[0], 'sum': value[1], 'max': value[2]}),
+        }
+    
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2)
+    
+    def to_prometheus(self):
+        """Prometheus text exposition format (timers become summaries without quantiles)"""
+        
+        with self._lock:
+            counters = sorted(self.counters.items())
+            gauges = sorted(self.gauges.items())
+            timers = sorted(self.timers.items())
+        
+        lines = []
+        declared = set()
+        
+        def declare(name, kind):
+            if name not in declared:
+                declared.add(name)
+                lines.append(f'# TYPE {name} {kind}')
+        
+        for (name, labels), value in counters:
+            declare(PREFIX + name, 'counter')
+            lines.append(f'{PREFIX}{name}{_format_labels(labels)} {value}')
+        for (name, labels), value in gauges:
+            declare(PREFIX + name, 'gauge')
+            lines.append(f'{PREFIX}{name}{_format_labels(labels)} {value:g}')
+        for (name, labels), (count, total, longest) in timers:
+            declare(PREFIX + name, 'summary')
+            lines.append(f'{PREFIX}{name}_count{_format_labels(labels)} {count}')
+            lines.append(f'{PREFIX}{name}_sum{_format_labels(labels)} {total:.6f}')
+        for (name, labels), (count, total, longest) in timers:
+            declare(f'{PREFIX}{name}_max', 'gauge')
+            lines.append(f'{PREFIX}{name}_max{_format_labels(labels)} {longest:.6f}')
+        
+        return '\n'.join(lines) + '\n'
+    
+    def write(self, path):
+        """Atomically write Prometheus text (.prom / .txt) or JSON (anything else)"""
+        
+        text = self.to_prometheus() if path.endswith(('.prom', '.txt')) else self.to_json()
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    
+    def summary(self):
+        """One line per timer: count, mean and max, for end-of-run logging"""
+        
+        lines = []
+        for row in self.snapshot()['timers']:
+            labels = ','.join(f'{name}={value}' for name, value in row['labels'].items())
+            mean = row['sum'] / row['count'] if row['count'] else 0.0
+            lines.append(f"{row['name']}[{labels}] n={row['count']} "
+                         f"mean={mean * 1000:.1f}ms max={row['max'] * 1000:.1f}ms")
+        return '\n'.join(lines)
+
+
+class MeteredChunks:
+    """Wrap a chunk iterator, tracking bytes and time spent waiting for chunks
+    
+    The time not spent waiting here is what the consumer spent on the
+    chunks, which is how extraction is separated from network time when
+    the two are interleaved by streaming.
+    """
+    
+    def __init__(self, chunks, clock=time.perf_counter):
+        self.chunks = chunks
+        self.clock = clock
+        self.wait = 0.0
+        self.bytes = 0
+    
+    def __iter__(self):
+        chunks = iter(self.chunks)
+        while True:
+            start = self.clock()
+            try:
+                chunk = next(chunks)
+            except StopIteration:
+                self.wait += self.clock() - start
+                return
+            self.wait += self.clock() - start
+            self.bytes += len(chunk)
+            yield chunk
+
+
+def serve_metrics(metrics, port, host='127.0.0.1'):
+    """Serve /metrics (Prometheus text) and /metrics.json from a daemon thread"""
+    
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == '/metrics':
+                body, content_type = metrics.to_prometheus(), 'text/plain; version=0.0.4'
+            elif self.path == '/metrics.json':
+                body, content_type = metrics.to_json(), 'application/json'
+            else:
+                self.send_error(404)
+                return
+            data = body.encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        
+        def log_message(self, format, *args):
+            pass
+    
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
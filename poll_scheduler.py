@@ -0,0 +1,247 @@
+"""
+Adaptive polling daemon around ComprehensiveMLBScraper
+
+Each (date, bet_type) page is its own task in a priority queue ordered by
+next due time. After every poll the page's games decide how soon it is
+polled again: close to first pitch it is polled every minute, tomorrow's
+slate every half hour, and once every game on it is final it is dropped.
+
+    python poll_scheduler.py --store odds_snapshots.db
+    python poll_scheduler.py --quiet --metrics-file metrics.prom --metrics-port 9464
+    python poll_scheduler.py --alert-rules alert_rules.json --alert-log alerts.jsonl
+    python poll_scheduler.py --cache-dir .sbr_cache --compressed
+    python poll_scheduler.py --delta-log line_deltas.jsonl
+
+clock and sleep are injectable, so the schedule can be driven by a fake
+clock without touching the network or waiting in real time.
+"""
+
+import argparse
+import heapq
+import itertools
+import random
+import time
+from datetime import datetime, timedelta
+
+from game_status import is_final
+from mlb_odds_scraper import BET_TYPES, ComprehensiveMLBScraper
+from pipeline_metrics import serve_metrics
+
+# (seconds until the next first pitch, poll interval) - first match wins
+POLL_TIERS = (
+    (15 * 60, 60),
+    (60 * 60, 2 * 60),
+    (3 * 60 * 60, 5 * 60),
+    (12 * 60 * 60, 15 * 60),
+)
+SLOW_INTERVAL = 30 * 60     # tomorrow and beyond, or no start times yet
+STARTED_INTERVAL = 10 * 60  # every remaining game has started but isn't final
+ERROR_INTERVAL = 2 * 60     # fetch failed; retry soon
+
+
+def parse_start_time(start_date):
+    """gameView.startDate (ISO 8601) -> Unix seconds, or None"""
+    
+    if not start_date or 'T' not in start_date:
+        return None
+    try:
+        return datetime.fromisoformat(start_date.replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        return None
+
+
+def poll_interval(game_rows, now):
+    """Seconds until a page should be polled again, or None to stop polling it"""
+    
+    if game_rows is None:
+        return ERROR_INTERVAL
+    
+    upcoming = []
+    started = False
+    for game_row in game_rows:
+        game_view = game_row.get('gameView', {})
+        if is_final(game_view.get('status')):
+            continue
+        start = parse_start_time(game_view.get('startDate'))
+        if start is None or start > now:
+            upcoming.append(start)
+        else:
+            started = True
+    
+    if not upcoming:
+        return STARTED_INTERVAL if started else (SLOW_INTERVAL if not game_rows else None)
+    
+    known = [start for start in upcoming if start is not None]
+    if not known:
+        return SLOW_INTERVAL
+    
+    until_first_pitch = min(known) - now
+    for threshold, interval in POLL_TIERS:
+        if until_first_pitch <= threshold:
+            return interval
+    return SLOW_INTERVAL
+
+
+class PollScheduler:
+    """Priority queue of (due time, date, bet_type) polls with jitter"""
+    
+    def __init__(self, scraper=None, on_poll=None, clock=time.time, sleep=time.sleep,
+                 jitter=0.1, days_ahead=1, rng=None, metrics_path=None):
+        self.scraper = scraper or ComprehensiveMLBScraper()
+        self.metrics = self.scraper.metrics
+        self.metrics_path = metrics_path  # rewritten after every poll when set
+        self.on_poll = on_poll
+        self.clock = clock
+        self.sleep = sleep
+        self.jitter = jitter
+        self.days_ahead = days_ahead
+        self.rng = rng or random.Random()
+        self.queue = []
+        self.scheduled = set()
+        self.retired = set()
+        self._seq = itertools.count()
+    
+    def schedule(self, date_str, bet_type, due):
+        heapq.heappush(self.queue, (due, next(self._seq), date_str, bet_type))
+        self.scheduled.add((date_str, bet_type))
+    
+    def ensure_dates(self):
+        """Add tasks for today..today+days_ahead that aren't queued or retired yet"""
+        
+        today = datetime.fromtimestamp(self.clock()).date()
+        now = self.clock()
+        for offset in range(self.days_ahead + 1):
+            date_str = (today + timedelta(days=offset)).strftime("%Y-%m-%d")
+            for bet_type in BET_TYPES:
+                task = (date_str, bet_type)
+                if task not in self.scheduled and task not in self.retired:
+                    self.schedule(date_str, bet_type, now)
+    
+    def _jittered(self, interval):
+        return interval * (1 + self.rng.uniform(-self.jitter, self.jitter))
+    
+    def run_once(self):
+        """Wait for the next due poll, run it and reschedule; returns the polled task"""
+        
+        self.ensure_dates()
+        due, _, date_str, bet_type = heapq.heappop(self.queue)
+        self.scheduled.discard((date_str, bet_type))
+        
+        wait = due - self.clock()
+        if wait > 0:
+            self.sleep(wait)
+        
+        now = self.clock()
+        with self.metrics.timer('poll_seconds', bet_type=bet_type):
+            game_rows = self.scraper.scrape_bet_type(date_str, bet_type)
+            if self.on_poll is not None:
+                self.on_poll(date_str, bet_type, game_rows, now)
+        self.metrics.inc('polls_total', bet_type=bet_type,
+                         outcome='error' if game_rows is None else 'ok')
+        
+        interval = poll_interval(game_rows, now)
+        
+        # An empty slate may still be published later today, but not for a past date
+        today = datetime.fromtimestamp(now).strftime("%Y-%m-%d")
+        if game_rows == [] and date_str < today:
+            interval = None
+        
+        if interval is None:
+            print(f"🏁 All games final for {bet_type} on {date_str}; no more polling")
+            self.retired.add((date_str, bet_type))
+        else:
+            self.schedule(date_str, bet_type, now + self._jittered(interval))
+        
+        self.metrics.set('queued_pages', len(self.queue))
+        if self.metrics_path:
+            self.metrics.write(self.metrics_path)
+        
+        return date_str, bet_type, interval
+    
+    def run(self, max_polls=None):
+        """Poll forever (or max_polls times)"""
+        
+        for _ in itertools.count() if max_polls is None else range(max_polls):
+            self.run_once()
+
+
+def main():
+    from http_cache import ResponseCache
+    from line_alerts import AlertEngine, JsonlSink, StdoutSink, WebhookSink, load_rules
+    from line_deltas import DeltaLog, LineDeltaTracker
+    from line_movement import LineMovementAggregates
+    from odds_table import extract_page_lines
+    from snapshot_store import SnapshotStore
+    
+    parser = argparse.ArgumentParser(description="Adaptive MLB odds polling daemon")
+    parser.add_argument('--store', default='odds_snapshots.db')
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--quiet', action='store_true', help="only print errors and line changes")
+    parser.add_argument('--metrics-file', help="write metrics after every poll (.prom for Prometheus text, else JSON)")
+    parser.add_argument('--metrics-port', type=int, help="serve /metrics and /metrics.json on this port")
+    parser.add_argument('--alert-rules', help="JSON list of line_alerts rules")
+    parser.add_argument('--alert-log', help="append alerts to this JSONL file")
+    parser.add_argument('--alert-webhook', help="POST alerts to this URL")
+    parser.add_argument('--archive', help="keep every fetched payload in this payload_archive directory")
+    parser.add_argument('--delta-log', help="append per-date keyframes and line deltas to this JSONL file")
+    parser.add_argument('--cache-dir', help="revalidate pages with conditional GETs against this http_cache directory")
+    parser.add_argument('--compressed', action='store_true',
+                        help="accept gzip (falls back to identity per bet type if a response won't decode)")
+    args = parser.parse_args()
+    
+    store = SnapshotStore(args.store)
+    aggregates = LineMovementAggregates(store)
+    # A DeltaLog tracks changes the same way and also persists them for line_deltas.reconstruct
+    if args.delta_log:
+        track_changes = DeltaLog(args.delta_log).record
+    else:
+        track_changes = LineDeltaTracker().update
+    
+    alerts = None
+    if args.alert_rules:
+        sinks = [StdoutSink()]
+        if args.alert_log:
+            sinks.append(JsonlSink(args.alert_log))
+        if args.alert_webhook:
+            sinks.append(WebhookSink(args.alert_webhook))
+        alerts = AlertEngine(load_rules(args.alert_rules), sinks)
+    
+    def record(date_str, bet_type, game_rows, ts):
+        if not game_rows:
+            return
+        lines = extract_page_lines(date_str, bet_type, game_rows)
+        store.append(lines, ts)
+        aggregates.refresh()
+        changes = track_changes(lines, ts)
+        print(f"🔁 {bet_type} {date_str}: {len(changes)} line changes")
+        if alerts is not None:
+            alerts.process(changes)
+    
+    archive = None
+    if args.archive:
+        from payload_archive import PayloadArchive
+        archive = PayloadArchive(args.archive)
+    
+    cache = None
+    if args.cache_dir:
+        # ttl=0: every poll asks SBR (a 304 when unchanged); only settled pages skip the request
+        cache = ResponseCache(args.cache_dir, ttl=0)
+    
+    scraper = ComprehensiveMLBScraper(max_workers=args.workers, quiet=args.quiet, archive=archive, cache=cache,
+                                      compressed=args.compressed)
+    scheduler = PollScheduler(scraper, on_poll=record, metrics_path=args.metrics_file)
+    if args.metrics_port:
+        serve_metrics(scraper.metrics, args.metrics_port)
+        print(f"📈 Metrics on http://127.0.0.1:{args.metrics_port}/metrics")
+    try:
+        scheduler.run()
+    except KeyboardInterrupt:
+        print("👋 Scheduler stopped")
+    finally:
+        store.close()
+        if archive is not None:
+            archive.close()
+
+
+if __name__ == "__main__":
+    main()
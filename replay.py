@@ -0,0 +1,282 @@
+"""
+Record SBR pages and replay them from a local stand-in server
+
+Recording saves each page body as <date>_<bet_type>.html, the layout the
+benchmarks and parse_pipeline.run_directory already read:
+
+    python replay.py record 2025-07-14 2025-07-16 --out saved_pages
+
+Serving answers the three bet type paths the scraper requests, with
+optional latency and injected errors:
+
+    python replay.py serve saved_pages --port 8765 --latency 0.05 --error-rate 0.02
+
+Point a scraper at it with ComprehensiveMLBScraper(base_url=...) or the
+SBR_BASE_URL environment variable. With --cycle, dates that were never
+recorded are answered with a recorded page, so a whole season can be
+replayed from a handful of fixtures.
+"""
+
+import argparse
+import gzip
+import hashlib
+import os
+import random
+import sys
+import threading
+import time
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from mlb_odds_scraper import BET_TYPES, ComprehensiveMLBScraper
+
+BASE_PATH = '/betting-odds/mlb-baseball'
+
+# Path under BASE_PATH -> bet type, matching ComprehensiveMLBScraper.bet_type_url
+BET_TYPE_PATHS = {
+    '/': 'moneyline',
+    '/pointspread/full-game/': 'pointspread',
+    '/totals/full-game/': 'totals',
+}
+
+ERROR_BODY = b'injected error'
+GZIPPED_ERROR_BODY = gzip.compress(ERROR_BODY)
+
+
+def page_filename(date_str, bet_type):
+    return f"{date_str}_{bet_type}.html"
+
+
+def record_pages(dates, out_dir, scraper=None, overwrite=False):
+    """Save every bet type page for dates under out_dir; returns the paths written"""
+    
+    scraper = scraper or ComprehensiveMLBScraper()
+    os.makedirs(out_dir, exist_ok=True)
+    written = []
+    
+    for date_str in dates:
+        for bet_type in BET_TYPES:
+            path = os.path.join(out_dir, page_filename(date_str, bet_type))
+            if os.path.exists(path) and not overwrite:
+                continue
+            
+            body = scraper.download_page(date_str, bet_type)
+            if body is None:
+                print(f"❌ Could not record {bet_type} for {date_str}")
+                continue
+            
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(body)
+            os.replace(tmp_path, path)
+            written.append(path)
+            print(f"📼 Recorded {bet_type} for {date_str} ({len(body) / 1024:.0f} KB)")
+    
+    return written
+
+
+class QuietHTTPServer(ThreadingHTTPServer):
+    """The scraper hangs up once __NEXT_DATA__ is read; that's not an error here"""
+    
+    daemon_threads = True
+    
+    def handle_error(self, request, client_address):
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class ReplayPage:
+    """A recorded body with its ETag and a lazily built gzip copy"""
+    
+    def __init__(self, body):
+        self.body = body
+        self.etag = '"%s"' % hashlib.sha1(body).hexdigest()
+        self._gzipped = None
+    
+    @property
+    def gzipped(self):
+        if self._gzipped is None:
+            self._gzipped = gzip.compress(self.body, compresslevel=6)
+        return self._gzipped
+
+
+class ReplayServer:
+    """Serve recorded pages at the paths the scraper requests
+    
+    latency (+/- jitter) seconds is slept before every response, and
+    error_rate of requests get error_status instead of the page. Both are
+    drawn from a seeded RNG so runs are repeatable.
+    """
+    
+    def __init__(self, page_dir, host='127.0.0.1', port=0, latency=0.0, jitter=0.0,
+                 error_rate=0.0, error_status=503, cycle=False, seed=0):
+        self.pages = self.load_pages(page_dir)
+        if not self.pages:
+            raise ValueError(f"No recorded pages found in {page_dir}")
+        self.dates = sorted({date_str for date_str, _ in self.pages})
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.cycle = cycle
+        self.rng = random.Random(seed)
+        self.requests = 0
+        self._lock = threading.Lock()
+        self.httpd = QuietHTTPServer((host, port), self.handler_class())
+        self._thread = None
+    
+    @staticmethod
+    def load_pages(page_dir):
+        pages = {}
+        for name in os.listdir(page_dir):
+            stem, ext = os.path.splitext(name)
+            date_str, _, bet_type = stem.partition('_')
+            if ext == '.html' and bet_type in BET_TYPES:
+                with open(os.path.join(page_dir, name), 'rb') as f:
+                    pages[(date_str, bet_type)] = ReplayPage(f.read())
+        return pages
+    
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}{BASE_PATH}"
+    
+    def lookup(self, date_str, bet_type):
+        """The recorded page for a request, or None"""
+        
+        page = self.pages.get((date_str, bet_type))
+        if page is None and self.cycle:
+            try:
+                ordinal = date.fromisoformat(date_str).toordinal()
+            except ValueError:
+                return None
+            page = self.pages.get((self.dates[ordinal % len(self.dates)], bet_type))
+        return page
+    
+    def next_delay_and_error(self):
+        with self._lock:
+            self.requests += 1
+            delay = self.latency + (self.rng.uniform(-self.jitter, self.jitter) if self.jitter else 0.0)
+            failed = self.error_rate > 0 and self.rng.random() < self.error_rate
+        return max(0.0, delay), failed
+    
+    def handler_class(self):
+        server = self
+        
+        class ReplayHandler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            
+            def do_GET(self):
+                url = urlparse(self.path)
+                bet_type = None
+                if url.path.startswith(BASE_PATH):
+                    bet_type = BET_TYPE_PATHS.get(url.path[len(BASE_PATH):] or '/')
+                date_str = parse_qs(url.query).get('date', [''])[0]
+                
+                delay, failed = server.next_delay_and_error()
+                if delay:
+                    time.sleep(delay)
+                
+                page = server.lookup(date_str, bet_type) if bet_type else None
+                if failed:
+                    # Error pages are compressed like any other, as a CDN would
+                    if self.accepts_gzip():
+                        self.send_body(server.error_status, GZIPPED_ERROR_BODY, {'Content-Encoding': 'gzip'})
+                    else:
+                        self.send_body(server.error_status, ERROR_BODY)
+                    return
+                if page is None:
+                    self.send_body(404, b'not recorded')
+                    return
+                
+                if self.headers.get('If-None-Match') == page.etag:
+                    self.send_body(304, b'', {'ETag': page.etag})
+                    return
+                
+                headers = {'ETag': page.etag, 'Content-Type': 'text/html; charset=utf-8'}
+                if self.accepts_gzip():
+                    headers['Content-Encoding'] = 'gzip'
+                    self.send_body(200, page.gzipped, headers)
+                else:
+                    self.send_body(200, page.body, headers)
+            
+            def accepts_gzip(self):
+                return 'gzip' in self.headers.get('Accept-Encoding', '')
+            
+            def send_body(self, status, body, headers=None):
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                pass
+        
+        return ReplayHandler
+    
+    def start(self):
+        """Serve from a daemon thread; returns self for chaining"""
+        
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    from backfill import date_range
+    
+    parser = argparse.ArgumentParser(description="Record SBR pages or replay them locally")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    
+    record = subparsers.add_parser('record', help="save live pages for a date range")
+    record.add_argument('start_date')
+    record.add_argument('end_date', nargs='?')
+    record.add_argument('--out', default='saved_pages')
+    record.add_argument('--overwrite', action='store_true')
+    
+    serve = subparsers.add_parser('serve', help="serve saved pages at the SBR paths")
+    serve.add_argument('page_dir')
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8765)
+    serve.add_argument('--latency', type=float, default=0.0, help="seconds before each response")
+    serve.add_argument('--jitter', type=float, default=0.0)
+    serve.add_argument('--error-rate', type=float, default=0.0)
+    serve.add_argument('--error-status', type=int, default=503)
+    serve.add_argument('--cycle', action='store_true', help="answer unrecorded dates with recorded pages")
+    serve.add_argument('--seed', type=int, default=0)
+    
+    args = parser.parse_args()
+    
+    if args.command == 'record':
+        dates = list(date_range(args.start_date, args.end_date or args.start_date))
+        written = record_pages(dates, args.out, overwrite=args.overwrite)
+        print(f"🎉 Recorded {len(written)} pages to {args.out}")
+        return
+    
+    server = ReplayServer(args.page_dir, host=args.host, port=args.port, latency=args.latency,
+                          jitter=args.jitter, error_rate=args.error_rate,
+                          error_status=args.error_status, cycle=args.cycle, seed=args.seed)
+    print(f"📡 Replaying {len(server.pages)} pages at {server.base_url}", flush=True)
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("👋 Replay server stopped")
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+HTML rendering for the odds dashboard's game cards
+
+Kept free of Streamlit calls so a whole slate can be built (and
+benchmarked) as a single string.
+"""
+
+from datetime import datetime
+
+import pandas as pd
+from pytz import timezone
+
+CARD_CSS = """
+    <style>
+    .odds-card-table {
+        width: 100%;
+        border-collapse: collapse;
+        margin-top: 10px;
+        margin-bottom: 0;
+        font-size: 1em;
+    }
+    .odds-card-table th, .odds-card-table td {
+        border: 1px solid #dee2e6;
+        padding: 8px 10px;
+        text-align: center;
+    }
+    .odds-card-table th {
+        background: #f1f3f4;
+        font-weight: bold;
+    }
+    .odds-card-table .subcol {
+        font-size: 0.95em;
+        color: #888;
+        background: #f9f9fa;
+    }
+    .odds-card-table tr.team-row td:first-child {
+        font-weight: bold;
+        background: #f8fafc;
+    }
+    </style>
+"""
+
+def format_odds(odds_value):
+    if pd.isna(odds_value) or odds_value is None:
+        return ""
+    try:
+        odds = int(odds_value)
+        return f"+{odds}" if odds > 0 else str(odds)
+    except (ValueError, TypeError):
+        return ""
+
+def format_spread(spread_value):
+    if pd.isna(spread_value) or spread_value is None:
+        return ""
+    try:
+        spread = float(spread_value)
+        return f"+{spread}" if spread > 0 else str(spread)
+    except (ValueError, TypeError):
+        return ""
+
+def format_total(total_value):
+    if pd.isna(total_value) or total_value is None:
+        return ""
+    try:
+        return f"{float(total_value)}"
+    except (ValueError, TypeError):
+        return ""
+
+def format_game_time(game_time_str):
+    try:
+        if isinstance(game_time_str, datetime):
+            # Typed frames carry game_time as a UTC Timestamp (NaT when unknown)
+            if pd.isna(game_time_str):
+                return "TBD"
+            dt = game_time_str
+        elif 'T' in game_time_str:
+            dt = datetime.fromisoformat(game_time_str.replace('Z', '+00:00'))
+        else:
+            return game_time_str
+        et = timezone('US/Eastern')
+        dt_et = dt.astimezone(et)
+        return dt_et.strftime("%I:%M %p ET")
+    except:
+        return "TBD"
+
+def game_card_html(game):
+    """HTML for one game card (without the shared CSS); game is any mapping with .get"""
+    border_color = "#1f77b4"
+    away_team = game.get('away_team', 'Away')
+    home_team = game.get('home_team', 'Home')
+    venue = game.get('venue', '')
+    city = ""  # Add city if available
+    game_time = format_game_time(game.get('game_time', 'TBD'))
+    
+    def fmt(val, fn=str):
+        return "" if pd.isna(val) or val is None else fn(val)
+    
+    def run_line(spread, odds):
+        s = fmt(spread, format_spread)
+        o = fmt(odds, format_odds)
+        return f"{s} ({o})" if s and o else ""
+    
+    def total_line(total, odds, over=True):
+        t = fmt(total, format_total)
+        o = fmt(odds, format_odds)
+        if not t or not o:
+            return ""
+        return f"{'Over' if over else 'Under'} {t} ({o})"
+    
+    table_html = f"""
+    <table class="odds-card-table">
+        <tr>
+            <th rowspan="2">Team</th>
+            <th colspan="2">Moneyline</th>
+            <th colspan="2">Run Line</th>
+            <th colspan="2">Total</th>
+        </tr>
+        <tr>
+            <th class="subcol">Open</th>
+            <th class="subcol">Current</th>
+            <th class="subcol">Open</th>
+            <th class="subcol">Current</th>
+            <th class="subcol">Open</th>
+            <th class="subcol">Current</th>
+        </tr>
+        <tr class="team-row">
+            <td>{away_team}</td>
+            <td>{fmt(game.get('ml_opening_away'), format_odds)}</td>
+            <td>{fmt(game.get('ml_current_away'), format_odds)}</td>
+            <td>{run_line(game.get('rl_opening_away_spread'), game.get('rl_opening_away_odds'))}</td>
+            <td>{run_line(game.get('rl_current_away_spread'), game.get('rl_current_away_odds'))}</td>
+            <td>{total_line(game.get('total_opening_line'), game.get('total_opening_over_odds'), over=True)}</td>
+            <td>{total_line(game.get('total_current_line'), game.get('total_current_over_odds'), over=True)}</td>
+        </tr>
+        <tr class="team-row">
+            <td>{home_team}</td>
+            <td>{fmt(game.get('ml_opening_home'), format_odds)}</td>
+            <td>{fmt(game.get('ml_current_home'), format_odds)}</td>
+            <td>{run_line(game.get('rl_opening_home_spread'), game.get('rl_opening_home_odds'))}</td>
+            <td>{run_line(game.get('rl_current_home_spread'), game.get('rl_current_home_odds'))}</td>
+            <td>{total_line(game.get('total_opening_line'), game.get('total_opening_under_odds'), over=False)}</td>
+            <td>{total_line(game.get('total_current_line'), game.get('total_current_under_odds'), over=False)}</td>
+        </tr>
+    </table>
+    """
+    
+    return f"""
+        <div style="border: 2px solid {border_color}; border-radius: 14px; padding: 22px 24px 18px 24px; margin-bottom: 28px; background: #f8fafc;">
+            <div style="font-size: 1.25em; font-weight: bold; margin-bottom: 2px;">
+                {away_team} at {home_team}
+            </div>
+            <div style="color: #444; font-size: 1em; margin-bottom: 10px;">
+                {game_time} &nbsp;|&nbsp; {venue}{' | ' + city if city else ''}
+            </div>
+            {table_html}
+        </div>
+        """
+
+def compact_html(html):
+    """Drop indentation and blank lines so markdown can't mistake nested HTML for a code block"""
+    
+    return "\n".join(line.strip() for line in html.splitlines() if line.strip())
+
+
+def slate_html(games_df):
+    """HTML for every game in games_df with the CSS emitted once
+    
+    Columns are pulled out as plain lists once and zipped, instead of
+    building a Series per row with iterrows.
+    """
+    
+    if games_df.empty:
+        return ""
+    
+    columns = list(games_df.columns)
+    values = [games_df[column].tolist() for column in columns]
+    cards = [game_card_html(dict(zip(columns, row))) for row in zip(*values)]
+    return compact_html(CARD_CSS + "".join(cards))
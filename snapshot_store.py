@@ -0,0 +1,220 @@
+"""
+Append-only SQLite store of odds snapshots for line-movement history
+
+Every poll is stored as one row per (game, book, market, side) with the
+current price at that moment:
+
+    snapshot_ts, date, game_id, book, market, side, odds, line
+
+snapshot_ts is Unix seconds (UTC). Lookups by game_id and by date range
+are served from covering indexes.
+"""
+
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+
+from odds_table import LINE_COLUMNS
+
+SNAPSHOT_COLUMNS = ('snapshot_ts', 'date', 'game_id', 'book', 'market', 'side', 'odds', 'line')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    snapshot_ts REAL NOT NULL,
+    date TEXT NOT NULL,
+    game_id TEXT NOT NULL,
+    book TEXT NOT NULL,
+    market TEXT NOT NULL,
+    side TEXT NOT NULL,
+    odds INTEGER,
+    line REAL
+);
+CREATE INDEX IF NOT EXISTS idx_snapshots_game
+    ON snapshots (game_id, book, market, side, snapshot_ts);
+CREATE INDEX IF NOT EXISTS idx_snapshots_date
+    ON snapshots (date, snapshot_ts);
+"""
+
+
+def to_timestamp(value):
+    """Accept Unix seconds, a datetime, or None (now)"""
+    
+    if value is None:
+        return time.time()
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return float(value)
+
+
+class SnapshotStore:
+    """Thread-safe append-only snapshot store backed by a single SQLite file"""
+    
+    def __init__(self, path='odds_snapshots.db'):
+        self.path = path
+        # Reentrant, so reads can run inside a transaction() block
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        # Must be set before the first table is created; lets compact() free
+        # pages without a full VACUUM, which would renumber rowids
+        self.conn.execute('PRAGMA auto_vacuum=INCREMENTAL')
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+    
+    def close(self):
+        with self._lock:
+            self.conn.close()
+    
+    def append(self, lines, snapshot_ts=None, phase='current'):
+        """Record one poll from long-format line columns (see odds_table); returns rows written"""
+        
+        ts = to_timestamp(snapshot_ts)
+        rows = [
+            (ts, date_str, str(game_id), book, market, side, odds, line)
+            for date_str, game_id, book, market, side, row_phase, odds, line in zip(
+                lines['date'], lines['game_id'], lines['book'], lines['market'],
+                lines['side'], lines['phase'], lines['odds'], lines['line'])
+            if row_phase == phase and (odds is not None or line is not None)
+        ]
+        
+        with self._lock, self.conn:
+            self.conn.executemany(
+                'INSERT INTO snapshots VALUES (?, ?, ?, ?, ?, ?, ?, ?)', rows)
+        return len(rows)
+    
+    def query(self, sql, params=()):
+        """Run a SELECT against the store's database and return a DataFrame"""
+        
+        with self._lock:
+            return pd.read_sql_query(sql, self.conn, params=params)
+    
+    @contextmanager
+    def transaction(self):
+        """Hold the store's lock and commit (or roll back) what's done on the yielded connection
+        
+        For tables derived from the snapshots (see line_movement) that live
+        in the same database file.
+        """
+        
+        with self._lock, self.conn:
+            yield self.conn
+    
+    def rows_since(self, rowid):
+        """Snapshot rows added after rowid, oldest first, as (rowid, *SNAPSHOT_COLUMNS) tuples"""
+        
+        with self._lock:
+            return self.conn.execute(
+                f'SELECT rowid, {", ".join(SNAPSHOT_COLUMNS)} FROM snapshots '
+                'WHERE rowid > ? ORDER BY snapshot_ts, rowid', (rowid,)).fetchall()
+    
+    def game_history(self, game_id, book=None, market=None):
+        """Full line history for one game, oldest first"""
+        
+        sql = 'SELECT * FROM snapshots WHERE game_id = ?'
+        params = [str(game_id)]
+        if book is not None:
+            sql += ' AND book = ?'
+            params.append(book)
+        if market is not None:
+            sql += ' AND market = ?'
+            params.append(market)
+        sql += ' ORDER BY book, market, side, snapshot_ts'
+        return self.query(sql, params)
+    
+    def date_range(self, start_date, end_date, book=None):
+        """Every snapshot for games dated start_date..end_date (YYYY-MM-DD, inclusive)"""
+        
+        sql = 'SELECT * FROM snapshots WHERE date BETWEEN ? AND ?'
+        params = [start_date, end_date]
+        if book is not None:
+            sql += ' AND book = ?'
+            params.append(book)
+        sql += ' ORDER BY date, snapshot_ts'
+        return self.query(sql, params)
+    
+    def snapshot_times(self, date_str):
+        """The set of snapshot_ts values already stored for a date"""
+        
+        with self._lock:
+            rows = self.conn.execute(
+                'SELECT DISTINCT snapshot_ts FROM snapshots WHERE date = ?', (date_str,)).fetchall()
+        return {snapshot_ts for snapshot_ts, in rows}
+    
+    def latest(self, date_str=None):
+        """The most recent snapshot row for every (game, book, market, side)"""
+        
+        sql = """
+            SELECT s.* FROM snapshots s
+            JOIN (SELECT game_id, book, market, side, MAX(snapshot_ts) AS ts
+                  FROM snapshots {where}
+                  GROUP BY game_id, book, market, side) last
+              ON s.game_id = last.game_id AND s.book = last.book AND s.market = last.market
+             AND s.side = last.side AND s.snapshot_ts = last.ts
+        """
+        where, params = ('WHERE date = ?', [date_str]) if date_str else ('', [])
+        return self.query(sql.format(where=where), params)
+    
+    def iter_polls(self, start_date=None, end_date=None):
+        """Replay stored polls in order as (snapshot_ts, long-format line columns)"""
+        
+        sql = 'SELECT * FROM snapshots'
+        params = []
+        if start_date is not None and end_date is not None:
+            sql += ' WHERE date BETWEEN ? AND ?'
+            params = [start_date, end_date]
+        sql += ' ORDER BY snapshot_ts'
+        
+        with self._lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        
+        lines = None
+        current_ts = None
+        for snapshot_ts, date_str, game_id, book, market, side, odds, line in rows:
+            if snapshot_ts != current_ts:
+                if lines is not None:
+                    yield current_ts, lines
+                current_ts = snapshot_ts
+                lines = {column: [] for column in LINE_COLUMNS}
+            for column, value in zip(LINE_COLUMNS, (date_str, game_id, book, market, side, 'current', odds, line)):
+                lines[column].append(value)
+        
+        if lines is not None:
+            yield current_ts, lines
+    
+    def compact(self, before_ts=None):
+        """Drop polls that repeat the previous price, keeping every change and each series' last row
+        
+        History read back after compaction is identical as a step series;
+        only the redundant repeated polls go. Restrict it to rows older than
+        before_ts to leave live games untouched. Returns rows removed.
+        """
+        
+        cutoff = to_timestamp(before_ts) if before_ts is not None else float('inf')
+        
+        with self._lock, self.conn:
+            removed = self.conn.execute("""
+                DELETE FROM snapshots WHERE rowid IN (
+                    SELECT rowid FROM (
+                        SELECT rowid, snapshot_ts, odds, line,
+                               LAG(odds) OVER w AS prev_odds,
+                               LAG(line) OVER w AS prev_line,
+                               LAG(snapshot_ts) OVER w AS prev_ts,
+                               LEAD(snapshot_ts) OVER w AS next_ts
+                        FROM snapshots
+                        WINDOW w AS (PARTITION BY game_id, book, market, side ORDER BY snapshot_ts)
+                    )
+                    WHERE prev_ts IS NOT NULL AND next_ts IS NOT NULL
+                      AND odds IS prev_odds AND line IS prev_line
+                      AND snapshot_ts < ?
+                )
+            """, (cutoff,)).rowcount
+        
+        # rowids must stay stable: line_movement tracks progress by rowid
+        with self._lock:
+            self.conn.execute('PRAGMA incremental_vacuum')
+            self.conn.execute('ANALYZE')
+        return removed
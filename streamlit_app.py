@@ -1,12 +1,20 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime, timedelta
-import requests
 import re
 import json
 from pytz import timezone
 import time
 import random
+from functools import partial
+from game_record import games_frame
+from http_cache import ResponseCache
+from line_charts import HISTORY_CHARTS, downsample_history
+from line_movement import LineMovementAggregates
+from mlb_odds_scraper import ComprehensiveMLBScraper
+from odds_refresher import BackgroundRefresher
+from slate_render import slate_html
+from snapshot_store import SnapshotStore
 
 # Configure page
 st.set_page_config(
@@ -16,99 +24,100 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
-def get_fanduel_mlb_data():
-    # ...your existing scraping logic here...
-    # (This function is unchanged from your original file)
+REFRESH_INTERVAL = 300  # seconds between background scrapes
+SNAPSHOT_DB = "odds_snapshots.db"
+RESPONSE_CACHE_DIR = ".sbr_cache"
+HISTORY_POINTS = 300  # max points per line in the history charts
+
+def get_fanduel_mlb_data(scraper):
     debug_log = []
     debug_log.append("🎯 Starting FanDuel MLB scraper for today and tomorrow...")
-    session = requests.Session()
-    session.headers.update({
-        'Accept-Encoding': 'identity',
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-        'Accept-Language': 'en-US,en;q=0.5',
-        'Cache-Control': 'no-cache',
-        'Pragma': 'no-cache'
-    })
     et = timezone('US/Eastern')
     now_et = datetime.now(et)
     today = now_et.strftime("%Y-%m-%d")
     tomorrow = (now_et + timedelta(days=1)).strftime("%Y-%m-%d")
     debug_log.append(f"📅 Today (ET): {today}")
     debug_log.append(f"📅 Tomorrow (ET): {tomorrow}")
-    all_games = []
-    # ...rest of your scraping logic...
-    # (Copy your full get_fanduel_mlb_data function here)
-    # For brevity, not repeated in this snippet
 
-    # At the end, return as before:
-    # return pd.DataFrame(all_games), debug_log, True/False
+    pages = scraper.fetch_pages([today, tomorrow])
+    snapshot_ts = datetime.now(et)
+    store = SnapshotStore(SNAPSHOT_DB)
+    all_games = []
+    try:
+        for date_str in [today, tomorrow]:
+            lines = scraper.build_date_lines(date_str, pages)
+            games = scraper.build_date_games(date_str, pages, lines)
+            # Every refresh is kept as history for the line movement charts
+            store.append(lines, snapshot_ts)
+            debug_log.append(f"✅ {len(games)} games for {date_str}")
+            all_games.extend(games)
+        # Fold this refresh into the precomputed open/close/moves summaries
+        LineMovementAggregates(store).refresh()
+    finally:
+        store.close()
 
-    # (Paste your full function here)
+    return games_frame(all_games), debug_log, bool(all_games)
 
-@st.cache_data(ttl=300)
-def load_odds_data():
-    real_data, debug_log, success = get_fanduel_mlb_data()
-    if success and not real_data.empty:
-        data_source = "SportsBookReview"
-        final_data = real_data
-    else:
-        data_source = "No Data Found"
-        final_data = pd.DataFrame()
+def fetch_odds_data(scraper):
+    """One full scrape, shaped for the dashboard; None if nothing usable came back"""
+    real_data, debug_log, success = get_fanduel_mlb_data(scraper)
+    if not success or real_data.empty:
+        return None
     et = timezone('US/Eastern')
     now_et = datetime.now(et)
     today = now_et.strftime("%Y-%m-%d")
     tomorrow = (now_et + timedelta(days=1)).strftime("%Y-%m-%d")
-    today_games = final_data[final_data['date'] == today] if not final_data.empty else pd.DataFrame()
-    tomorrow_games = final_data[final_data['date'] == tomorrow] if not final_data.empty else pd.DataFrame()
     return {
-        'today': today_games,
-        'tomorrow': tomorrow_games,
+        'today': real_data[real_data['date'] == today],
+        'tomorrow': real_data[real_data['date'] == tomorrow],
         'today_date': today,
         'tomorrow_date': tomorrow,
         'last_update': now_et,
-        'data_source': data_source,
+        'data_source': "SportsBookReview",
         'debug_log': debug_log,
         'scraper_success': success
     }
 
-def format_odds(odds_value):
-    if pd.isna(odds_value) or odds_value is None:
-        return ""
-    try:
-        odds = int(odds_value)
-        return f"+{odds}" if odds > 0 else str(odds)
-    except (ValueError, TypeError):
-        return ""
-
-def format_spread(spread_value):
-    if pd.isna(spread_value) or spread_value is None:
-        return ""
-    try:
-        spread = float(spread_value)
-        return f"+{spread}" if spread > 0 else str(spread)
-    except (ValueError, TypeError):
-        return ""
+@st.cache_resource
+def get_response_cache():
+    """Page cache shared by every refresh, so unchanged pages come back as 304s"""
+    # Shorter than the refresh interval, so each refresh revalidates instead
+    # of reusing the previous refresh's pages
+    return ResponseCache(RESPONSE_CACHE_DIR, ttl=REFRESH_INTERVAL // 2)
 
-def format_total(total_value):
-    if pd.isna(total_value) or total_value is None:
-        return ""
-    try:
-        return f"{float(total_value)}"
-    except (ValueError, TypeError):
-        return ""
+@st.cache_resource
+def get_refresher():
+    """One background refresher per server process, shared by every session"""
+    # Reused by every refresh, so its keep-alive connections and identity
+    # fallbacks survive; quiet, as nobody reads the refresher thread's output
+    scraper = ComprehensiveMLBScraper(cache=get_response_cache(), compressed=True, quiet=True)
+    return BackgroundRefresher(partial(fetch_odds_data, scraper), interval=REFRESH_INTERVAL).start()
 
-def format_game_time(game_time_str):
-    try:
-        if 'T' in game_time_str:
-            dt = datetime.fromisoformat(game_time_str.replace('Z', '+00:00'))
-        else:
-            return game_time_str
+def load_odds_data():
+    refresher = get_refresher()
+    # Only the very first viewer after server start waits for SBR
+    refresher.wait_for_first(timeout=90)
+    data, age, error, refreshing = refresher.snapshot()
+    if data is None:
         et = timezone('US/Eastern')
-        dt_et = dt.astimezone(et)
-        return dt_et.strftime("%I:%M %p ET")
-    except:
-        return "TBD"
+        now_et = datetime.now(et)
+        data = {
+            'today': pd.DataFrame(),
+            'tomorrow': pd.DataFrame(),
+            'today_date': now_et.strftime("%Y-%m-%d"),
+            'tomorrow_date': (now_et + timedelta(days=1)).strftime("%Y-%m-%d"),
+            'last_update': now_et,
+            'data_source': "No Data Found",
+            'debug_log': [],
+            'scraper_success': False
+        }
+    return dict(data, data_age=age, refresh_error=error, refreshing=refreshing)
+
+def format_data_age(age_seconds):
+    if age_seconds is None:
+        return "no data yet"
+    minutes = int(age_seconds // 60)
+    return "just now" if minutes < 1 else f"{minutes} min ago"
 
 def format_date(date_str):
     try:
@@ -117,115 +126,83 @@ def format_date(date_str):
     except:
         return date_str
 
-def display_game_card(game):
-    border_color = "#1f77b4"
-    away_team = game.get('away_team', 'Away')
-    home_team = game.get('home_team', 'Home')
-    venue = game.get('venue', '')
-    city = ""  # Add city if available
-    game_time = format_game_time(game.get('game_time', 'TBD'))
-
-    def fmt(val, fn=str):
-        return "" if pd.isna(val) or val is None else fn(val)
+def display_slate(games_df):
+    """Render a whole slate with one st.markdown call"""
+    st.markdown(slate_html(games_df), unsafe_allow_html=True)
 
-    def run_line(spread, odds):
-        s = fmt(spread, format_spread)
-        o = fmt(odds, format_odds)
-        return f"{s} ({o})" if s and o else ""
+@st.cache_data(ttl=REFRESH_INTERVAL, max_entries=64, show_spinner=False)
+def load_line_history(game_id, book='fanduel'):
+    """Downsampled FanDuel history for one game, cached per game_id"""
+    store = SnapshotStore(SNAPSHOT_DB)
+    try:
+        history = store.game_history(game_id, book=book)
+    finally:
+        store.close()
+    return {
+        title: downsample_history(history, market, column, HISTORY_POINTS)
+        for title, market, column in HISTORY_CHARTS
+    }
 
-    def total_line(total, odds, over=True):
-        t = fmt(total, format_total)
-        o = fmt(odds, format_odds)
-        if not t or not o:
-            return ""
-        return f"{'Over' if over else 'Under'} {t} ({o})"
+@st.cache_data(ttl=REFRESH_INTERVAL, max_entries=64, show_spinner=False)
+def load_movement_summary(game_id, book='fanduel'):
+    """Open, current and move counts per line for one game, from the line_aggregates table"""
+    store = SnapshotStore(SNAPSHOT_DB)
+    try:
+        aggregates = LineMovementAggregates(store).game(game_id)
+    finally:
+        store.close()
+    aggregates = aggregates[aggregates['book'] == book]
+    return pd.DataFrame({
+        'Market': aggregates['market'],
+        'Side': aggregates['side'],
+        'Open': [format_price(*price) for price in
+                 zip(aggregates['market'], aggregates['open_odds'], aggregates['open_line'])],
+        'Current': [format_price(*price) for price in
+                    zip(aggregates['market'], aggregates['close_odds'], aggregates['close_line'])],
+        'Moves': aggregates['n_moves'],
+        'Largest move (c)': aggregates['largest_move'],
+        'Largest line move': aggregates['largest_line_move'],
+    })
 
-    table_html = f"""
-    <style>
-    .odds-card-table {{
-        width: 100%;
-        border-collapse: collapse;
-        margin-top: 10px;
-        margin-bottom: 0;
-        font-size: 1em;
-    }}
-    .odds-card-table th, .odds-card-table td {{
-        border: 1px solid #dee2e6;
-        padding: 8px 10px;
-        text-align: center;
-    }}
-    .odds-card-table th {{
-        background: #f1f3f4;
-        font-weight: bold;
-    }}
-    .odds-card-table .subcol {{
-        font-size: 0.95em;
-        color: #888;
-        background: #f9f9fa;
-    }}
-    .odds-card-table tr.team-row td:first-child {{
-        font-weight: bold;
-        background: #f8fafc;
-    }}
-    </style>
-    <table class="odds-card-table">
-        <tr>
-            <th rowspan="2">Team</th>
-            <th colspan="2">Moneyline</th>
-            <th colspan="2">Run Line</th>
-            <th colspan="2">Total</th>
-        </tr>
-        <tr>
-            <th class="subcol">Open</th>
-            <th class="subcol">Current</th>
-            <th class="subcol">Open</th>
-            <th class="subcol">Current</th>
-            <th class="subcol">Open</th>
-            <th class="subcol">Current</th>
-        </tr>
-        <tr class="team-row">
-            <td>{away_team}</td>
-            <td>{fmt(game.get('ml_opening_away'), format_odds)}</td>
-            <td>{fmt(game.get('ml_current_away'), format_odds)}</td>
-            <td>{run_line(game.get('rl_opening_away_spread'), game.get('rl_opening_away_odds'))}</td>
-            <td>{run_line(game.get('rl_current_away_spread'), game.get('rl_current_away_odds'))}</td>
-            <td>{total_line(game.get('total_opening_line'), game.get('total_opening_over_odds'), over=True)}</td>
-            <td>{total_line(game.get('total_current_line'), game.get('total_current_over_odds'), over=True)}</td>
-        </tr>
-        <tr class="team-row">
-            <td>{home_team}</td>
-            <td>{fmt(game.get('ml_opening_home'), format_odds)}</td>
-            <td>{fmt(game.get('ml_current_home'), format_odds)}</td>
-            <td>{run_line(game.get('rl_opening_home_spread'), game.get('rl_opening_home_odds'))}</td>
-            <td>{run_line(game.get('rl_current_home_spread'), game.get('rl_current_home_odds'))}</td>
-            <td>{total_line(game.get('total_opening_line'), game.get('total_opening_under_odds'), over=False)}</td>
-            <td>{total_line(game.get('total_current_line'), game.get('total_current_under_odds'), over=False)}</td>
-        </tr>
-    </table>
-    """
+def format_price(market, odds, line):
+    """'+140' for moneylines, '-1.5 (+140)' for run lines, '8.5 (-110)' for totals"""
+    odds_text = '' if pd.isna(odds) else f"{int(odds):+d}"
+    if pd.isna(line):
+        return odds_text
+    line_text = f"{line:g}" if market == 'totals' else f"{line:+g}"
+    return f"{line_text} ({odds_text})" if odds_text else line_text
 
-    st.markdown(
-        f"""
-        <div style="border: 2px solid {border_color}; border-radius: 14px; padding: 22px 24px 18px 24px; margin-bottom: 28px; background: #f8fafc;">
-            <div style="font-size: 1.25em; font-weight: bold; margin-bottom: 2px;">
-                {away_team} at {home_team}
-            </div>
-            <div style="color: #444; font-size: 1em; margin-bottom: 10px;">
-                {game_time} &nbsp;|&nbsp; {venue}{' | ' + city if city else ''}
-            </div>
-            {table_html}
-        </div>
-        """,
-        unsafe_allow_html=True
-    )
+def display_line_movement(games_df, key):
+    """History charts for one chosen game; nothing is queried until a game is picked"""
+    with st.expander("📈 Line movement history"):
+        games = {
+            f"{away} @ {home}": game_id
+            for game_id, away, home in zip(games_df['game_id'], games_df['away_team'], games_df['home_team'])
+        }
+        choice = st.selectbox("Game", ["Select a game..."] + list(games), key=key)
+        if choice not in games:
+            return
+        summary = load_movement_summary(str(games[choice]))
+        if not summary.empty:
+            st.dataframe(summary, hide_index=True)
+        charts = load_line_history(str(games[choice]))
+        if all(chart.empty for chart in charts.values()):
+            st.info("No line history recorded for this game yet.")
+            return
+        for title, chart in charts.items():
+            if not chart.empty:
+                st.markdown(f"**{title}**")
+                st.line_chart(chart, x='time', y='value', color='side')
 
 def main():
     st.title("⚾ MLB FanDuel Odds Tracker")
 
-    # Refresh Data button at the top
+    # Refresh Data button at the top; the scrape runs in the background
     if st.button("Refresh Data"):
-        st.cache_data.clear()
-        st.rerun()
+        if get_refresher().request_refresh():
+            st.toast("Refreshing odds in the background...")
+        else:
+            st.toast("A refresh is already in progress")
 
     # Load data with spinner
     with st.spinner("Loading MLB odds..."):
@@ -246,8 +223,8 @@ def main():
     st.markdown(
         f"""
         <div style="background: #f1f3f4; border-radius: 8px; padding: 0.7em 1em; margin-bottom: 1.2em; font-size: 1.05em;">
-            <strong>Last Update:</strong> {last_update.strftime('%I:%M %p ET, %B %d, %Y')} &nbsp; | &nbsp;
-            <strong>Source:</strong> SportsBookReview
+            <strong>Last Update:</strong> {last_update.strftime('%I:%M %p ET, %B %d, %Y')} ({format_data_age(data['data_age'])}) &nbsp; | &nbsp;
+            <strong>Source:</strong> {data['data_source']}{' &nbsp; | &nbsp; Refreshing...' if data['refreshing'] else ''}
         </div>
         """,
         unsafe_allow_html=True
@@ -262,8 +239,8 @@ def main():
     # Today's games
     with tab1:
         if not today_df.empty:
-            for _, game in today_df.iterrows():
-                display_game_card(game)
+            display_slate(today_df)
+            display_line_movement(today_df, key="history_today")
         else:
             st.markdown(
                 "<div style='margin: 2em 0; text-align: center; color: #888;'>No games found for today.</div>",
@@ -273,8 +250,8 @@ def main():
     # Tomorrow's games
     with tab2:
         if not tomorrow_df.empty:
-            for _, game in tomorrow_df.iterrows():
-                display_game_card(game)
+            display_slate(tomorrow_df)
+            display_line_movement(tomorrow_df, key="history_tomorrow")
         else:
             st.markdown(
                 "<div style='margin: 2em 0; text-align: center; color: #888;'>No games found for tomorrow.</div>",
@@ -0,0 +1,134 @@
+"""
+Compressed and identity fetches through download_payload against a ReplayServer
+"""
+
+import json
+
+import pytest
+
+from mlb_odds_scraper import BET_TYPES, ComprehensiveMLBScraper
+from replay import ReplayServer, page_filename
+
+DATE = '2025-07-15'
+
+
+def page_body(bet_type, games=15):
+    """An SBR-shaped page: markup, a __NEXT_DATA__ script, then more markup"""
+    
+    game_rows = [
+        {'gameView': {'gameId': 1000 + number, 'status': 'scheduled',
+                      'awayTeam': {'name': f'Away{number}'}, 'homeTeam': {'name': f'Home{number}'}},
+         'openingLineViews': [{'sportsbook': 'FanDuel',
+                               'openingLine': {'awayOdds': -110, 'homeOdds': 100},
+                               'currentLine': {'awayOdds': -120 - number, 'homeOdds': 110 + number}}]}
+        for number in range(games)
+    ]
+    next_data = {'props': {'pageProps': {'oddsTables': [{'oddsTableModel': {'gameRows': game_rows}}]}},
+                 'page': f'/{bet_type}'}
+    filler = b'<div class="odds">' + b'x' * 200 + b'</div>\n'
+    return (b'<html><head><title>MLB odds</title></head><body>' + filler * 200
+            + b'<script id="__NEXT_DATA__" type="application/json">'
+            + json.dumps(next_data).encode('utf-8') + b'</script>' + filler * 50 + b'</body></html>')
+
+
+@pytest.fixture
+def server(tmp_path):
+    for bet_type in BET_TYPES:
+        (tmp_path / page_filename(DATE, bet_type)).write_bytes(page_body(bet_type))
+    with ReplayServer(str(tmp_path)) as replay:
+        yield replay
+
+
+def scraper_for(server, compressed):
+    return ComprehensiveMLBScraper(max_workers=1, quiet=True, base_url=server.base_url, compressed=compressed)
+
+
+def counter(scraper, name, bet_type):
+    return scraper.metrics.counters.get((name, (('bet_type', bet_type),)), 0)
+
+
+@pytest.mark.parametrize('compressed', [False, True])
+def test_every_bet_type_scrapes(server, compressed):
+    scraper = scraper_for(server, compressed)
+    
+    for bet_type in BET_TYPES:
+        game_rows = scraper.scrape_bet_type(DATE, bet_type)
+        assert [row['gameView']['gameId'] for row in game_rows] == list(range(1000, 1015))
+        
+        wire = counter(scraper, 'bytes_received_total', bet_type)
+        body = counter(scraper, 'body_bytes_total', bet_type)
+        if compressed:
+            assert wire < body / 5
+        else:
+            assert wire == body
+    
+    assert scraper.identity_bet_types == set()
+
+
+def test_gzip_and_identity_payloads_match(server):
+    identity = scraper_for(server, compressed=False)
+    gzipped = scraper_for(server, compressed=True)
+    url = identity.bet_type_url(DATE, 'pointspread')
+    
+    assert identity.fetch_payload(url, DATE, 'pointspread') == gzipped.fetch_payload(url, DATE, 'pointspread')
+
+
+def test_broken_gzip_falls_back_to_identity_for_that_bet_type(server):
+    server.pages[(DATE, 'totals')]._gzipped = b'\x1f\x8b this is not a gzip stream'
+    scraper = scraper_for(server, compressed=True)
+    
+    game_rows = scraper.scrape_bet_type(DATE, 'totals')
+    
+    assert len(game_rows) == 15
+    assert scraper.identity_bet_types == {'totals'}
+    assert scraper.metrics.counters[('fetch_errors_total', (('bet_type', 'totals'), ('reason', 'content_decoding')))] == 1
+    
+    # The other bet types keep compression
+    scraper.scrape_bet_type(DATE, 'moneyline')
+    assert counter(scraper, 'bytes_received_total', 'moneyline') < counter(scraper, 'body_bytes_total', 'moneyline')
+
+
+def test_unsupported_encoding_falls_back_to_identity(server):
+    page = server.pages[(DATE, 'moneyline')]
+    # Bytes in an encoding urllib3 won't decode come through as-is
+    page._gzipped = page.body[::-1]
+    scraper = scraper_for(server, compressed=True)
+    scraper.session.headers['Accept-Encoding'] = 'gzip'
+    
+    original = server.httpd.RequestHandlerClass.send_body
+    
+    def send_body(handler, status, body, headers=None):
+        if headers and headers.get('Content-Encoding') == 'gzip':
+            headers = dict(headers, **{'Content-Encoding': 'br'})
+        original(handler, status, body, headers)
+    
+    server.httpd.RequestHandlerClass.send_body = send_body
+    
+    assert len(scraper.scrape_bet_type(DATE, 'moneyline')) == 15
+    assert scraper.identity_bet_types == {'moneyline'}
+
+
+def test_compressed_error_status_keeps_compression(server):
+    scraper = scraper_for(server, compressed=True)
+    
+    server.error_rate = 1.0
+    assert scraper.scrape_bet_type(DATE, 'moneyline') is None
+    assert scraper.identity_bet_types == set()
+    
+    server.error_rate = 0.0
+    assert len(scraper.scrape_bet_type(DATE, 'moneyline')) == 15
+    assert counter(scraper, 'bytes_received_total', 'moneyline') < counter(scraper, 'body_bytes_total', 'moneyline')
+
+
+def test_streamed_fetches_reuse_one_connection(server):
+    accepted = []
+    process_request = server.httpd.process_request
+    server.httpd.process_request = lambda request, address: (accepted.append(address),
+                                                             process_request(request, address))
+    scraper = scraper_for(server, compressed=True)
+    
+    for _ in range(3):
+        for bet_type in BET_TYPES:
+            scraper.scrape_bet_type(DATE, bet_type)
+    
+    assert len(accepted) == 1
@@ -0,0 +1,175 @@
+"""
+join_game_rows and build_date_games on out-of-order and incomplete tables
+"""
+
+import random
+
+import pytest
+
+from game_join import join_game_rows, missing_sources
+from mlb_odds_scraper import BET_TYPES, ComprehensiveMLBScraper
+
+DATE = '2025-07-15'
+
+MATCHUPS = [
+    (101, 'Yankees', 'Red Sox'),
+    (102, 'Dodgers', 'Giants'),
+    (103, 'Cubs', 'Cardinals'),
+    (104, 'Astros', 'Rangers'),
+]
+
+
+def game_row(game_id, away, home, current, book='FanDuel'):
+    """A minimal SBR gameRow with one book's opening and current line"""
+    
+    game_view = {'awayTeam': {'name': away}, 'homeTeam': {'name': home},
+                 'startDate': '2025-07-15T23:05:00Z', 'status': 'scheduled', 'venueName': f'{home} Park'}
+    if game_id is not None:
+        game_view['gameId'] = game_id
+    return {'gameView': game_view,
+            'openingLineViews': [{'sportsbook': book, 'openingLine': current, 'currentLine': current}]}
+
+
+def moneyline_row(game_id, away, home, number=None):
+    number = game_id if number is None else number
+    return game_row(game_id, away, home, {'awayOdds': -100 - number, 'homeOdds': number})
+
+
+def pointspread_row(game_id, away, home, number=None):
+    return game_row(game_id, away, home, {'awayOdds': 150, 'homeOdds': -170,
+                                          'awaySpread': 1.5, 'homeSpread': -1.5})
+
+
+def totals_row(game_id, away, home, number=None):
+    # The total encodes the game so a row joined to the wrong game shows up
+    number = game_id if number is None else number
+    return game_row(game_id, away, home, {'overOdds': -110, 'underOdds': -110,
+                                          'total': 7 + (number - 100) / 2})
+
+
+def date_tables(matchups=MATCHUPS):
+    return {
+        'moneyline': [moneyline_row(*matchup) for matchup in matchups],
+        'pointspread': [pointspread_row(*matchup) for matchup in matchups],
+        'totals': [totals_row(*matchup) for matchup in matchups],
+    }
+
+
+def pages_for(tables):
+    return {(DATE, bet_type): tables.get(bet_type) for bet_type in BET_TYPES}
+
+
+@pytest.fixture
+def scraper():
+    return ComprehensiveMLBScraper(max_workers=1, quiet=True)
+
+
+def test_join_matches_shuffled_rows_by_game_id():
+    tables = date_tables()
+    random.Random(7).shuffle(tables['totals'])
+    tables['pointspread'].reverse()
+    
+    joined = join_game_rows(tables)
+    
+    # Games keep the order of the first table
+    assert list(joined) == [game_id for game_id, _, _ in MATCHUPS]
+    for game_id, sources in joined.items():
+        assert set(sources) == set(BET_TYPES)
+        for game_row in sources.values():
+            assert game_row['gameView']['gameId'] == game_id
+
+
+def test_join_game_missing_from_one_table():
+    tables = date_tables()
+    tables['totals'] = [row for row in tables['totals'] if row['gameView']['gameId'] != 102]
+    
+    joined = join_game_rows(tables)
+    
+    assert 'totals' not in joined[102]
+    assert missing_sources(joined[102], BET_TYPES) == ['totals']
+    assert missing_sources(joined[101], BET_TYPES) == []
+
+
+def test_join_skips_a_table_that_failed_to_load():
+    tables = date_tables()
+    tables['moneyline'] = None
+    
+    joined = join_game_rows(tables)
+    
+    assert list(joined) == [game_id for game_id, _, _ in MATCHUPS]
+    assert all(set(sources) == {'pointspread', 'totals'} for sources in joined.values())
+
+
+def test_join_keeps_the_first_of_duplicate_rows():
+    first = totals_row(101, 'Yankees', 'Red Sox')
+    duplicate = totals_row(101, 'Yankees', 'Red Sox')
+    
+    joined = join_game_rows({'totals': [first, duplicate]})
+    
+    assert joined[101]['totals'] is first
+
+
+def test_join_falls_back_to_position_without_game_id():
+    tables = {
+        'moneyline': [moneyline_row(None, 'Yankees', 'Red Sox', 101), moneyline_row(102, 'Dodgers', 'Giants')],
+        'totals': [totals_row(None, 'Yankees', 'Red Sox', 101), totals_row(102, 'Dodgers', 'Giants')],
+    }
+    
+    joined = join_game_rows(tables)
+    
+    assert list(joined) == ['game_0', 102]
+    assert set(joined['game_0']) == {'moneyline', 'totals'}
+
+
+def test_build_date_games_with_shuffled_totals(scraper):
+    tables = date_tables()
+    random.Random(3).shuffle(tables['totals'])
+    
+    games = scraper.build_date_games(DATE, pages_for(tables))
+    
+    assert [game.game_id for game in games] == [game_id for game_id, _, _ in MATCHUPS]
+    for game, (game_id, away, home) in zip(games, MATCHUPS):
+        assert (game.away_team, game.home_team) == (away, home)
+        assert game.ml_current_away == -100 - game_id
+        assert game.total_current_line == 7 + (game_id - 100) / 2
+        assert game.rl_current_home_spread == -1.5
+
+
+def test_build_date_games_game_missing_from_totals(scraper):
+    tables = date_tables()
+    tables['totals'] = [row for row in tables['totals'] if row['gameView']['gameId'] != 103]
+    
+    games = {game.game_id: game for game in scraper.build_date_games(DATE, pages_for(tables))}
+    
+    assert len(games) == len(MATCHUPS)
+    assert games[103].total_current_line is None
+    assert games[103].ml_current_away == -203
+    assert games[104].total_current_line == 9.0
+    assert scraper.metrics.counters[('games_missing_source_total', ())] == 1
+
+
+def test_build_date_games_without_moneyline_table(scraper):
+    tables = date_tables()
+    tables['moneyline'] = None
+    
+    games = scraper.build_date_games(DATE, pages_for(tables))
+    
+    assert [(game.away_team, game.home_team) for game in games] == [(away, home) for _, away, home in MATCHUPS]
+    assert all(game.ml_current_away is None for game in games)
+    assert all(game.rl_current_away_odds == 150 for game in games)
+
+
+def test_build_date_games_rows_without_game_id(scraper):
+    # Without ids, rows can only be matched by their position in each table
+    matchups = [(None, 'Yankees', 'Red Sox', 101), (None, 'Dodgers', 'Giants', 102)]
+    
+    games = scraper.build_date_games(DATE, pages_for(date_tables(matchups)))
+    
+    assert [game.game_id for game in games] == ['game_0', 'game_1']
+    assert [game.away_team for game in games] == ['Yankees', 'Dodgers']
+    assert [game.ml_current_away for game in games] == [-201, -202]
+    assert [game.total_current_line for game in games] == [7.5, 8.0]
+
+
+def test_build_date_games_with_no_tables(scraper):
+    assert scraper.build_date_games(DATE, pages_for({})) == []
@@ -0,0 +1,88 @@
+"""
+LineMovementAggregates over a SnapshotStore: price moves, line moves and old tables
+"""
+
+import sqlite3
+
+import pytest
+
+from line_movement import AGGREGATE_SCHEMA, LineMovementAggregates, fold_row
+from snapshot_store import SnapshotStore
+
+DATE = '2025-07-15'
+KEY = ('101', 'fanduel', 'totals', 'over')
+
+
+def totals_poll(odds, line):
+    """Long-format lines for one poll of game 101's FanDuel over"""
+    
+    return {'date': [DATE], 'game_id': ['101'], 'book': ['fanduel'], 'market': ['totals'],
+            'side': ['over'], 'phase': ['current'], 'odds': [odds], 'line': [line]}
+
+
+@pytest.fixture
+def store(tmp_path):
+    snapshot_store = SnapshotStore(str(tmp_path / 'snapshots.db'))
+    yield snapshot_store
+    snapshot_store.close()
+
+
+def test_line_move_at_an_unchanged_price():
+    agg = fold_row(None, 100.0, DATE, KEY, -110, 8.5)
+    agg = fold_row(agg, 200.0, DATE, KEY, -110, 9.0)
+    
+    assert agg['n_moves'] == 1
+    assert agg['largest_move'] == 0.0
+    assert agg['largest_move_ts'] is None
+    assert agg['largest_line_move'] == 0.5
+    assert agg['largest_line_move_ts'] == 200.0
+
+
+def test_price_and_line_moves_are_tracked_separately():
+    agg = fold_row(None, 100.0, DATE, KEY, -110, 8.5)
+    agg = fold_row(agg, 200.0, DATE, KEY, -125, 8.5)
+    agg = fold_row(agg, 300.0, DATE, KEY, -105, 9.5)
+    
+    assert agg['n_moves'] == 2
+    assert (agg['largest_move'], agg['largest_move_ts']) == (20.0, 300.0)
+    assert (agg['largest_line_move'], agg['largest_line_move_ts']) == (1.0, 300.0)
+
+
+def test_refresh_folds_line_moves_incrementally(store):
+    aggregates = LineMovementAggregates(store)
+    store.append(totals_poll(-110, 8.5), 100)
+    store.append(totals_poll(-110, 9.0), 200)
+    assert aggregates.refresh() == 2
+    
+    store.append(totals_poll(-110, 8.0), 300)
+    assert aggregates.refresh() == 1
+    assert aggregates.refresh() == 0
+    
+    row = aggregates.game('101').iloc[0]
+    assert row['n_moves'] == 2
+    assert row['largest_move'] == 0
+    assert (row['largest_line_move'], row['largest_line_move_ts']) == (1.0, 300.0)
+    assert (row['open_line'], row['close_line']) == (8.5, 8.0)
+
+
+def test_table_without_line_move_columns_is_rebuilt(store):
+    store.append(totals_poll(-110, 8.5), 100)
+    store.append(totals_poll(-110, 9.0), 200)
+    
+    # line_aggregates as created before line moves were tracked
+    old_schema = AGGREGATE_SCHEMA.replace('    largest_line_move REAL NOT NULL DEFAULT 0,\n', '')
+    old_schema = old_schema.replace('    largest_line_move_ts REAL,\n', '')
+    conn = sqlite3.connect(store.path)
+    conn.executescript(old_schema)
+    conn.execute("INSERT INTO line_aggregates (game_id, book, market, side, date, n_moves) "
+                 "VALUES ('101', 'fanduel', 'totals', 'over', ?, 1)", (DATE,))
+    conn.execute('INSERT INTO line_aggregates_progress (id, last_rowid) VALUES (1, 2)')
+    conn.commit()
+    conn.close()
+    
+    aggregates = LineMovementAggregates(store)
+    assert aggregates.refresh() == 2
+    
+    row = aggregates.game('101').iloc[0]
+    assert row['n_moves'] == 1
+    assert row['largest_line_move'] == 0.5